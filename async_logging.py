@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Non-blocking Logging for Mind9
+Log calls only format the record and put it on a bounded queue; a listener
+thread does the file and console I/O, with size- or time-based rotation and
+optional JSON-lines output. When the queue is full the oldest record is
+dropped and counted, so logging never stalls tweet or mint work.
+"""
+
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+from datetime import datetime
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Settings, overridable per deployment
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+LOG_MAX_BYTES = int(os.environ.get("LOG_MAX_BYTES", 10 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.environ.get("LOG_BACKUP_COUNT", 5))
+# e.g. "midnight" or "H" for time-based rotation instead of size-based
+LOG_ROTATE_WHEN = os.environ.get("LOG_ROTATE_WHEN")
+LOG_JSON = os.environ.get("LOG_JSON", "").lower() in ("1", "true", "yes")
+# Set to 0 when stdout is redirected to a file that nothing rotates (start_mind9.sh)
+LOG_CONSOLE = os.environ.get("LOG_CONSOLE", "1").lower() not in ("0", "false", "no")
+
+class DropOldestQueue(queue.Queue):
+    """Bounded queue whose put() never blocks: when full, the oldest item is discarded"""
+
+    def __init__(self, maxsize=LOG_QUEUE_SIZE):
+        super().__init__(maxsize)
+        self.enqueued = 0
+        self.dropped = 0
+
+    def put(self, item, block=True, timeout=None):
+        with self.mutex:
+            if self.maxsize > 0 and self._qsize() >= self.maxsize:
+                self._get()
+                self.dropped += 1
+                self.unfinished_tasks -= 1
+            self._put(item)
+            self.enqueued += 1
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers and jq"""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+            "thread": record.threadName
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class DropReportingListener(logging.handlers.QueueListener):
+    """QueueListener that writes a warning through its handlers whenever records were dropped"""
+
+    def __init__(self, log_queue, *handlers):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.reported_drops = 0
+
+    def handle(self, record):
+        dropped = getattr(self.queue, "dropped", 0)
+        if dropped > self.reported_drops:
+            notice = logging.LogRecord("async_logging", logging.WARNING, __file__, 0,
+                                       f"Log queue full, dropped {dropped - self.reported_drops} record(s)",
+                                       None, None)
+            self.reported_drops = dropped
+            super().handle(notice)
+        super().handle(record)
+
+def file_handler(path, level=logging.NOTSET, json_lines=LOG_JSON, max_bytes=LOG_MAX_BYTES,
+                 backup_count=LOG_BACKUP_COUNT, when=LOG_ROTATE_WHEN):
+    """A rotating file handler: time-based if 'when' is set, otherwise size-based"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if when:
+        handler = logging.handlers.TimedRotatingFileHandler(path, when=when, backupCount=backup_count)
+    else:
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count)
+    handler.setLevel(level)
+    handler.setFormatter(JsonFormatter() if json_lines else logging.Formatter(LOG_FORMAT))
+    return handler
+
+class AsyncLogging:
+    """A queue handler installed on a logger plus the listener thread that drains it"""
+
+    def __init__(self, handlers, logger=None, level=logging.INFO, queue_size=LOG_QUEUE_SIZE):
+        self.logger = logger or logging.getLogger()
+        self.queue = DropOldestQueue(queue_size)
+        self.handler = logging.handlers.QueueHandler(self.queue)
+        self.listener = DropReportingListener(self.queue, *handlers)
+
+        self.logger.setLevel(level)
+        self.logger.addHandler(self.handler)
+        self.listener.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Flush the queue and stop the listener; later records are discarded"""
+        if self.listener._thread is None:
+            return
+        self.logger.removeHandler(self.handler)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+        atexit.unregister(self.stop)
+
+    def stats(self):
+        return {
+            "queued": self.queue.qsize(),
+            "enqueued": self.queue.enqueued,
+            "dropped": self.queue.dropped,
+            "capacity": self.queue.maxsize
+        }
+
+_active = None
+
+def setup_logging(files=(), stream=LOG_CONSOLE, level=logging.INFO, json_lines=LOG_JSON, logger=None):
+    """Route logging through a bounded queue to rotating files and, optionally, the console.
+
+    'files' is a sequence of (path, level) pairs or ready-made handlers (e.g. from
+    file_handler() with its own format). Replaces any handlers already on
+    the target logger (the root logger by default), except ones marked
+    'persistent' such as the metrics error counter; calling it again in the same
+    process replaces the previous setup.
+    """
+    global _active
+    if _active is not None:
+        _active.stop()
+
+    handlers = [entry if isinstance(entry, logging.Handler) else file_handler(*entry, json_lines=json_lines)
+                for entry in files]
+    if stream:
+        console = logging.StreamHandler(sys.stderr)
+        console.setFormatter(logging.Formatter(LOG_FORMAT))
+        handlers.append(console)
+
+    target = logger or logging.getLogger()
+    for handler in list(target.handlers):
+        if not getattr(handler, "persistent", False):
+            target.removeHandler(handler)
+    _active = AsyncLogging(handlers, logger=target, level=level)
+    return _active
+
+def logging_stats():
+    """Queue counters for the active setup, or None if setup_logging() hasn't run"""
+    return _active.stats() if _active else None
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Atomic File Writes for Mind9
+Write-to-temporary-then-rename helper shared by the state store, caches,
+artwork, metrics snapshots and profiles, so readers never see a partial file
+"""
+
+import os
+import tempfile
+
+def write_atomic(path, data, fsync=True):
+    """Write bytes to 'path' via a temporary file and rename, so readers never see a partial file"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        if fsync:
+            # Persist the rename itself
+            dir_fd = os.open(directory, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""
+Benchmark and Load-Test Suite for Mind9
+Runs the HTTP server, TwitterMonitor, CoinStore and tweet pipeline against
+local data and fake upstreams, and reports latency and throughput as JSON so
+regressions can be caught per change
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import tempfile
+import platform
+import threading
+import http.client
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+def percentiles(samples, points=(50, 95, 99)):
+    """Latency summary in milliseconds"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    summary = {f"p{point}_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * point / 100))] * 1000, 3)
+               for point in points}
+    summary["mean_ms"] = round(sum(ordered) / len(ordered) * 1000, 3)
+    summary["max_ms"] = round(ordered[-1] * 1000, 3)
+    return summary
+
+@contextmanager
+def scratch_directory():
+    """Run a suite inside a throwaway working directory so it never touches live state"""
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="mind9-bench-") as directory:
+        os.chdir(directory)
+        try:
+            yield directory
+        finally:
+            os.chdir(previous)
+
+def sample_coin(index):
+    return {
+        "name": f"Bench Coin {index}",
+        "symbol": f"B{index:05d}",
+        "description": f"Benchmark coin number {index}",
+        "mint_address": f"BenchMint{index:034d}",
+        "total_supply": "1,000,000,000",
+        "image_path": f"/img/coins/b{index:05d}-{index:08x}.png",
+        "minted": True
+    }
+
+def bench_coins(count=20000, batch=1000, lookups=2000):
+    """Bulk create and listing throughput of CoinStore"""
+    from coin_store import CoinStore
+    from db_pool import ConnectionPool, sqlite_connector
+
+    with scratch_directory():
+        store = CoinStore("bench_coins.db", pool=ConnectionPool(sqlite_connector("bench_coins.db"), name="bench"))
+        coins = [sample_coin(i) for i in range(count)]
+
+        start = time.perf_counter()
+        for offset in range(0, count, batch):
+            store.admin_create_coins(coins[offset:offset + batch])
+        create_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        listed = store.get_all_minted_coins()
+        list_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        iterated = sum(1 for _ in store.iter_minted_coins(columns=("id", "symbol", "change_seq")))
+        iter_time = time.perf_counter() - start
+
+        timings = []
+        for _ in range(lookups):
+            address = coins[random.randrange(count)]["mint_address"]
+            lookup_start = time.perf_counter()
+            store.get_coin_by_mint_address(address)
+            timings.append(time.perf_counter() - lookup_start)
+
+        single = []
+        for i in range(min(200, count)):
+            single_start = time.perf_counter()
+            store.admin_create_coin(**sample_coin(count + i))
+            single.append(time.perf_counter() - single_start)
+        store.close()
+
+    return {
+        "coins": count,
+        "batch": batch,
+        "bulk_create_per_s": round(count / create_time, 1),
+        "single_create": percentiles(single),
+        "list_all_ms": round(list_time * 1000, 2),
+        "list_all_per_s": round(len(listed) / list_time, 1),
+        "iterate_per_s": round(iterated / iter_time, 1),
+        "lookup_by_mint": percentiles(timings)
+    }
+
+def bench_coin_manager(count=200):
+    """CoinManager admin create/list throughput; only run on request since it uses the configured storage"""
+    try:
+        from coin_manager import CoinManager
+    except ImportError as e:
+        return {"skipped": f"coin_manager not available: {e}"}
+    manager = CoinManager()
+    timings = []
+    for i in range(count):
+        coin = sample_coin(random.randrange(10 ** 6))
+        start = time.perf_counter()
+        manager.admin_create_coin(name=coin["name"], symbol=coin["symbol"], description=coin["description"],
+                                  mint_address=coin["mint_address"], total_supply=coin["total_supply"])
+        timings.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    listed = manager.get_all_minted_coins()
+    list_time = time.perf_counter() - start
+    return {"coins": count, "create": percentiles(timings), "list_all_ms": round(list_time * 1000, 2),
+            "listed": len(listed)}
+
+def _load_worker(host, port, paths, deadline, results, lock):
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    latencies = {}
+    errors = 0
+    while time.perf_counter() < deadline:
+        route, path = random.choice(paths)
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path, headers={"Accept-Encoding": "gzip"})
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=10)
+            continue
+        latencies.setdefault(route, []).append(time.perf_counter() - start)
+    conn.close()
+    with lock:
+        for route, samples in latencies.items():
+            results["latencies"].setdefault(route, []).extend(samples)
+        results["errors"] += errors
+
+def bench_http(duration=5.0, concurrency=16, coins=500, images=50, image_bytes=32 * 1024):
+    """Keep-alive load against Mind9Handler's /api/coins and /img/coins/ routes"""
+    import simple_python_server as server_module
+    from coin_store import CoinStore
+
+    with scratch_directory() as directory:
+        image_dir = os.path.join(directory, "generated_images")
+        os.makedirs(image_dir)
+        image_names = []
+        for i in range(images):
+            name = f"bench{i}-{i:08x}.png"
+            with open(os.path.join(image_dir, name), 'wb') as f:
+                f.write(os.urandom(image_bytes))
+            image_names.append(name)
+        server_module.GENERATED_IMAGES_DIR = server_module.Path(image_dir)
+        server_module.IMAGE_CACHE.clear()
+
+        store = CoinStore(":memory:")
+        store.admin_create_coins(sample_coin(i) for i in range(coins))
+        server_module.COIN_LISTING.attach(store)
+
+        class QuietHandler(server_module.Mind9Handler):
+            def log_message(self, format, *args):
+                pass
+
+        httpd = server_module.Mind9Server(("127.0.0.1", 0), QuietHandler)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        host, port = httpd.server_address
+
+        paths = [("api_coins", "/api/coins"), ("api_coins_page", "/api/coins?limit=50")]
+        paths += [("coin_image", f"/img/coins/{name}") for name in image_names]
+        results = {"latencies": {}, "errors": 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + duration
+        workers = [threading.Thread(target=_load_worker, args=(host, port, paths, deadline, results, lock))
+                   for _ in range(concurrency)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        httpd.shutdown()
+        httpd.server_close()
+        store.close()
+
+    total = sum(len(samples) for samples in results["latencies"].values())
+    return {
+        "duration_s": round(elapsed, 2),
+        "concurrency": concurrency,
+        "requests": total,
+        "requests_per_s": round(total / elapsed, 1),
+        "errors": results["errors"],
+        "routes": {route: dict(percentiles(samples), requests=len(samples))
+                   for route, samples in sorted(results["latencies"].items())},
+        "image_cache": server_module.IMAGE_CACHE.stats()
+    }
+
+def bench_status(log_lines=200000, history_entries=50000, iterations=200):
+    """TwitterMonitor.get_status_json with large error logs and tweet histories"""
+    from tweet_history import TweetHistoryStore
+    import twitter_status
+
+    with scratch_directory():
+        now = datetime.now()
+        with open("twitter_bot_state.json", 'w') as f:
+            json.dump({"last_tweet_time": (now - timedelta(hours=3)).isoformat(), "daily_tweet_count": 1,
+                       "total_tweets": history_entries, "announced_coins_count": 1000}, f)
+
+        store = TweetHistoryStore()
+        store.extend({"timestamp": (now - timedelta(minutes=history_entries - i)).isoformat(),
+                      "text": f"Tweet number {i}"} for i in range(history_entries))
+
+        levels = ["INFO"] * 17 + ["WARNING"] * 2 + ["ERROR"]
+        with open("twitter_bot_error.log", 'w') as f:
+            for i in range(log_lines):
+                stamp = (now - timedelta(seconds=log_lines - i)).strftime('%Y-%m-%d %H:%M:%S')
+                f.write(f"{stamp},000 - mind9_twitter_bot_runner - {levels[i % len(levels)]} - Log line {i}\n")
+        log_bytes = os.path.getsize("twitter_bot_error.log")
+
+        monitor = twitter_status.TwitterMonitor()
+        start = time.perf_counter()
+        monitor.get_status_json()
+        cold = time.perf_counter() - start
+
+        warm = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            monitor.get_status_json()
+            warm.append(time.perf_counter() - start)
+
+        # A new error line forces a rebuild, but the index only has to read the appended bytes
+        changed = []
+        for i in range(min(iterations, 50)):
+            with open("twitter_bot_error.log", 'a') as f:
+                f.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')},000 - bench - ERROR - Appended {i}\n")
+            os.utime("twitter_bot_error.log", ns=(time.time_ns(), time.time_ns() + i))
+            start = time.perf_counter()
+            monitor.get_status_json()
+            changed.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        errors = monitor.get_errors_since(now - timedelta(hours=1))
+        query_time = time.perf_counter() - start
+
+    return {
+        "log_lines": log_lines,
+        "log_mb": round(log_bytes / 1024 / 1024, 1),
+        "history_entries": history_entries,
+        "cold_ms": round(cold * 1000, 2),
+        "warm": percentiles(warm),
+        "after_append": percentiles(changed),
+        "errors_since_1h_ms": round(query_time * 1000, 2),
+        "errors_since_1h": len(errors)
+    }
+
+def bench_pipeline(coins=20, latency=0.05, error_rate=0.0, concurrency=4):
+    """End-to-end announcements against fake OpenAI and Twitter servers"""
+    from fake_services import FakeOpenAI, FakeTwitter
+    from tweet_pipeline import TweetPipeline, TweetRateLimiter, openai_text_generator, post_json
+
+    with FakeOpenAI(latency=latency, latency_jitter=latency / 5, error_rate=error_rate) as openai, \
+            FakeTwitter(latency=latency, latency_jitter=latency / 5, error_rate=error_rate) as twitter:
+        def post_tweet(text, media_ids):
+            return post_json(f"{twitter.url}/2/tweets", {"text": text})["data"]["id"]
+
+        pipeline = TweetPipeline(
+            openai_text_generator(api_key="bench", base_url=f"{openai.url}/v1"),
+            post_tweet,
+            rate_limiter=TweetRateLimiter(capacity=coins, min_interval=0),
+            concurrency={"text": concurrency, "post": concurrency}
+        )
+        with scratch_directory():
+            start = time.perf_counter()
+            results = asyncio.run(pipeline.announce_many([sample_coin(i) for i in range(coins)]))
+            elapsed = time.perf_counter() - start
+
+        failures = [result for result in results if isinstance(result, BaseException)]
+        return {
+            "coins": coins,
+            "upstream_latency_ms": latency * 1000,
+            "upstream_error_rate": error_rate,
+            "elapsed_s": round(elapsed, 3),
+            "announcements_per_s": round((coins - len(failures)) / elapsed, 2),
+            "failures": len(failures),
+            "stages": {stage: percentiles(samples) for stage, samples in pipeline.stage_times.items()},
+            "upstream_requests": {"openai": openai.stats(), "twitter": twitter.stats()}
+        }
+
+def bench_rpc(requests=500, batch=100, latency=0.01, concurrency=8):
+    """Account reads from the fake Solana node: one call per account, raw batches and SolanaRPC"""
+    from concurrent.futures import ThreadPoolExecutor
+    from fake_services import FakeSolanaRPC
+    from tweet_pipeline import post_json
+
+    addresses = [f"BenchMint{i:034d}" for i in range(requests)]
+    with FakeSolanaRPC(latency=latency) as rpc:
+        def single(address):
+            return post_json(rpc.url, {"jsonrpc": "2.0", "id": 1, "method": "getAccountInfo",
+                                       "params": [address, {"encoding": "base64"}]})
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            list(executor.map(single, addresses))
+        single_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for offset in range(0, requests, batch):
+            post_json(rpc.url, {"jsonrpc": "2.0", "id": 1, "method": "getMultipleAccounts",
+                                "params": [addresses[offset:offset + batch], {"encoding": "base64"}]})
+        batch_time = time.perf_counter() - start
+
+        from solana_rpc import SolanaRPC
+        client = SolanaRPC(rpc.url, concurrency=concurrency)
+        before = rpc.requests
+        start = time.perf_counter()
+        client.coin_statuses([{"mint_address": address} for address in addresses])
+        client_time = time.perf_counter() - start
+        round_trips = rpc.requests - before
+        client.close()
+
+    return {
+        "accounts": requests,
+        "upstream_latency_ms": latency * 1000,
+        "single_accounts_per_s": round(requests / single_time, 1),
+        "batched_accounts_per_s": round(requests / batch_time, 1),
+        "client_accounts_per_s": round(requests / client_time, 1),
+        "client_round_trips": round_trips
+    }
+
+def bench_art(coins=16, workers=None):
+    """Coin artwork batch rendering, one process versus the pool"""
+    try:
+        import coin_art
+        import numpy, PIL
+    except ImportError as e:
+        return {"skipped": f"numpy/Pillow not available: {e}"}
+    workers = workers or coin_art.ART_WORKERS
+    batch = [{"name": f"Bench Coin {i}", "symbol": f"B{i:05d}", "description": "benchmark"} for i in range(coins)]
+    timings = {}
+    with scratch_directory():
+        for count in sorted({1, workers}):
+            start = time.perf_counter()
+            coin_art.render_coin_images(batch, f"images-{count}", workers=count)
+            timings[count] = time.perf_counter() - start
+    return {
+        "coins": coins,
+        "workers": workers,
+        "single_process_per_s": round(coins / timings[1], 2),
+        "pool_per_s": round(coins / timings[workers], 2),
+        "speedup": round(timings[1] / timings[workers], 2)
+    }
+
+SUITES = {
+    "coins": bench_coins,
+    "http": bench_http,
+    "status": bench_status,
+    "pipeline": bench_pipeline,
+    "rpc": bench_rpc,
+    "art": bench_art
+}
+
+# Result keys where larger is better; any other numeric "_ms"/"_s" key is a latency
+THROUGHPUT_SUFFIXES = ("_per_s",)
+
+def compare(baseline, current, threshold=0.2, path=""):
+    """List metrics that got worse than 'baseline' by more than 'threshold' (a fraction)"""
+    regressions = []
+    if isinstance(baseline, dict) and isinstance(current, dict):
+        for key, value in baseline.items():
+            if key in current:
+                regressions.extend(compare(value, current[key], threshold, f"{path}.{key}" if path else key))
+        return regressions
+    if isinstance(baseline, bool) or not isinstance(baseline, (int, float)) or not isinstance(current, (int, float)):
+        return regressions
+    if baseline <= 0:
+        return regressions
+    if path.endswith(THROUGHPUT_SUFFIXES):
+        change = (baseline - current) / baseline
+    elif path.endswith(("_ms", "_s")):
+        change = (current - baseline) / baseline
+    else:
+        return regressions
+    if change > threshold:
+        regressions.append({"metric": path, "baseline": baseline, "current": current,
+                            "change": f"{(current - baseline) / baseline * 100:+.1f}%"})
+    return regressions
+
+def run(suites, quick=False):
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "suites": {}
+    }
+    # Smaller inputs for a fast smoke run
+    quick_options = {
+        "coins": {"count": 2000, "lookups": 200},
+        "http": {"duration": 1.0, "concurrency": 4},
+        "status": {"log_lines": 20000, "history_entries": 5000, "iterations": 50},
+        "pipeline": {"coins": 5, "latency": 0.01},
+        "rpc": {"requests": 100, "latency": 0.002},
+        "art": {"coins": 4}
+    }
+    for name in suites:
+        if name == "coin_manager":
+            results["suites"][name] = bench_coin_manager()
+            continue
+        options = quick_options.get(name, {}) if quick else {}
+        print(f"Running {name} benchmark...", file=sys.stderr)
+        results["suites"][name] = SUITES[name](**options)
+    return results
+
+if __name__ == "__main__":
+    # Usage: python benchmark.py [suite ...] [--quick] [--coin-manager] [--output FILE]
+    #                            [--compare BASELINE] [--threshold 0.2]
+    import logging
+    logging.basicConfig(level=logging.WARNING)
+
+    args = sys.argv[1:]
+    options = {}
+    for flag in ("--output", "--compare", "--threshold"):
+        if flag in args:
+            index = args.index(flag)
+            options[flag] = args[index + 1]
+            del args[index:index + 2]
+    quick = "--quick" in args
+    with_coin_manager = "--coin-manager" in args
+    args = [arg for arg in args if arg not in ("--quick", "--coin-manager")]
+
+    unknown = [name for name in args if name not in SUITES]
+    if unknown:
+        print(f"Unknown suites: {', '.join(unknown)}; choose from {', '.join(SUITES)}")
+        sys.exit(2)
+    suites = args or list(SUITES)
+    if with_coin_manager:
+        suites.append("coin_manager")
+
+    results = run(suites, quick=quick)
+    output = json.dumps(results, indent=2)
+    if "--output" in options:
+        with open(options["--output"], 'w') as f:
+            f.write(output + "\n")
+    print(output)
+
+    if "--compare" in options:
+        with open(options["--compare"], 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(baseline.get("suites", {}), results["suites"],
+                              float(options.get("--threshold", 0.2)))
+        if regressions:
+            print(json.dumps({"regressions": regressions}, indent=2), file=sys.stderr)
+            sys.exit(1)
+        print("No regressions against the baseline", file=sys.stderr)
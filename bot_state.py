@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Twitter Bot State Store for Mind9
+Crash-safe persistence for twitter_bot_state.json: atomic write-rename with
+batched fsyncs, bounded alert/error/history buffers, and announced coins kept
+in an append-only set file instead of an ever-growing JSON list
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import signal
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+from atomic_io import write_atomic
+
+logger = logging.getLogger("bot_state")
+
+STATE_FILE = "twitter_bot_state.json"
+
+# Ring buffer sizes for the lists kept inside the state document
+BUFFER_LIMITS = {
+    "alerts": 50,
+    "errors": 50,
+    "tweet_history": 20,
+    # Enough for the rolling tweet cap in tweet_scheduler
+    "recent_tweet_times": 24
+}
+STATE_FLUSH_INTERVAL = float(os.environ.get("STATE_FLUSH_INTERVAL", 5))
+# Keep writing the full announced_coins list for readers that predate the set file
+STATE_LEGACY_ANNOUNCED = os.environ.get("STATE_LEGACY_ANNOUNCED", "").lower() in ("1", "true", "yes")
+
+class BotStateStore:
+    """State for the Twitter bot.
+
+    The JSON document only holds scalars and bounded buffers, so it stays small no
+    matter how long the bot runs. announced_coins lives in '<state>.announced', one
+    coin key per line, loaded into a set once and appended to per announcement; the
+    document only carries announced_coins_count. That is a breaking change for
+    readers of the old announced_coins list, so legacy_announced keeps writing the
+    full list alongside until they have moved over.
+
+    Saves are coalesced: save() writes at most once per flush_interval unless forced,
+    and a coalesced save schedules a background flush for when the interval is up.
+    Pending changes are also flushed on exit, and on SIGTERM once the process entry
+    point opts in with flush_on_signals() (or handle_signals=True in the main thread).
+    """
+
+    def __init__(self, path=STATE_FILE, flush_interval=STATE_FLUSH_INTERVAL, buffer_limits=None,
+                 legacy_announced=STATE_LEGACY_ANNOUNCED, handle_signals=False):
+        self.path = path
+        self.announced_path = path + ".announced"
+        self.flush_interval = flush_interval
+        self.buffer_limits = dict(BUFFER_LIMITS, **(buffer_limits or {}))
+        self.legacy_announced = legacy_announced
+        self.lock = threading.RLock()
+        # Thread inside a locked section and how deep, so a signal handler can tell
+        # whether it interrupted a change in progress on its own thread
+        self.lock_owner = None
+        self.lock_depth = 0
+        self.pending_signal = None
+        self.dirty = False
+        self.last_flush = 0.0
+        self.flush_timer = None
+
+        self.values = {}
+        self.buffers = {name: deque(maxlen=limit) for name, limit in self.buffer_limits.items()}
+        self.announced = set()
+        self._load()
+        atexit.register(self.flush)
+        if handle_signals and threading.current_thread() is threading.main_thread():
+            self.flush_on_signals()
+
+    def flush_on_signals(self, signals=(signal.SIGTERM,)):
+        """Flush pending changes when the process is told to stop, then defer to the previous handler.
+
+        Call from the main thread of the process entry point. A signal that lands while
+        the main thread is halfway through a change is held until that change is done,
+        so the flush never writes a half-updated document.
+        """
+        for signum in signals:
+            previous = signal.getsignal(signum)
+
+            def handler(signum, frame, previous=previous):
+                if self.lock_owner == threading.get_ident():
+                    self.pending_signal = (signum, frame, previous)
+                    return
+                self._stop(signum, frame, previous)
+
+            signal.signal(signum, handler)
+
+    def _stop(self, signum, frame, previous):
+        self.flush()
+        if callable(previous):
+            previous(signum, frame)
+        elif previous != signal.SIG_IGN:
+            # What the default action would report, with atexit handlers still run
+            sys.exit(128 + signum)
+
+    @contextmanager
+    def _locked(self):
+        """Hold the store lock, running a deferred signal once the outermost section ends"""
+        with self.lock:
+            self.lock_owner = threading.get_ident()
+            self.lock_depth += 1
+            try:
+                yield
+            finally:
+                self.lock_depth -= 1
+                outermost = not self.lock_depth
+                if outermost:
+                    self.lock_owner = None
+        if outermost and self.pending_signal:
+            pending, self.pending_signal = self.pending_signal, None
+            self._stop(*pending)
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            state = {}
+        except ValueError as e:
+            logger.error(f"Corrupt state file {self.path}, starting fresh: {e}")
+            state = {}
+
+        legacy_announced = state.pop("announced_coins", None)
+        for name, buffer in self.buffers.items():
+            buffer.extend(state.pop(name, None) or [])
+        self.values = state
+
+        try:
+            with open(self.announced_path, 'r') as f:
+                self.announced = {line.rstrip('\n') for line in f if line.strip()}
+        except FileNotFoundError:
+            self.announced = set()
+
+        # One-time move of the legacy announced_coins list into the set file
+        if legacy_announced:
+            new_keys = [str(key) for key in legacy_announced if str(key) not in self.announced]
+            self._append_announced(new_keys)
+            self.announced.update(new_keys)
+            # With legacy_announced on the list is written back every time; nothing to migrate then
+            if new_keys or not self.legacy_announced:
+                self.dirty = True
+                self.flush()
+
+    def _append_announced(self, keys):
+        if not keys:
+            return
+        with open(self.announced_path, 'a') as f:
+            f.write("".join(f"{key}\n" for key in keys))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def get(self, key, default=None):
+        with self._locked():
+            return self.values.get(key, default)
+
+    def set(self, key, value):
+        with self._locked():
+            self.values[key] = value
+            self.dirty = True
+
+    def update(self, **values):
+        with self._locked():
+            self.values.update(values)
+            self.dirty = True
+
+    def push(self, buffer_name, entry):
+        """Append to a bounded buffer (alerts, errors, tweet_history); the oldest entry drops off"""
+        with self._locked():
+            self.buffers[buffer_name].append(entry)
+            self.dirty = True
+
+    def is_announced(self, coin_key):
+        return str(coin_key) in self.announced
+
+    def mark_announced(self, coin_key):
+        """Record an announced coin; returns False if it was already announced"""
+        key = str(coin_key)
+        with self._locked():
+            if key in self.announced:
+                return False
+            self._append_announced([key])
+            self.announced.add(key)
+            self.dirty = True
+            return True
+
+    def record_tweet(self, entry, when=None):
+        """Update the tweet counters and history for a posted tweet"""
+        when = when or datetime.now()
+        with self._locked():
+            last = self.values.get("last_tweet_time")
+            same_day = last and datetime.fromisoformat(last).date() == when.date()
+            self.values["daily_tweet_count"] = (self.values.get("daily_tweet_count", 0) if same_day else 0) + 1
+            self.values["total_tweets"] = self.values.get("total_tweets", 0) + 1
+            self.values["last_tweet_time"] = when.isoformat()
+            self.buffers["tweet_history"].append(entry)
+            self.buffers["recent_tweet_times"].append(when.isoformat())
+            self.dirty = True
+        self.save(force=True)
+
+    def to_dict(self):
+        """The document as written to disk"""
+        with self._locked():
+            state = dict(self.values)
+            for name, buffer in self.buffers.items():
+                state[name] = list(buffer)
+            state["announced_coins_count"] = len(self.announced)
+            if self.legacy_announced:
+                state["announced_coins"] = sorted(self.announced)
+            return state
+
+    def save(self, force=False):
+        """Persist pending changes, batching writes to one per flush_interval unless forced.
+
+        A save that is batched away schedules a flush for when the interval is up, so
+        the change reaches disk even if nothing else calls save().
+        """
+        with self._locked():
+            if not self.dirty:
+                return False
+            wait = self.last_flush + self.flush_interval - time.monotonic()
+            if not force and wait > 0:
+                if self.flush_timer is None:
+                    self.flush_timer = threading.Timer(wait, self._deadline_flush)
+                    self.flush_timer.daemon = True
+                    self.flush_timer.start()
+                return False
+            return self.flush()
+
+    def _deadline_flush(self):
+        with self._locked():
+            if self.flush_timer is threading.current_thread():
+                self.flush_timer = None
+            self.flush()
+
+    def flush(self):
+        with self._locked():
+            if self.flush_timer is not None:
+                self.flush_timer.cancel()
+                self.flush_timer = None
+            if not self.dirty:
+                return False
+            self.values["last_update"] = datetime.now().isoformat()
+            write_atomic(self.path, json.dumps(self.to_dict(), default=str, indent=2).encode())
+            self.dirty = False
+            self.last_flush = time.monotonic()
+            return True
+
+    def close(self):
+        self.flush()
+        atexit.unregister(self.flush)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Coin Artwork Rendering for Mind9
+Deterministic, vectorised numpy artwork for coins, encoded with Pillow and
+written atomically to generated_images/<symbol>-<hash>.png. Batches are spread
+across a process pool whose workers share the precomputed coordinate field.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from atomic_io import write_atomic
+
+logger = logging.getLogger("coin_art")
+
+GENERATED_IMAGES_DIR = os.environ.get("GENERATED_IMAGES_DIR", "generated_images")
+ART_SIZE = int(os.environ.get("ART_SIZE", 512))
+ART_WORKERS = int(os.environ.get("ART_WORKERS", os.cpu_count() or 1))
+ART_PNG_COMPRESS_LEVEL = int(os.environ.get("ART_PNG_COMPRESS_LEVEL", 6))
+
+# Bump when the renderer changes so old artwork isn't mistaken for new output
+ART_STYLE_VERSION = 1
+
+# Coin fields the artwork is derived from; the same coin always renders the same image
+ART_KEY_FIELDS = ("name", "symbol", "description")
+
+# Field planes in the shared buffer: x, y, radius, angle
+FIELD_PLANES = 4
+
+def art_seed(coin):
+    """64-bit seed from the coin's identifying fields, stable across processes and runs"""
+    material = {field: coin.get(field) for field in ART_KEY_FIELDS}
+    material["version"] = ART_STYLE_VERSION
+    digest = hashlib.sha256(json.dumps(material, sort_keys=True, default=str).encode()).digest()
+    return int.from_bytes(digest[:8], "little")
+
+def image_filename(symbol, data):
+    """<symbol>-<hash>.png, with the hash taken from the encoded bytes"""
+    slug = re.sub(r'[^a-z0-9]+', '', str(symbol or "coin").lower()) or "coin"
+    return f"{slug}-{hashlib.sha256(data).hexdigest()[:12]}.png"
+
+def compute_field(size, out=None):
+    """x, y, radius and angle planes for a size x size canvas, in [-1, 1] coordinates"""
+    import numpy as np
+    if out is None:
+        out = np.empty((FIELD_PLANES, size, size), dtype=np.float32)
+    axis = (np.arange(size, dtype=np.float32) + 0.5) / size * 2 - 1
+    out[0] = axis[None, :]
+    out[1] = axis[:, None]
+    np.hypot(out[0], out[1], out=out[2])
+    np.arctan2(out[1], out[0], out=out[3])
+    return out
+
+@lru_cache(maxsize=4)
+def _local_field(size):
+    return compute_field(size)
+
+def render_pixels(coin, field, out=None):
+    """Render a coin as an RGBA uint8 array using whole-array numpy operations"""
+    import numpy as np
+    x, y, radius, angle = field
+    size = radius.shape[0]
+    rng = np.random.default_rng(art_seed(coin))
+
+    palette = rng.integers(30, 256, size=(3, 3)).astype(np.float32)
+
+    # Radial gradient between the first two palette colours
+    t = np.clip(radius, 0, 1)[..., None]
+    color = palette[0] * (1 - t) + palette[1] * t
+
+    # Interference rings from a few random centres, evaluated for all centres at once
+    count = int(rng.integers(2, 5))
+    centres = rng.uniform(-0.6, 0.6, size=(count, 2)).astype(np.float32)
+    frequencies = rng.uniform(8, 24, size=count).astype(np.float32)
+    phases = rng.uniform(0, 2 * np.pi, size=count).astype(np.float32)
+    distance = np.hypot(x[None] - centres[:, 0, None, None], y[None] - centres[:, 1, None, None])
+    waves = np.sin(distance * frequencies[:, None, None] + phases[:, None, None]).mean(axis=0)
+
+    # Rotational petals, twisted with the radius
+    petals = int(rng.integers(3, 9))
+    twist = np.float32(rng.uniform(2, 8))
+    swirl = np.cos(angle * petals + radius * twist)
+
+    pattern = (0.5 + 0.25 * waves + 0.25 * swirl)[..., None] * 0.6
+    color = color * (1 - pattern) + palette[2] * pattern
+
+    # Light from the top left, a raised rim and an anti-aliased edge
+    color *= (1.1 - 0.25 * np.clip((x + y) / 2 + 0.5, 0, 1))[..., None]
+    rim = ((radius > 0.86) & (radius <= 0.95))[..., None]
+    color = np.where(rim, color * 0.5 + 127, color)
+    alpha = np.clip((0.95 - radius) * (size / 2), 0, 1) * 255
+
+    if out is None:
+        out = np.empty((size, size, 4), dtype=np.uint8)
+    out[..., :3] = np.clip(color, 0, 255)
+    out[..., 3] = alpha
+    return out
+
+def encode_png(pixels, compress_level=ART_PNG_COMPRESS_LEVEL):
+    """PNG bytes for an RGBA array; identical pixels always encode to identical bytes"""
+    import io
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.fromarray(pixels, "RGBA").save(buffer, "PNG", compress_level=compress_level)
+    return buffer.getvalue()
+
+def _write_image(coin, pixels, output_dir):
+    data = encode_png(pixels)
+    filename = image_filename(coin.get("symbol"), data)
+    path = os.path.join(output_dir, filename)
+    # The name is content-addressed, so an existing file already has these bytes
+    if not os.path.exists(path):
+        write_atomic(path, data, fsync=False)
+    return {
+        "symbol": coin.get("symbol"),
+        "filename": filename,
+        "path": path,
+        "image_path": f"/img/coins/{filename}",
+        "bytes": len(data)
+    }
+
+def render_coin_image(coin, output_dir=GENERATED_IMAGES_DIR, size=ART_SIZE):
+    """Render, encode and write one coin's artwork in this process"""
+    os.makedirs(output_dir, exist_ok=True)
+    return _write_image(coin, render_pixels(coin, _local_field(size)), output_dir)
+
+# Worker state: a read-only view of the parent's shared coordinate field
+_worker_field = None
+_worker_memory = None
+
+def _init_worker(memory_name, size):
+    global _worker_field, _worker_memory
+    import numpy as np
+    from multiprocessing import shared_memory
+    _worker_memory = shared_memory.SharedMemory(name=memory_name)
+    _worker_field = np.ndarray((FIELD_PLANES, size, size), dtype=np.float32, buffer=_worker_memory.buf)
+    _worker_field.flags.writeable = False
+
+def _render_in_worker(coin, output_dir):
+    return _write_image(coin, render_pixels(coin, _worker_field), output_dir)
+
+def _pool_context():
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+def render_coin_images(coins, output_dir=GENERATED_IMAGES_DIR, size=ART_SIZE, workers=ART_WORKERS):
+    """Render artwork for many coins across a process pool.
+
+    Returns one result dict (as from render_coin_image) or exception per coin, in
+    order. The coordinate field is computed once into shared memory and mapped
+    read-only by every worker; each worker encodes and writes its own PNGs, so
+    only the coin dicts and small result dicts cross process boundaries. Output
+    depends only on the coin, not on which worker rendered it.
+    """
+    coins = list(coins)
+    if not coins:
+        return []
+    os.makedirs(output_dir, exist_ok=True)
+    workers = max(1, min(workers, len(coins)))
+    start = time.perf_counter()
+
+    if workers == 1:
+        results = []
+        for coin in coins:
+            try:
+                results.append(render_coin_image(coin, output_dir, size))
+            except Exception as e:
+                logger.error(f"Error rendering artwork for {coin.get('symbol')}: {e}")
+                results.append(e)
+        logger.info(f"Rendered {len(coins)} coin image(s) in {time.perf_counter() - start:.2f}s")
+        return results
+
+    import numpy as np
+    from multiprocessing import shared_memory
+    memory = shared_memory.SharedMemory(create=True, size=FIELD_PLANES * size * size * 4)
+    try:
+        compute_field(size, out=np.ndarray((FIELD_PLANES, size, size), dtype=np.float32, buffer=memory.buf))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context(),
+                                 initializer=_init_worker, initargs=(memory.name, size)) as executor:
+            futures = [executor.submit(_render_in_worker, coin, output_dir) for coin in coins]
+            results = []
+            for coin, future in zip(coins, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error(f"Error rendering artwork for {coin.get('symbol')}: {e}")
+                    results.append(e)
+    finally:
+        memory.close()
+        memory.unlink()
+
+    logger.info(f"Rendered {len(coins)} coin image(s) on {workers} worker(s) in "
+                f"{time.perf_counter() - start:.2f}s")
+    return results
+
+def create_coins_with_art(manager, coins, output_dir=GENERATED_IMAGES_DIR, workers=ART_WORKERS):
+    """Render artwork for coins without an image_path, then bulk-create them.
+
+    'manager' is anything with admin_create_coins(coins), such as CoinStore.
+    Coins whose artwork failed are created without an image.
+    """
+    coins = [dict(coin) for coin in coins]
+    pending = [coin for coin in coins if not coin.get("image_path")]
+    for coin, result in zip(pending, render_coin_images(pending, output_dir, workers=workers)):
+        if not isinstance(result, BaseException):
+            coin["image_path"] = result["image_path"]
+    return manager.admin_create_coins(coins)
+
+if __name__ == "__main__":
+    # Usage: python coin_art.py SYMBOL [SYMBOL ...] [--workers N] [--output DIR]
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    args = sys.argv[1:]
+    options = {}
+    for flag in ("--workers", "--output"):
+        if flag in args:
+            index = args.index(flag)
+            options[flag] = args[index + 1]
+            del args[index:index + 2]
+    if not args:
+        print("Usage: python coin_art.py SYMBOL [SYMBOL ...] [--workers N] [--output DIR]")
+        sys.exit(2)
+    results = render_coin_images(
+        [{"name": symbol, "symbol": symbol} for symbol in args],
+        output_dir=options.get("--output", GENERATED_IMAGES_DIR),
+        workers=int(options.get("--workers", ART_WORKERS))
+    )
+    for result in results:
+        print(result if isinstance(result, BaseException) else result["path"])
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Coin Change Notifications for Mind9
+Local pub/sub over Unix datagram sockets so processes can react to new coins
+immediately, with adaptive-backoff polling as a fallback
+"""
+
+import os
+import glob
+import json
+import time
+import socket
+import logging
+import threading
+
+logger = logging.getLogger("coin_events")
+
+# Each subscriber binds its own socket in this directory; publishers send to all of them
+COIN_EVENTS_DIR = os.environ.get("COIN_EVENTS_DIR", ".mind9_events")
+MAX_EVENT_SIZE = 65536
+
+def publish_coin_event(event, coin=None, socket_dir=COIN_EVENTS_DIR, **extra):
+    """Send an event to every live subscriber; returns the number of subscribers reached.
+
+    Publishing never blocks and never raises: with no subscribers it is a single
+    glob() of an empty directory.
+    """
+    payload = {"event": event, "time": time.time()}
+    if coin:
+        for key in ("id", "symbol", "mint_address", "change_seq"):
+            if key in coin:
+                payload[key] = coin[key]
+    payload.update(extra)
+    data = json.dumps(payload, default=str).encode()[:MAX_EVENT_SIZE]
+
+    delivered = 0
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+    try:
+        for path in glob.glob(os.path.join(socket_dir, "*.sock")):
+            try:
+                sock.sendto(data, path)
+                delivered += 1
+            except ConnectionRefusedError:
+                # Subscriber died without cleaning up its socket
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except (BlockingIOError, FileNotFoundError):
+                # A full queue already has a pending wakeup; a vanished socket needs nothing
+                pass
+            except OSError as e:
+                logger.warning(f"Could not notify {path}: {e}")
+    finally:
+        sock.close()
+    return delivered
+
+class CoinEventListener:
+    """Subscriber end of the coin event channel"""
+
+    def __init__(self, name, socket_dir=COIN_EVENTS_DIR):
+        os.makedirs(socket_dir, exist_ok=True)
+        self.path = os.path.join(socket_dir, f"{name}-{os.getpid()}.sock")
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(self.path)
+
+    def wait(self, timeout=None):
+        """Block until at least one event arrives or the timeout passes; returns all pending events"""
+        events = []
+        self.sock.settimeout(timeout)
+        try:
+            events.append(self._decode(self.sock.recv(MAX_EVENT_SIZE)))
+        except socket.timeout:
+            return events
+
+        # Coalesce a burst of notifications into a single wakeup
+        self.sock.setblocking(False)
+        while True:
+            try:
+                events.append(self._decode(self.sock.recv(MAX_EVENT_SIZE)))
+            except (BlockingIOError, InterruptedError):
+                break
+        return events
+
+    def _decode(self, data):
+        try:
+            return json.loads(data)
+        except ValueError:
+            return {"event": "unknown"}
+
+    def wake(self):
+        """Interrupt a pending wait() from another thread"""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            sock.sendto(b'{"event": "wake"}', self.path)
+        except OSError:
+            pass
+        finally:
+            sock.close()
+
+    def close(self):
+        self.sock.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def store_change_checker(store, since=None):
+    """Build a CoinWatcher check function that returns coins changed since the last call"""
+    state = {"since": store.watermark() if since is None else since}
+
+    def check():
+        changes = list(store.iter_minted_coins(since=state["since"]))
+        if changes:
+            state["since"] = changes[-1]["change_seq"]
+        return changes
+
+    return check
+
+class CoinWatcher:
+    """Calls 'check' as soon as a coin event arrives, polling with adaptive backoff otherwise.
+
+    'check' should return the new coins (anything truthy) or an empty value. Each empty
+    poll stretches the fallback interval by 'backoff' up to 'max_interval'; any change
+    resets it to 'min_interval'.
+    """
+
+    def __init__(self, check, handle, name="coin-watcher", min_interval=30, max_interval=900,
+                 backoff=2.0, listener=None):
+        self.check = check
+        self.handle = handle
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+        self.stop_event = threading.Event()
+        try:
+            self.listener = listener or CoinEventListener(name)
+        except OSError as e:
+            logger.warning(f"Coin event channel unavailable, polling only: {e}")
+            self.listener = None
+
+    def poll_once(self):
+        """Run one check and adjust the fallback interval; returns the changes found"""
+        try:
+            changes = self.check()
+        except Exception as e:
+            logger.error(f"Error checking for new coins: {e}")
+            changes = None
+
+        if changes:
+            self.interval = self.min_interval
+            self.handle(changes)
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        return changes
+
+    def run(self):
+        """Loop until stop() is called"""
+        try:
+            self.poll_once()
+            while not self.stop_event.is_set():
+                if self.listener:
+                    events = self.listener.wait(self.interval)
+                    if events:
+                        logger.info(f"Woken by {len(events)} coin event(s)")
+                else:
+                    self.stop_event.wait(self.interval)
+                if self.stop_event.is_set():
+                    break
+                self.poll_once()
+        finally:
+            if self.listener:
+                self.listener.close()
+
+    def start(self):
+        thread = threading.Thread(target=self.run, name="coin-watcher", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.stop_event.set()
+        if self.listener:
+            self.listener.wake()
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Indexed Coin Store for Mind9
+SQLite-backed storage for coins with indexed lookups and change watermarks,
+exposing the same admin API as CoinManager
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import metrics
+from coin_events import publish_coin_event
+from db_pool import ConnectionPool, get_pool, sqlite_connector, is_postgres_dsn
+
+logger = logging.getLogger("coin_store")
+
+# Default database location
+COIN_DB_PATH = os.environ.get("COIN_DB_PATH", "mind9_coins.db")
+# Touched after every write so HTTP servers in other processes drop their cached coin listing
+COINS_CHANGED_FILE = os.environ.get("COINS_CHANGED_FILE", ".coins_changed")
+
+# Columns returned when no explicit selection is given
+COIN_COLUMNS = (
+    "id",
+    "name",
+    "symbol",
+    "description",
+    "mint_address",
+    "image_path",
+    "total_supply",
+    "minted",
+    "user_mintable",
+    "created_at",
+    "updated_at",
+    "change_seq"
+)
+BOOLEAN_COLUMNS = ("minted", "user_mintable")
+
+def mark_coins_changed(marker=COINS_CHANGED_FILE):
+    """Touch the change marker so servers in other processes drop their cached coin listing"""
+    try:
+        Path(marker).touch()
+    except OSError as e:
+        logger.warning(f"Could not touch coin change marker {marker}: {e}")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS coins (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    description TEXT,
+    mint_address TEXT,
+    image_path TEXT,
+    total_supply TEXT,
+    minted INTEGER NOT NULL DEFAULT 0,
+    user_mintable INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    change_seq INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_coins_mint_address ON coins(mint_address);
+CREATE INDEX IF NOT EXISTS idx_coins_symbol ON coins(symbol);
+CREATE INDEX IF NOT EXISTS idx_coins_minted ON coins(minted, change_seq);
+CREATE INDEX IF NOT EXISTS idx_coins_user_mintable ON coins(user_mintable, minted);
+CREATE INDEX IF NOT EXISTS idx_coins_change_seq ON coins(change_seq);
+CREATE TABLE IF NOT EXISTS coin_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO coin_meta (key, value) VALUES ('change_seq', 0);
+"""
+
+class CoinStore:
+    """Coin storage with indexes on mint_address, symbol, minted and user_mintable.
+
+    Every write stamps the affected rows with a monotonically increasing change_seq,
+    so consumers can remember the last watermark they saw and ask only for coins
+    changed since then via iter_minted_coins(since=...).
+    """
+
+    def __init__(self, db_path=COIN_DB_PATH, pool=None, change_marker=COINS_CHANGED_FILE):
+        if is_postgres_dsn(db_path):
+            # The schema and queries use SQLite syntax (executescript, ? placeholders, INSERT OR IGNORE)
+            raise ValueError("CoinStore only supports SQLite databases, not PostgreSQL DSNs")
+        self.db_path = db_path
+        # None disables the marker, e.g. for private in-memory stores
+        self.change_marker = change_marker
+        # Writers are serialised in-process; readers run concurrently on pooled connections
+        self.write_lock = threading.Lock()
+        if pool is None:
+            if db_path == ":memory:":
+                # A private single-connection pool, since each :memory: connection is its own database
+                pool = ConnectionPool(sqlite_connector(db_path), name="coins:memory", min_size=1, max_size=1)
+            else:
+                pool = get_pool("coins", dsn=db_path)
+        self.pool = pool
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def close(self):
+        self.pool.close()
+
+    def _next_seq(self, cursor, count=1):
+        """Reserve 'count' change sequence numbers inside the current transaction"""
+        cursor.execute("UPDATE coin_meta SET value = value + ? WHERE key = 'change_seq'", (count,))
+        cursor.execute("SELECT value FROM coin_meta WHERE key = 'change_seq'")
+        last = cursor.fetchone()[0]
+        return last - count + 1
+
+    def _mark_changed(self):
+        if self.change_marker:
+            mark_coins_changed(self.change_marker)
+
+    def _row_to_dict(self, row):
+        coin = dict(row)
+        for column in BOOLEAN_COLUMNS:
+            if column in coin:
+                coin[column] = bool(coin[column])
+        return coin
+
+    def _select(self, columns):
+        if not columns:
+            return ", ".join(COIN_COLUMNS)
+        unknown = [column for column in columns if column not in COIN_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown coin columns: {', '.join(unknown)}")
+        return ", ".join(columns)
+
+    def watermark(self):
+        """Get the latest change sequence number"""
+        row = self.pool.execute("SELECT value FROM coin_meta WHERE key = 'change_seq'",
+                                label="coins.watermark", fetch="one")
+        return row[0]
+
+    def admin_create_coin(self, name, symbol, description="", mint_address=None,
+                          total_supply=None, image_path=None, minted=True):
+        """Create a single admin-controlled coin and return it, or None on failure"""
+        created = self.admin_create_coins([{
+            "name": name,
+            "symbol": symbol,
+            "description": description,
+            "mint_address": mint_address,
+            "total_supply": total_supply,
+            "image_path": image_path,
+            "minted": minted
+        }])
+        return created[0] if created else None
+
+    def admin_create_coins(self, coins):
+        """Bulk insert coins from an iterable of dicts in a single transaction"""
+        now = datetime.now().isoformat()
+        rows = []
+        for coin in coins:
+            rows.append((
+                coin["name"],
+                coin["symbol"],
+                coin.get("description", ""),
+                coin.get("mint_address"),
+                coin.get("image_path"),
+                coin.get("total_supply"),
+                int(bool(coin.get("minted", True))),
+                int(bool(coin.get("user_mintable", False))),
+                now,
+                now
+            ))
+        if not rows:
+            return []
+
+        try:
+            with self.write_lock, self.pool.connection() as conn, self.pool.timed("coins.insert"):
+                cursor = conn.cursor()
+                first_seq = self._next_seq(cursor, len(rows))
+                cursor.executemany(
+                    "INSERT INTO coins (name, symbol, description, mint_address, image_path, total_supply, "
+                    "minted, user_mintable, created_at, updated_at, change_seq) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [row + (first_seq + offset,) for offset, row in enumerate(rows)]
+                )
+                # Read the new rows back in the same transaction, before any other writer can touch them
+                cursor.execute(
+                    f"SELECT {self._select(None)} FROM coins WHERE change_seq BETWEEN ? AND ? ORDER BY change_seq",
+                    (first_seq, first_seq + len(rows) - 1)
+                )
+                created = [self._row_to_dict(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Error creating coins: {e}")
+            return []
+
+        logger.info(f"Created {len(created)} coin(s)")
+        for coin in created:
+            if coin.get("minted"):
+                # Start of the coin minted -> tweet posted trace
+                metrics.event("coin.minted", metrics.coin_trace_id(coin), symbol=coin.get("symbol"), coin_id=coin.get("id"))
+        self._mark_changed()
+        publish_coin_event("coins_created", count=len(created), change_seq=first_seq + len(rows) - 1)
+        return created
+
+    def make_coin_mintable(self, coin_id):
+        """Mark a coin as available to users; returns True if a coin was updated"""
+        try:
+            with self.write_lock, self.pool.connection() as conn, self.pool.timed("coins.make_mintable"):
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1 FROM coins WHERE id = ?", (coin_id,))
+                if cursor.fetchone() is None:
+                    return False
+                seq = self._next_seq(cursor)
+                cursor.execute(
+                    "UPDATE coins SET user_mintable = 1, updated_at = ?, change_seq = ? WHERE id = ?",
+                    (datetime.now().isoformat(), seq, coin_id)
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Error making coin {coin_id} mintable: {e}")
+            return False
+
+        self._mark_changed()
+        publish_coin_event("coin_mintable", {"id": coin_id, "change_seq": seq})
+        return True
+
+    def get_coin(self, coin_id, columns=None):
+        row = self.pool.execute(
+            f"SELECT {self._select(columns)} FROM coins WHERE id = ?", (coin_id,),
+            label="coins.by_id", fetch="one"
+        )
+        return self._row_to_dict(row) if row else None
+
+    def get_coin_by_mint_address(self, mint_address, columns=None):
+        row = self.pool.execute(
+            f"SELECT {self._select(columns)} FROM coins WHERE mint_address = ?", (mint_address,),
+            label="coins.by_mint_address", fetch="one"
+        )
+        return self._row_to_dict(row) if row else None
+
+    def get_coins_by_symbol(self, symbol, columns=None):
+        rows = self.pool.execute(
+            f"SELECT {self._select(columns)} FROM coins WHERE symbol = ? ORDER BY id", (symbol,),
+            label="coins.by_symbol"
+        )
+        return [self._row_to_dict(row) for row in rows]
+
+    def get_all_minted_coins(self, columns=None, user_mintable=None):
+        """Get all minted coins ordered by id, optionally only (non-)user-mintable ones"""
+        return list(self.iter_minted_coins(columns=columns, user_mintable=user_mintable, order_by="id"))
+
+    def iter_minted_coins(self, since=None, columns=None, user_mintable=None, order_by="change_seq",
+                          batch_size=500):
+        """Yield minted coins, only those changed after the 'since' watermark when given.
+
+        Rows are fetched in batches so large listings never materialise in full.
+        Remember the highest change_seq seen and pass it back as 'since' on the next poll.
+        """
+        if order_by not in ("id", "change_seq"):
+            raise ValueError("order_by must be 'id' or 'change_seq'")
+        if columns:
+            columns = list(columns) + [name for name in ("change_seq", order_by) if name not in columns]
+
+        conditions = ["minted = 1"]
+        params = []
+        if since is not None:
+            conditions.append("change_seq > ?")
+            params.append(since)
+        if user_mintable is not None:
+            conditions.append("user_mintable = ?")
+            params.append(int(bool(user_mintable)))
+
+        # Read one batch at a time, keyed on the sort column, so writers are not locked out
+        select = self._select(columns)
+        last_key = None
+        while True:
+            page_conditions = list(conditions)
+            page_params = list(params)
+            if last_key is not None:
+                page_conditions.append(f"{order_by} > ?")
+                page_params.append(last_key)
+            query = (f"SELECT {select} FROM coins WHERE {' AND '.join(page_conditions)} "
+                     f"ORDER BY {order_by} LIMIT ?")
+            page_params.append(batch_size)
+
+            rows = self.pool.execute(query, page_params, label="coins.iter_minted")
+            for row in rows:
+                yield self._row_to_dict(row)
+            if len(rows) < batch_size:
+                return
+            last_key = rows[-1][order_by]
+
+# For direct testing
+if __name__ == "__main__":
+    store = CoinStore(":memory:", change_marker=None)
+    store.admin_create_coins(
+        {"name": f"Coin {i}", "symbol": f"C{i}", "mint_address": f"Mint{i}"} for i in range(5)
+    )
+    mark = store.watermark()
+    coin = store.get_coin_by_mint_address("Mint2")
+    store.make_coin_mintable(coin["id"])
+    print(f"Watermark before update: {mark}")
+    print(f"Changed since watermark: {[c['symbol'] for c in store.iter_minted_coins(since=mark)]}")
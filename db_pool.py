@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Database Connection Pool for Mind9
+Shared, health-checked connections with jittered reconnect backoff and
+per-query timing, used by the coin store, the HTTP server and the Twitter bot
+"""
+
+import os
+import time
+import queue
+import random
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from urllib.parse import quote
+
+import metrics
+
+logger = logging.getLogger("db_pool")
+
+# Pool settings
+DATABASE_URL = os.environ.get("DATABASE_URL")
+DB_POOL_MIN = int(os.environ.get("DB_POOL_MIN", 1))
+DB_POOL_MAX = int(os.environ.get("DB_POOL_MAX", 8))
+DB_CHECKOUT_TIMEOUT = float(os.environ.get("DB_CHECKOUT_TIMEOUT", 10))
+DB_VALIDATE_INTERVAL = float(os.environ.get("DB_VALIDATE_INTERVAL", 5))
+DB_CONNECT_RETRIES = int(os.environ.get("DB_CONNECT_RETRIES", 6))
+DB_SLOW_QUERY = float(os.environ.get("DB_SLOW_QUERY", 0.5))
+
+class PoolTimeout(Exception):
+    """No connection became available within the checkout timeout"""
+
+class ConnectionPool:
+    """Thread-safe pool of DB-API connections.
+
+    Connections idle for longer than validate_interval are pinged before being handed
+    out; broken ones are discarded and replaced. New connections are opened with
+    exponential backoff and full jitter, so a database restart doesn't take the
+    process down with it.
+    """
+
+    def __init__(self, connect, name="db", min_size=DB_POOL_MIN, max_size=DB_POOL_MAX,
+                 checkout_timeout=DB_CHECKOUT_TIMEOUT, validate_interval=DB_VALIDATE_INTERVAL,
+                 connect_retries=DB_CONNECT_RETRIES, backoff_base=0.1, backoff_cap=10.0,
+                 validate_query="SELECT 1"):
+        self.connect = connect
+        self.name = name
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.validate_interval = validate_interval
+        self.connect_retries = connect_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.validate_query = validate_query
+
+        self.idle = queue.LifoQueue()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.closed = False
+
+        # Counters and per-label query timings
+        self.reconnects = 0
+        self.discarded = 0
+        self.timings = {}
+
+        for _ in range(self.min_size):
+            try:
+                self._release(self._open())
+            except Exception as e:
+                logger.warning(f"[{self.name}] Could not pre-open connection: {e}")
+                break
+
+    def _open(self):
+        """Open a new connection, retrying with jittered exponential backoff"""
+        with self.lock:
+            if self.size >= self.max_size:
+                return None
+            self.size += 1
+
+        last_error = None
+        for attempt in range(self.connect_retries):
+            try:
+                conn = self.connect()
+                if attempt:
+                    self.reconnects += 1
+                    logger.info(f"[{self.name}] Reconnected after {attempt} retries")
+                return [conn, time.monotonic()]
+            except Exception as e:
+                last_error = e
+                delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+                logger.warning(f"[{self.name}] Connection attempt {attempt + 1} failed: {e}; retrying in {delay:.2f}s")
+                time.sleep(delay)
+
+        with self.lock:
+            self.size -= 1
+        raise last_error
+
+    def _discard(self, entry):
+        with self.lock:
+            self.size -= 1
+        self.discarded += 1
+        try:
+            entry[0].close()
+        except Exception:
+            pass
+
+    def _release(self, entry):
+        entry[1] = time.monotonic()
+        if self.closed:
+            self._discard(entry)
+        else:
+            self.idle.put(entry)
+
+    def _is_alive(self, conn):
+        try:
+            cursor = conn.cursor()
+            cursor.execute(self.validate_query)
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _checkout(self):
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            try:
+                entry = self.idle.get_nowait()
+            except queue.Empty:
+                entry = self._open()
+                if entry is None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(f"[{self.name}] No connection available after {self.checkout_timeout}s")
+                    try:
+                        entry = self.idle.get(timeout=remaining)
+                    except queue.Empty:
+                        raise PoolTimeout(f"[{self.name}] No connection available after {self.checkout_timeout}s")
+
+            # Validate connections that have been sitting idle
+            if time.monotonic() - entry[1] >= self.validate_interval and not self._is_alive(entry[0]):
+                logger.warning(f"[{self.name}] Discarding dead connection")
+                self._discard(entry)
+                continue
+            return entry
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection; it is committed on success and rolled back on error"""
+        entry = self._checkout()
+        try:
+            yield entry[0]
+            entry[0].commit()
+        except Exception:
+            try:
+                entry[0].rollback()
+            except Exception:
+                # Rollback failing means the connection itself is gone
+                self._discard(entry)
+                entry = None
+            raise
+        finally:
+            if entry is not None:
+                self._release(entry)
+
+    @contextmanager
+    def timed(self, label):
+        """Record how long the enclosed block takes under 'label'"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(label, time.perf_counter() - start)
+
+    def record(self, label, elapsed):
+        metrics.DB_QUERY_LATENCY.observe(elapsed, pool=self.name, label=label)
+        with self.lock:
+            stats = self.timings.setdefault(label, {"count": 0, "total": 0.0, "max": 0.0})
+            stats["count"] += 1
+            stats["total"] += elapsed
+            stats["max"] = max(stats["max"], elapsed)
+        if elapsed >= DB_SLOW_QUERY:
+            logger.warning(f"[{self.name}] Slow query '{label}': {elapsed * 1000:.1f}ms")
+
+    def execute(self, query, params=(), label=None, fetch="all"):
+        """Run a single query on a pooled connection; fetch is 'all', 'one' or None"""
+        with self.connection() as conn:
+            with self.timed(label or query.split(None, 1)[0].upper()):
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(query, params)
+                    if fetch == "all":
+                        return cursor.fetchall()
+                    if fetch == "one":
+                        return cursor.fetchone()
+                    return cursor.rowcount
+                finally:
+                    cursor.close()
+
+    def healthy(self):
+        """Check that a connection can be checked out and answers a ping"""
+        try:
+            with self.connection() as conn:
+                return self._is_alive(conn)
+        except Exception as e:
+            logger.warning(f"[{self.name}] Health check failed: {e}")
+            return False
+
+    def stats(self):
+        """Get pool counters and query timings for monitoring"""
+        with self.lock:
+            return {
+                "name": self.name,
+                "size": self.size,
+                "idle": self.idle.qsize(),
+                "max_size": self.max_size,
+                "reconnects": self.reconnects,
+                "discarded": self.discarded,
+                "timings": {label: dict(stats) for label, stats in self.timings.items()}
+            }
+
+    def close(self):
+        self.closed = True
+        while True:
+            try:
+                self._discard(self.idle.get_nowait())
+            except queue.Empty:
+                break
+
+def sqlite_connector(path, timeout=30, create=True):
+    """Build a connect function for a SQLite database file; with create=False a missing file is an error"""
+    def connect():
+        if create or path == ":memory:":
+            conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(f"file:{quote(os.path.abspath(path))}?mode=rw", uri=True, timeout=timeout,
+                                   check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+    return connect
+
+def postgres_connector(dsn):
+    """Build a connect function for PostgreSQL (requires psycopg2)"""
+    import psycopg2
+    import psycopg2.extras
+
+    def connect():
+        return psycopg2.connect(dsn, cursor_factory=psycopg2.extras.RealDictCursor, connect_timeout=10)
+    return connect
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def is_postgres_dsn(dsn):
+    return bool(dsn) and dsn.startswith(("postgres://", "postgresql://"))
+
+def get_pool(name="default", dsn=None, create=True, **kwargs):
+    """Get the process-wide pool for 'name', creating it on first use.
+
+    With a postgres:// DSN (or DATABASE_URL) the pool uses psycopg2; anything else is
+    treated as a SQLite path, opened read-write only (never created) when create=False.
+    """
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None or pool.closed:
+            dsn = dsn or DATABASE_URL or os.environ.get("COIN_DB_PATH", "mind9_coins.db")
+            if is_postgres_dsn(dsn):
+                connect = postgres_connector(dsn)
+            else:
+                connect = sqlite_connector(dsn, create=create)
+                if dsn == ":memory:":
+                    # Every SQLite :memory: connection is a separate database
+                    kwargs["min_size"] = kwargs["max_size"] = 1
+            pool = ConnectionPool(connect, name=name, **kwargs)
+            _pools[name] = pool
+        return pool
+
+def collect_pool_metrics():
+    """Size and reconnect counters of every shared pool, for /metrics"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    families = []
+    for pool in pools:
+        collect = metrics.stats_collector("mind9_db_pool", pool.stats, "Connection pool",
+                                          counters=("reconnects", "discarded"), labels={"pool": pool.name})
+        families.extend(collect())
+    return families
+
+metrics.REGISTRY.add_collector(collect_pool_metrics)
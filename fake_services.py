@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Fake External Services for Mind9
+Local stand-ins for the OpenAI, Twitter and Solana RPC APIs with configurable
+latency and error rates, for benchmarks and offline runs
+"""
+
+import sys
+import json
+import base64
+import time
+import random
+import hashlib
+import threading
+import http.server
+import socketserver
+from urllib.parse import urlsplit
+
+class FakeServiceHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(body) if body else {}
+        except ValueError:
+            return None
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def handle_call(self, method):
+        service = self.server.service
+        service.requests += 1
+        # Read the body even when failing, or it would be parsed as the next keep-alive request
+        payload = self.read_json() if method == "POST" else {}
+        if service.latency:
+            time.sleep(max(0.0, random.gauss(service.latency, service.latency_jitter)))
+        if service.error_rate and random.random() < service.error_rate:
+            service.errors += 1
+            self.send_json(service.error_status, {"error": {"message": "injected failure"}})
+            return
+        if payload is None:
+            self.send_json(400, {"error": {"message": "invalid JSON"}})
+            return
+        status, response = service.respond(method, urlsplit(self.path).path, payload, self.headers)
+        self.send_json(status, response)
+
+    def do_GET(self):
+        self.handle_call("GET")
+
+    def do_POST(self):
+        self.handle_call("POST")
+
+class _ThreadingServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+class FakeService:
+    """A fake upstream on 127.0.0.1 with injectable latency and failures.
+
+    latency is the mean added delay in seconds (normally distributed with
+    latency_jitter); error_rate is the fraction of requests answered with
+    error_status instead of a real response.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency=0.0, latency_jitter=0.0, error_rate=0.0, error_status=500, port=0):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        self.errors = 0
+        self.server = _ThreadingServer(("127.0.0.1", port), FakeServiceHandler)
+        self.server.service = self
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def respond(self, method, path, payload, headers):
+        return 404, {"error": {"message": f"no route for {method} {path}"}}
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name=f"fake-{self.name}", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def stats(self):
+        return {"requests": self.requests, "errors": self.errors}
+
+class FakeOpenAI(FakeService):
+    """Answers POST /v1/chat/completions and /v1/images/generations"""
+
+    name = "openai"
+
+    def respond(self, method, path, payload, headers):
+        if method == "POST" and path.endswith("/chat/completions"):
+            prompt = payload.get("messages", [{}])[-1].get("content", "")
+            text = f"Fresh on Mind9: {prompt[:120]}"
+            return 200, {
+                "id": f"chatcmpl-{self.requests}",
+                "object": "chat.completion",
+                "model": payload.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(text.split())}
+            }
+        if method == "POST" and path.endswith("/images/generations"):
+            return 200, {"data": [{"url": f"{self.url}/images/{self.requests}.png"}]}
+        return super().respond(method, path, payload, headers)
+
+class FakeTwitter(FakeService):
+    """Answers POST /2/tweets and POST /1.1/media/upload.json, remembering posted tweets"""
+
+    name = "twitter"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.tweets = []
+        self.lock = threading.Lock()
+
+    def respond(self, method, path, payload, headers):
+        if method == "POST" and path == "/2/tweets":
+            with self.lock:
+                tweet_id = str(1_000_000 + len(self.tweets))
+                self.tweets.append({"id": tweet_id, "text": payload.get("text"), "media": payload.get("media")})
+            return 201, {"data": {"id": tweet_id, "text": payload.get("text")}}
+        if method == "POST" and path == "/1.1/media/upload.json":
+            return 200, {"media_id": 2_000_000 + self.requests, "media_id_string": str(2_000_000 + self.requests)}
+        return super().respond(method, path, payload, headers)
+
+class FakeSolanaRPC(FakeService):
+    """Answers Solana JSON-RPC calls (single or batched) with deterministic fake accounts"""
+
+    name = "solana"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = {}
+
+    # Addresses starting with this prefix don't exist on the fake chain
+    MISSING_PREFIX = "Missing"
+
+    @classmethod
+    def account(cls, address):
+        """An SPL token mint account: supply and decimals in the standard 82-byte mint layout"""
+        if address.startswith(cls.MISSING_PREFIX):
+            return None
+        digest = hashlib.sha256(address.encode()).digest()
+        supply = 1_000_000_000 * 10 ** 9
+        mint = (b"\x00" * 36 + supply.to_bytes(8, "little") + bytes([9, 1]) + b"\x00" * 36)
+        return {
+            "lamports": 1_461_600 + int.from_bytes(digest[:2], "little"),
+            "owner": "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA",
+            "data": [base64.b64encode(mint).decode(), "base64"],
+            "executable": False,
+            "rentEpoch": 0
+        }
+
+    def call(self, request):
+        method = request.get("method")
+        params = request.get("params") or []
+        self.calls[method] = self.calls.get(method, 0) + 1
+        context = {"slot": 250_000_000 + self.requests}
+        if method == "getAccountInfo":
+            result = {"context": context, "value": self.account(params[0])}
+        elif method == "getMultipleAccounts":
+            result = {"context": context, "value": [self.account(address) for address in params[0]]}
+        elif method == "getBalance":
+            account = self.account(params[0])
+            result = {"context": context, "value": account["lamports"] if account else 0}
+        elif method == "getLatestBlockhash":
+            result = {"context": context, "value": {"blockhash": hashlib.sha256(str(context["slot"]).encode()).hexdigest(),
+                                                    "lastValidBlockHeight": context["slot"] + 150}}
+        elif method == "getTokenSupply":
+            result = {"context": context, "value": {"amount": "1000000000", "decimals": 9, "uiAmountString": "1"}}
+        elif method == "getHealth":
+            result = "ok"
+        else:
+            return {"jsonrpc": "2.0", "id": request.get("id"), "error": {"code": -32601, "message": "Method not found"}}
+        return {"jsonrpc": "2.0", "id": request.get("id"), "result": result}
+
+    def respond(self, method, path, payload, headers):
+        if method != "POST":
+            return super().respond(method, path, payload, headers)
+        if isinstance(payload, list):
+            return 200, [self.call(request) for request in payload]
+        return 200, self.call(payload)
+
+FAKE_SERVICES = {
+    "openai": FakeOpenAI,
+    "twitter": FakeTwitter,
+    "solana": FakeSolanaRPC
+}
+
+# Run a fake service standalone, e.g. to point the bot at it with OPENAI_BASE_URL
+if __name__ == "__main__":
+    # Usage: python fake_services.py openai|twitter|solana [port] [--latency S] [--error-rate F]
+    args = sys.argv[1:]
+    options = {}
+    for flag, key in (("--latency", "latency"), ("--error-rate", "error_rate")):
+        if flag in args:
+            index = args.index(flag)
+            options[key] = float(args[index + 1])
+            del args[index:index + 2]
+    if not args or args[0] not in FAKE_SERVICES:
+        print(f"Usage: python fake_services.py {'|'.join(FAKE_SERVICES)} [port] [--latency S] [--error-rate F]")
+        sys.exit(2)
+    service = FAKE_SERVICES[args[0]](port=int(args[1]) if len(args) > 1 else 0, **options)
+    print(f"Fake {service.name} listening on {service.url}")
+    try:
+        service.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Generation Cache for Mind9
+Content-addressed on-disk cache for generated tweet text and coin images, with
+TTL and size-based eviction, plus background pre-generation ahead of tweet slots
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import metrics
+from atomic_io import write_atomic
+
+logger = logging.getLogger("generation_cache")
+
+# Cache settings
+GENERATION_CACHE_DIR = os.environ.get("GENERATION_CACHE_DIR", ".mind9_cache")
+GENERATION_CACHE_BYTES = int(os.environ.get("GENERATION_CACHE_BYTES", 256 * 1024 * 1024))
+GENERATION_CACHE_TTL = float(os.environ.get("GENERATION_CACHE_TTL", 7 * 86400))
+
+# Coin fields that affect generated content; anything else (ids, timestamps) is ignored
+COIN_KEY_FIELDS = ("name", "symbol", "description", "mint_address", "total_supply")
+
+def cache_key(kind, prompt=None, coin=None, **params):
+    """Hash the inputs that determine a generated artifact"""
+    material = {
+        "kind": kind,
+        "prompt": prompt,
+        "coin": {field: coin.get(field) for field in COIN_KEY_FIELDS} if coin else None,
+        "params": params
+    }
+    encoded = json.dumps(material, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+class GenerationCache:
+    """On-disk cache of generated artifacts, addressed by the hash of their inputs.
+
+    Text is stored as JSON, images as files next to a small metadata record. Writes
+    go to a temporary file first and are renamed into place, so a crash never leaves
+    a half-written entry behind. Entry sizes are scanned from disk once at startup
+    and then tracked in memory, so eviction never walks the cache directory; the
+    index only sees this process's writes.
+    """
+
+    def __init__(self, cache_dir=GENERATION_CACHE_DIR, max_bytes=GENERATION_CACHE_BYTES,
+                 ttl=GENERATION_CACHE_TTL):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        self.inflight = {}
+        # key -> bytes on disk, least recently written first
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._scan()
+
+    def _path(self, key, suffix):
+        return os.path.join(self.cache_dir, key[:2], key + suffix)
+
+    def _write_atomic(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_atomic(path, data, fsync=False)
+
+    def _scan(self):
+        """Build the size index from disk; the only full walk of the cache directory"""
+        found = {}
+        now = time.time()
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if name.startswith(".tmp-"):
+                    # Leftover temporaries from a crash; young ones may still be in progress
+                    if now - stat.st_mtime > 3600:
+                        os.unlink(path)
+                    continue
+                key = name.split(".", 1)[0]
+                mtime, size = found.get(key, (0, 0))
+                found[key] = (max(mtime, stat.st_mtime), size + stat.st_size)
+        with self.lock:
+            self.entries = OrderedDict((key, size) for key, (_, size) in sorted(found.items(), key=lambda item: item[1][0]))
+            self.total_bytes = sum(self.entries.values())
+
+    def _record(self, key, size):
+        """Index a freshly written entry as the most recent one"""
+        with self.lock:
+            self.total_bytes += size - self.entries.pop(key, 0)
+            self.entries[key] = size
+
+    def _read_meta(self, key):
+        try:
+            with open(self._path(key, ".json"), 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() > meta.get("expires", 0):
+            self.delete(key)
+            return None
+        return meta
+
+    def get_text(self, key):
+        meta = self._read_meta(key)
+        if meta is None or "text" not in meta:
+            self.misses += 1
+            metrics.CACHE_LOOKUPS.inc(cache="generation_text", result="miss")
+            return None
+        self.hits += 1
+        metrics.CACHE_LOOKUPS.inc(cache="generation_text", result="hit")
+        return meta["text"]
+
+    def put_text(self, key, text, ttl=None):
+        meta = {"text": text, "created": time.time(), "expires": time.time() + (ttl or self.ttl)}
+        data = json.dumps(meta).encode()
+        self._write_atomic(self._path(key, ".json"), data)
+        self._record(key, len(data))
+        self.evict()
+
+    def get_file(self, key):
+        """Return the cached file path for 'key', or None"""
+        meta = self._read_meta(key)
+        if meta is None or "file" not in meta or not os.path.exists(self._path(key, meta["file"])):
+            self.misses += 1
+            metrics.CACHE_LOOKUPS.inc(cache="generation_file", result="miss")
+            return None
+        self.hits += 1
+        metrics.CACHE_LOOKUPS.inc(cache="generation_file", result="hit")
+        return self._path(key, meta["file"])
+
+    def put_file(self, key, source_path, ttl=None):
+        """Copy a generated file into the cache and return the cached path"""
+        suffix = os.path.splitext(source_path)[1] or ".bin"
+        path = self._path(key, suffix)
+        with open(source_path, 'rb') as f:
+            content = f.read()
+        self._write_atomic(path, content)
+        meta = {"file": suffix, "created": time.time(), "expires": time.time() + (ttl or self.ttl)}
+        data = json.dumps(meta).encode()
+        self._write_atomic(self._path(key, ".json"), data)
+        self._record(key, len(content) + len(data))
+        self.evict()
+        return path
+
+    def delete(self, key):
+        with self.lock:
+            self.total_bytes -= self.entries.pop(key, 0)
+        directory = os.path.join(self.cache_dir, key[:2])
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return
+        for name in names:
+            if name.startswith(key):
+                try:
+                    os.unlink(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+    def _single_flight(self, key, produce):
+        """Make concurrent callers for the same key share one producer call"""
+        with self.lock:
+            event = self.inflight.get(key)
+            if event is None:
+                self.inflight[key] = threading.Event()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            event.wait()
+            return None
+        try:
+            return produce()
+        finally:
+            with self.lock:
+                self.inflight.pop(key).set()
+
+    def get_or_create_text(self, key, producer, ttl=None):
+        """Return cached text for 'key', calling producer() only on a miss"""
+        text = self.get_text(key)
+        if text is not None:
+            return text
+
+        def produce():
+            value = producer()
+            if value:
+                self.put_text(key, value, ttl)
+            return value
+
+        value = self._single_flight(key, produce)
+        return value if value is not None else self.get_text(key)
+
+    def get_or_create_file(self, key, producer, ttl=None):
+        """Return a cached file path for 'key', calling producer() -> path only on a miss"""
+        path = self.get_file(key)
+        if path:
+            return path
+
+        def produce():
+            source_path = producer()
+            return self.put_file(key, source_path, ttl) if source_path else None
+
+        value = self._single_flight(key, produce)
+        return value if value is not None else self.get_file(key)
+
+    def evict(self):
+        """Drop the least recently written entries until the cache is under max_bytes.
+
+        Expired entries are removed lazily when they are next read.
+        """
+        while True:
+            with self.lock:
+                if self.total_bytes <= self.max_bytes or not self.entries:
+                    return
+                key = next(iter(self.entries))
+            self.delete(key)
+            self.evictions += 1
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self.entries), "bytes": self.total_bytes}
+
+def cached_text_stage(cache, generate_text, prompt=None, **params):
+    """Wrap a generate_text(coin) stage so repeated prompts are served from the cache"""
+    def stage(coin):
+        key = cache_key("text", prompt, coin, **params)
+        return cache.get_or_create_text(key, lambda: generate_text(coin))
+    return stage
+
+def cached_image_stage(cache, render_image, **params):
+    """Wrap a render_image(coin) -> path stage with the file cache"""
+    def stage(coin):
+        key = cache_key("image", coin=coin, **params)
+        return cache.get_or_create_file(key, lambda: render_image(coin))
+    return stage
+
+class Pregenerator:
+    """Background thread that fills the cache for upcoming slots before they fire.
+
+    'drafts' returns the coins that the next slot will need; each is run through
+    the (cached) stages 'lead_time' before the slot so that posting is a cache read.
+    """
+
+    def __init__(self, scheduler, drafts, stages, lead_time=timedelta(minutes=20)):
+        self.scheduler = scheduler
+        self.drafts = drafts
+        self.stages = stages
+        self.lead_time = lead_time
+        self.stop_event = threading.Event()
+        self.prepared_for = None
+
+    def run_once(self):
+        """Pre-generate for the next slot if it is inside the lead time; returns seconds until the next check"""
+        fire_time = self.scheduler.next_fire_time()
+        if fire_time is None:
+            return 3600
+        start_at = fire_time - self.lead_time
+        wait = (start_at - datetime.now()).total_seconds()
+        if wait > 0:
+            return wait
+        if self.prepared_for == fire_time:
+            return max((fire_time - datetime.now()).total_seconds(), 0) + 1
+
+        logger.info(f"Pre-generating drafts for the {fire_time.isoformat()} slot")
+        for coin in self.drafts():
+            for stage in self.stages:
+                try:
+                    stage(coin)
+                except Exception as e:
+                    logger.warning(f"Pre-generation failed for {coin.get('symbol')}: {e}")
+        self.prepared_for = fire_time
+        return max((fire_time - datetime.now()).total_seconds(), 0) + 1
+
+    def run(self):
+        while not self.stop_event.is_set():
+            self.stop_event.wait(self.run_once())
+
+    def start(self):
+        thread = threading.Thread(target=self.run, name="pregenerator", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.stop_event.set()
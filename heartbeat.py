@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Heartbeats for Mind9 Processes
+Each process publishes a heartbeat with progress counters into a small
+memory-mapped file; the supervisor and TwitterMonitor read them to spot hung
+processes in well under a second
+"""
+
+import os
+import mmap
+import time
+import struct
+import threading
+
+HEARTBEAT_DIR = os.environ.get("HEARTBEAT_DIR", ".mind9_heartbeats")
+HEARTBEAT_ENV = "MIND9_HEARTBEAT_NAME"
+HEARTBEAT_INTERVAL = float(os.environ.get("HEARTBEAT_INTERVAL", 5.0))
+
+# Progress counters every heartbeat carries, in slot order
+COUNTER_NAMES = ("cycles", "tweets", "coins", "errors", "requests", "images", "reserved1", "reserved2")
+
+# magic, pid, seq, started, last_beat, expected interval, counters
+HEARTBEAT_FORMAT = "<4sQQddd" + "Q" * len(COUNTER_NAMES)
+HEARTBEAT_SIZE = struct.calcsize(HEARTBEAT_FORMAT)
+HEARTBEAT_MAGIC = b"M9HB"
+
+# A process is hung once its last beat is this many expected intervals old
+HANG_FACTOR = float(os.environ.get("HEARTBEAT_HANG_FACTOR", 2.0))
+
+# Callbacks run after every beat as callback(allowed_seconds, increments), e.g. the profiler
+BEAT_LISTENERS = []
+
+def heartbeat_path(name, directory=HEARTBEAT_DIR):
+    return os.path.join(directory, f"{name}.hb")
+
+class Heartbeat:
+    """Writer side of a process heartbeat.
+
+    The record is a fixed-size struct in a shared mapping, updated seqlock-style:
+    the sequence number is odd while a write is in progress, so readers never act
+    on a torn record. Call beat() from the work loop itself, so a hung loop stops
+    beating even if other threads are fine; a loop about to sleep for a long time
+    passes expect=<seconds> so the wait isn't mistaken for a hang.
+    """
+
+    def __init__(self, name, interval=HEARTBEAT_INTERVAL, directory=HEARTBEAT_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.name = name
+        self.path = heartbeat_path(name, directory)
+        self.interval = interval
+        self.seq = 0
+        self.started = time.time()
+        self.counters = [0] * len(COUNTER_NAMES)
+        self.lock = threading.Lock()
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, HEARTBEAT_SIZE)
+            self.map = mmap.mmap(fd, HEARTBEAT_SIZE)
+        finally:
+            os.close(fd)
+        self.beat()
+
+    def _write(self, interval):
+        self.seq += 1
+        # Odd sequence: write in progress
+        struct.pack_into("<Q", self.map, 12, self.seq)
+        struct.pack_into(HEARTBEAT_FORMAT, self.map, 0, HEARTBEAT_MAGIC, os.getpid(), self.seq,
+                         self.started, time.time(), interval, *self.counters)
+        self.seq += 1
+        struct.pack_into("<Q", self.map, 12, self.seq)
+
+    def beat(self, expect=None, **increments):
+        """Record liveness, optionally bumping progress counters (e.g. beat(cycles=1)).
+
+        'expect' is how many seconds may pass before the next beat; it defaults to
+        the heartbeat's interval.
+        """
+        allowed = max(expect or 0, self.interval)
+        with self.lock:
+            for name, amount in increments.items():
+                self.counters[COUNTER_NAMES.index(name)] += amount
+            self._write(allowed)
+        for listener in BEAT_LISTENERS:
+            listener(allowed, increments)
+
+    def close(self, remove=True):
+        self.map.close()
+        if remove:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+_current = None
+
+def register(name=None, interval=HEARTBEAT_INTERVAL):
+    """Arm hang detection for this process; returns the heartbeat, or None when not supervised.
+
+    Only the work loop that owns the process's liveness calls this, once, and then
+    beats at least every 'interval' seconds (or announces longer waits with
+    expect=...). Until then no heartbeat file exists and the supervisor never kills
+    the process for going quiet. 'name' defaults to MIND9_HEARTBEAT_NAME.
+    """
+    global _current
+    if _current is None:
+        name = name or os.environ.get(HEARTBEAT_ENV)
+        if not name:
+            return None
+        _current = Heartbeat(name, interval=interval)
+    return _current
+
+def unregister(remove=True):
+    """Disarm hang detection, e.g. when the owning loop exits cleanly"""
+    global _current
+    if _current is not None:
+        _current.close(remove=remove)
+        _current = None
+
+def current():
+    """The heartbeat armed with register(), or None; library code only beats when it's set"""
+    return _current
+
+def read_heartbeat(path, retries=5):
+    """Read a heartbeat record; returns a dict or None if missing or unreadable.
+
+    Seqlock read: the sequence number is read before and after the record, and the
+    record only counts if both reads agree and are even, i.e. no write overlapped it.
+    """
+    try:
+        with open(path, 'rb') as f:
+            fd = f.fileno()
+            for attempt in range(retries):
+                if attempt:
+                    # Let the writer finish before trying again
+                    time.sleep(0)
+                before = os.pread(fd, 8, 12)
+                data = os.pread(fd, HEARTBEAT_SIZE, 0)
+                after = os.pread(fd, 8, 12)
+                if len(data) < HEARTBEAT_SIZE:
+                    return None
+                values = struct.unpack(HEARTBEAT_FORMAT, data)
+                magic, pid, seq, started, last_beat, interval = values[:6]
+                if magic != HEARTBEAT_MAGIC:
+                    return None
+                if before == after and struct.unpack("<Q", after)[0] % 2 == 0:
+                    break
+            else:
+                return None
+    except OSError:
+        return None
+
+    now = time.time()
+    return {
+        "name": os.path.splitext(os.path.basename(path))[0],
+        "pid": pid,
+        "seq": seq,
+        "started": started,
+        "last_beat": last_beat,
+        "age": now - last_beat,
+        "interval": interval,
+        "counters": dict(zip(COUNTER_NAMES, values[6:]))
+    }
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+def is_hung(record, hang_factor=HANG_FACTOR):
+    return record["age"] > record["interval"] * hang_factor
+
+def read_all(directory=HEARTBEAT_DIR, hang_factor=HANG_FACTOR):
+    """Read every heartbeat, labelling each 'alive', 'hung' or 'dead'"""
+    results = {}
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return results
+    for filename in names:
+        if not filename.endswith(".hb"):
+            continue
+        record = read_heartbeat(os.path.join(directory, filename))
+        if record is None:
+            continue
+        if not pid_alive(record["pid"]):
+            record["state"] = "dead"
+        elif is_hung(record, hang_factor):
+            record["state"] = "hung"
+        else:
+            record["state"] = "alive"
+        results[record["name"]] = record
+    return results
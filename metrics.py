@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Metrics and Tracing for Mind9
+Dependency-free counters, gauges and histograms rendered in the Prometheus text
+format, per-process snapshots that simple_python_server.py merges into /metrics,
+and optional span tracing for the coin minted -> tweet posted flow
+"""
+
+import os
+import json
+import time
+import uuid
+import bisect
+import atexit
+import hashlib
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+
+METRICS_DIR = os.environ.get("METRICS_DIR", ".mind9_metrics")
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", 10))
+# Snapshots from processes that stopped writing longer ago than this are left out
+METRICS_STALE_AFTER = float(os.environ.get("METRICS_STALE_AFTER", 300))
+
+# Latency buckets in seconds, from fast DB queries to slow image generation
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+TRACE_ENABLED = os.environ.get("MIND9_TRACE", "").lower() in ("1", "true", "yes")
+TRACE_FILE = os.environ.get("MIND9_TRACE_FILE", "logs/traces.jsonl")
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in sorted(labels.items())) + "}"
+
+class Metric:
+    """Base for labelled metrics; values are keyed by the sorted label items"""
+
+    type = None
+
+    def __init__(self, name, help, registry=None):
+        self.name = name
+        self.help = help
+        self.lock = threading.Lock()
+        self.values = {}
+        (registry or REGISTRY).register(self)
+
+    @staticmethod
+    def _key(labels):
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def samples(self):
+        with self.lock:
+            return [(self.name, dict(key), value) for key, value in self.values.items()]
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, help, buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, registry)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, sum, count
+                state = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with-block, including when it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        samples = []
+        with self.lock:
+            items = [(key, list(state[0]), state[1], state[2]) for key, state in self.values.items()]
+        for key, counts, total, count in items:
+            labels = dict(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                samples.append((self.name + "_bucket", dict(labels, le=_format_value(float(bound))), cumulative))
+            samples.append((self.name + "_sum", labels, total))
+            samples.append((self.name + "_count", labels, count))
+        return samples
+
+class Registry:
+    """A set of metrics plus collector callbacks evaluated at scrape time"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.collectors = []
+
+    def register(self, metric):
+        with self.lock:
+            self.metrics[metric.name] = metric
+
+    def add_collector(self, collector):
+        """collector() -> iterable of (name, type, help, [(sample_name, labels, value), ...])"""
+        with self.lock:
+            self.collectors.append(collector)
+
+    def collect(self):
+        """Return metric families as (name, type, help, samples) tuples"""
+        with self.lock:
+            metrics = list(self.metrics.values())
+            collectors = list(self.collectors)
+        families = [(metric.name, metric.type, metric.help, metric.samples()) for metric in metrics]
+        for collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                logging.getLogger("metrics").warning(f"Metrics collector failed: {e}")
+        return families
+
+REGISTRY = Registry()
+
+def render(families):
+    """Render metric families in the Prometheus text exposition format (0.0.4)"""
+    lines = []
+    for name, metric_type, help, samples in families:
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for sample_name, labels, value in samples:
+            lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+def stats_collector(prefix, stats, help, counters=(), labels=None):
+    """Turn a stats() dict into gauge and counter families named '<prefix>_<key>'.
+
+    Keys listed in 'counters' become counters; other numeric keys become gauges.
+    """
+    def collect():
+        values = stats()
+        if not values:
+            return []
+        families = []
+        for key, value in values.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            metric_type = "counter" if key in counters else "gauge"
+            name = f"{prefix}_{key}_total" if metric_type == "counter" else f"{prefix}_{key}"
+            families.append((name, metric_type, f"{help}: {key}", [(name, dict(labels or {}), value)]))
+        return families
+    return collect
+
+# Metrics shared across the pipeline
+OPENAI_LATENCY = Histogram("mind9_openai_request_seconds", "OpenAI API call latency")
+STAGE_LATENCY = Histogram("mind9_pipeline_stage_seconds", "Tweet pipeline stage latency (text, image, upload, post)")
+STAGE_ERRORS = Counter("mind9_pipeline_stage_errors_total", "Tweet pipeline stage failures and timeouts")
+DB_QUERY_LATENCY = Histogram("mind9_db_query_seconds", "Database query latency by pool and label")
+RPC_LATENCY = Histogram("mind9_solana_rpc_seconds", "Solana JSON-RPC round-trip latency by method")
+HTTP_LATENCY = Histogram("mind9_http_request_seconds", "HTTP handler time by route and method")
+HTTP_REQUESTS = Counter("mind9_http_requests_total", "HTTP responses by route and status")
+CACHE_LOOKUPS = Counter("mind9_cache_lookups_total", "Cache lookups by cache and result")
+RESTARTS = Counter("mind9_child_restarts_total", "Supervised child restarts")
+HANG_KILLS = Counter("mind9_child_hang_kills_total", "Supervised children killed for missing heartbeats")
+STATUS_BUILD_LATENCY = Histogram("mind9_status_build_seconds", "TwitterMonitor status snapshot rebuild time")
+LOG_ERRORS = Counter("mind9_log_errors_total", "Log records at ERROR or above, by logger")
+
+class ErrorCountingHandler(logging.Handler):
+    """Counts ERROR and CRITICAL records so every logged failure shows up as a metric"""
+
+    # Survives setup_logging() replacing the root handlers
+    persistent = True
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+
+    def emit(self, record):
+        LOG_ERRORS.inc(logger=record.name)
+
+def snapshot_path(process_name, directory=METRICS_DIR):
+    return os.path.join(directory, f"{process_name}.json")
+
+def write_snapshot(process_name, registry=None, directory=METRICS_DIR):
+    """Write this process's metrics for the HTTP server to merge into /metrics"""
+    from atomic_io import write_atomic
+    os.makedirs(directory, exist_ok=True)
+    snapshot = {"pid": os.getpid(), "time": time.time(), "families": (registry or REGISTRY).collect()}
+    write_atomic(snapshot_path(process_name, directory), json.dumps(snapshot).encode(), fsync=False)
+
+def read_snapshots(directory=METRICS_DIR, stale_after=METRICS_STALE_AFTER):
+    """Return families from other processes' snapshots, each sample labelled with its process"""
+    families = []
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        return families
+    now = time.time()
+    for filename in names:
+        if not filename.endswith(".json"):
+            continue
+        process_name = filename[:-len(".json")]
+        try:
+            with open(os.path.join(directory, filename), 'r') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if now - snapshot.get("time", 0) > stale_after:
+            continue
+        for name, metric_type, help, samples in snapshot["families"]:
+            families.append((name, metric_type, help, [
+                (sample_name, dict(labels, process=process_name), value) for sample_name, labels, value in samples
+            ]))
+    return families
+
+def merge_families(families):
+    """Combine families with the same name so each HELP/TYPE header appears once"""
+    merged = {}
+    for name, metric_type, help, samples in families:
+        if name in merged:
+            merged[name][3].extend(samples)
+        else:
+            merged[name] = (name, metric_type, help, list(samples))
+    return list(merged.values())
+
+class SnapshotExporter:
+    """Background thread that writes the registry snapshot every METRICS_FLUSH_INTERVAL"""
+
+    def __init__(self, process_name, interval=METRICS_FLUSH_INTERVAL, registry=None):
+        self.process_name = process_name
+        self.interval = interval
+        self.registry = registry or REGISTRY
+        self.stop_event = threading.Event()
+
+    def flush(self):
+        try:
+            write_snapshot(self.process_name, self.registry)
+        except Exception as e:
+            logging.getLogger("metrics").warning(f"Could not write metrics snapshot: {e}")
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            self.flush()
+
+    def start(self):
+        self.flush()
+        threading.Thread(target=self.run, name="metrics-exporter", daemon=True).start()
+        atexit.register(self.flush)
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        self.flush()
+
+_exporter = None
+
+def start_exporter(process_name):
+    """Export this process's metrics under 'process_name' and count logged errors; idempotent"""
+    global _exporter
+    if _exporter is None:
+        from async_logging import logging_stats
+        REGISTRY.add_collector(stats_collector("mind9_log_queue", logging_stats, "Async log queue",
+                                               counters=("enqueued", "dropped")))
+        logging.getLogger().addHandler(ErrorCountingHandler())
+        _exporter = SnapshotExporter(process_name).start()
+    return _exporter
+
+# Tracing
+
+_current_span = contextvars.ContextVar("mind9_span", default=None)
+
+def coin_trace_id(coin):
+    """Deterministic trace id for a coin, so the minting and announcing processes share a trace"""
+    identity = coin.get("mint_address") or coin.get("id") or coin.get("symbol")
+    return hashlib.sha256(f"coin:{identity}".encode()).hexdigest()[:32]
+
+class Span:
+    def __init__(self, name, trace_id, parent_id, attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start = time.time()
+        self.duration = None
+        self.error = None
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration": self.duration,
+            "error": self.error,
+            "attributes": self.attributes
+        }
+
+_trace_lock = threading.Lock()
+
+def _record_span(span):
+    os.makedirs(os.path.dirname(TRACE_FILE) or ".", exist_ok=True)
+    line = json.dumps(span.to_dict(), default=str) + "\n"
+    with _trace_lock:
+        with open(TRACE_FILE, 'a') as f:
+            f.write(line)
+
+def event(name, trace_id, **attributes):
+    """Record a zero-length span marking a point in a trace (e.g. a coin being minted)"""
+    if not TRACE_ENABLED:
+        return
+    marker = Span(name, trace_id, None, attributes)
+    marker.duration = 0.0
+    try:
+        _record_span(marker)
+    except OSError:
+        pass
+
+@contextmanager
+def span(name, trace_id=None, **attributes):
+    """Trace the with-block when MIND9_TRACE is on; spans nest through contextvars.
+
+    Nested spans inherit the enclosing trace id; pass trace_id (e.g.
+    coin_trace_id(coin)) to start or join a specific trace. Finished spans are
+    appended to MIND9_TRACE_FILE as JSON lines.
+    """
+    if not TRACE_ENABLED:
+        yield None
+        return
+    parent = _current_span.get()
+    trace_id = trace_id or (parent.trace_id if parent else uuid.uuid4().hex)
+    current = Span(name, trace_id, parent.span_id if parent and parent.trace_id == trace_id else None, attributes)
+    token = _current_span.set(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.duration = time.perf_counter() - start
+        _current_span.reset(token)
+        try:
+            _record_span(current)
+        except OSError:
+            pass
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Cycle Profiling for Mind9
+An opt-in sampling profiler that keeps the last few minutes of stacks in a ring
+buffer and dumps them as collapsed stacks (flamegraph.pl / speedscope input)
+when a work cycle runs over its heartbeat budget, stalls, or the process
+crashes, plus tracemalloc diffs between cycles to catch memory growth
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+import traceback
+from collections import deque, Counter as _Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+import heartbeat
+from atomic_io import write_atomic
+
+logger = logging.getLogger("profiling")
+
+# Off unless MIND9_PROFILE is set; run_mind9.py --profile sets it for the Mind9 child
+PROFILE_ENABLED = os.environ.get("MIND9_PROFILE", "").lower() in ("1", "true", "yes")
+PROFILE_DIR = os.environ.get("MIND9_PROFILE_DIR", "logs/profiles")
+PROFILE_SAMPLE_INTERVAL = float(os.environ.get("MIND9_PROFILE_INTERVAL", 0.01))
+PROFILE_WINDOW = float(os.environ.get("MIND9_PROFILE_WINDOW", 120))
+# Never dump more than once per this many seconds for the same reason
+PROFILE_DUMP_COOLDOWN = float(os.environ.get("MIND9_PROFILE_COOLDOWN", 60))
+PROFILE_KEEP = int(os.environ.get("MIND9_PROFILE_KEEP", 50))
+# Budget for a cycle that doesn't announce one with heartbeat beat(expect=...)
+CYCLE_BUDGET = float(os.environ.get("MIND9_CYCLE_BUDGET", 30))
+
+TRACEMALLOC_ENABLED = os.environ.get("MIND9_TRACEMALLOC", "").lower() in ("1", "true", "yes")
+TRACEMALLOC_FRAMES = int(os.environ.get("MIND9_TRACEMALLOC_FRAMES", 1))
+# Report a cycle whose net allocations grew by more than this
+MEMORY_GROWTH_BYTES = int(os.environ.get("MIND9_MEMORY_GROWTH_BYTES", 1024 * 1024))
+
+class SamplingProfiler:
+    """Samples every thread's stack at a fixed interval into a time-bounded ring buffer.
+
+    Sampling runs in a daemon thread using sys._current_frames(), so the profiled
+    code is untouched; the cost is one stack walk per thread per interval.
+    Samples are stored pre-collapsed ("thread;file:function;...") so a dump is a
+    count over the buffer.
+    """
+
+    def __init__(self, interval=PROFILE_SAMPLE_INTERVAL, window=PROFILE_WINDOW):
+        self.interval = interval
+        self.window = window
+        self.samples = deque(maxlen=max(1, int(window / interval)))
+        self.labels = {}
+        self.ticks = []
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def _label(self, code):
+        label = self.labels.get(code)
+        if label is None:
+            label = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+            self.labels[code] = label
+        return label
+
+    def sample(self):
+        """Take one sample of every thread except the sampler"""
+        now = time.monotonic()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(ident, str(ident)))
+            stack.reverse()
+            self.samples.append((now, ";".join(stack)))
+        for tick in self.ticks:
+            tick(now)
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"Profiler sample failed: {e}")
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="profiler", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=1)
+
+    def collapsed(self, seconds=None):
+        """Collapsed-stack lines ('stack count') for the last 'seconds' of samples"""
+        since = time.monotonic() - seconds if seconds else float("-inf")
+        counts = _Counter(stack for when, stack in list(self.samples) if when >= since)
+        return [f"{stack} {count}" for stack, count in counts.most_common()]
+
+def _prune(directory, keep):
+    try:
+        names = sorted(name for name in os.listdir(directory) if not name.startswith("."))
+    except OSError:
+        return
+    for name in names[:-keep] if keep else []:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+
+class CycleProfiler:
+    """Watches a process's heartbeats and writes profiles when something goes wrong.
+
+    The gap between two beats is a cycle; its budget is the 'expect' the
+    previous beat announced (or the heartbeat interval). A cycle that runs over
+    budget gets a slow-cycle dump of its samples when it ends, and the sampler
+    writes a stall dump as soon as the open cycle passes its budget, well before
+    the supervisor's hang kill at HANG_FACTOR times the budget. Beats that count
+    a finished cycle (beat(cycles=1)) also trigger a tracemalloc diff. Loops that
+    don't beat mark their iterations with cycle() instead.
+    """
+
+    def __init__(self, name, directory=PROFILE_DIR, interval=PROFILE_SAMPLE_INTERVAL, window=PROFILE_WINDOW,
+                 cooldown=PROFILE_DUMP_COOLDOWN, keep=PROFILE_KEEP, tracemalloc_frames=None,
+                 growth_threshold=MEMORY_GROWTH_BYTES):
+        self.name = name
+        self.directory = directory
+        self.cooldown = cooldown
+        self.keep = keep
+        self.growth_threshold = growth_threshold
+        self.sampler = SamplingProfiler(interval, window)
+        self.sampler.ticks.append(self.check_stall)
+        self.last_dump = {}
+        self.dumps = 0
+        # Guards the open cycle, updated from the beating thread and the sampler thread
+        self.lock = threading.Lock()
+
+        # The open cycle: when it started (None until the first beat), its budget and
+        # whether a stall dump was written
+        self.cycle_started = None
+        self.cycle_budget = CYCLE_BUDGET
+        self.stall_reported = False
+        self.started = time.monotonic()
+        self.cycles_seen = 0
+        self.idle_reported = False
+
+        self.tracemalloc_frames = tracemalloc_frames
+        self.snapshot = None
+        self.fault_file = None
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        import faulthandler
+        # Fatal signals (segfaults, aborts) write every thread's traceback here
+        self.fault_file = open(os.path.join(self.directory, f".{self.name}-faults.log"), 'a')
+        faulthandler.enable(self.fault_file, all_threads=True)
+
+        if self.tracemalloc_frames:
+            import tracemalloc
+            tracemalloc.start(self.tracemalloc_frames)
+            self.snapshot = self._take_snapshot()
+
+        heartbeat.BEAT_LISTENERS.append(self.on_beat)
+        self.started = time.monotonic()
+        self.sampler.start()
+        logger.info(f"Profiling {self.name}: sampling every {self.sampler.interval * 1000:.0f} ms, "
+                    f"dumps in {self.directory}" + (", tracemalloc on" if self.tracemalloc_frames else ""))
+        return self
+
+    def stop(self):
+        if self.on_beat in heartbeat.BEAT_LISTENERS:
+            heartbeat.BEAT_LISTENERS.remove(self.on_beat)
+        self.sampler.stop()
+        if self.fault_file:
+            import faulthandler
+            faulthandler.disable()
+            self.fault_file.close()
+            self.fault_file = None
+
+    def _output_path(self, reason, suffix):
+        # Millisecond timestamps keep names unique and sort oldest first for pruning
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")[:-3]
+        return os.path.join(self.directory, f"{stamp}-{self.name}-{reason}{suffix}")
+
+    def dump(self, reason, seconds=None, note=None):
+        """Write the last 'seconds' of samples (all of them if None) as a .folded file; returns its path"""
+        now = time.monotonic()
+        with self.lock:
+            if now - self.last_dump.get(reason, float("-inf")) < self.cooldown:
+                return None
+            self.last_dump[reason] = now
+        lines = self.sampler.collapsed(seconds)
+        if not lines:
+            return None
+        path = self._output_path(reason, ".folded")
+        header = f"# {self.name} {reason} at {datetime.now().isoformat()}" + (f": {note}" if note else "")
+        try:
+            write_atomic(path, ("\n".join([header] + lines) + "\n").encode(), fsync=False)
+        except OSError as e:
+            logger.warning(f"Could not write profile {path}: {e}")
+            return None
+        self.dumps += 1
+        _prune(self.directory, self.keep)
+        logger.warning(f"Wrote {reason} profile to {path}" + (f" ({note})" if note else ""))
+        return path
+
+    def _end_cycle(self, now):
+        """Close the open cycle (caller holds self.lock); returns (elapsed, budget) if it ran over"""
+        if self.cycle_started is None:
+            return None
+        elapsed = now - self.cycle_started
+        return (elapsed, self.cycle_budget) if elapsed > self.cycle_budget else None
+
+    def _begin_cycle(self, now, budget):
+        self.cycle_started = now
+        self.cycle_budget = budget or CYCLE_BUDGET
+        self.stall_reported = False
+        self.cycles_seen += 1
+
+    def _report_slow(self, slow):
+        if slow:
+            elapsed, budget = slow
+            # Cover the whole cycle plus a little lead-in
+            self.dump("slow", seconds=elapsed + 1, note=f"cycle took {elapsed:.1f}s against a {budget:.1f}s budget")
+
+    def on_beat(self, allowed, increments):
+        """Heartbeat listener: each beat closes the open cycle and starts the next"""
+        now = time.monotonic()
+        with self.lock:
+            slow = self._end_cycle(now)
+            self._begin_cycle(now, allowed)
+        self._report_slow(slow)
+        if increments.get("cycles") and self.tracemalloc_frames:
+            self.diff_memory()
+
+    def check_stall(self, now):
+        """Called by the sampler: dump once while the open cycle is over budget"""
+        with self.lock:
+            if self.cycles_seen == 0 and not self.idle_reported and now - self.started > CYCLE_BUDGET:
+                # Without beats or cycle() blocks there is nothing to measure against
+                self.idle_reported = True
+                logger.warning(f"No work cycles seen in {self.name} after {CYCLE_BUDGET:.0f}s; slow-cycle and "
+                               f"stall dumps need its loop to beat or run inside profiling.cycle()")
+            started = self.cycle_started
+            if started is None or self.stall_reported:
+                return
+            elapsed = now - started
+            if elapsed <= self.cycle_budget:
+                return
+            self.stall_reported = True
+            budget = self.cycle_budget
+        self.dump("stall", seconds=elapsed + 1, note=f"no heartbeat for {elapsed:.1f}s against a {budget:.1f}s budget")
+
+    @contextmanager
+    def cycle(self, budget=CYCLE_BUDGET):
+        """Profile an explicit block of work as one cycle, for loops that don't beat"""
+        with self.lock:
+            self._begin_cycle(time.monotonic(), budget)
+        try:
+            yield
+        finally:
+            with self.lock:
+                slow = self._end_cycle(time.monotonic())
+                # Time between explicit cycles is idle, not a cycle of its own
+                self.cycle_started = None
+            self._report_slow(slow)
+            if self.tracemalloc_frames:
+                self.diff_memory()
+
+    def crashed(self, exc_info=None):
+        """Dump the full buffer and the exception after an unhandled error"""
+        exc_info = exc_info or sys.exc_info()
+        note = "".join(traceback.format_exception_only(exc_info[0], exc_info[1])).strip() if exc_info[0] else None
+        return self.dump("crash", note=note)
+
+    def _take_snapshot(self):
+        import tracemalloc
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            # The sample buffer fills up to its window; that isn't the loop leaking
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+
+    def diff_memory(self, top=15):
+        """Compare allocations with the previous cycle; report when they grew past the threshold"""
+        snapshot = self._take_snapshot()
+        previous, self.snapshot = self.snapshot, snapshot
+        if previous is None:
+            return None
+        stats = snapshot.compare_to(previous, "traceback" if self.tracemalloc_frames > 1 else "lineno")
+        growth = sum(stat.size_diff for stat in stats)
+        if growth <= self.growth_threshold:
+            return growth
+        lines = [f"# {self.name} memory grew {growth / 1024:.1f} KiB since the previous cycle"]
+        for stat in stats[:top]:
+            lines.append(str(stat))
+            if self.tracemalloc_frames > 1:
+                lines.extend(f"    {line}" for line in stat.traceback.format())
+        path = self._output_path("memory", ".txt")
+        try:
+            write_atomic(path, ("\n".join(lines) + "\n").encode(), fsync=False)
+            _prune(self.directory, self.keep)
+        except OSError as e:
+            logger.warning(f"Could not write memory diff {path}: {e}")
+        logger.warning(f"Memory grew {growth / 1024:.1f} KiB during the last cycle; top allocations in {path}")
+        return growth
+
+_active = None
+
+def start_from_env(name):
+    """Start the cycle profiler for this process if MIND9_PROFILE is set; returns it or None"""
+    global _active
+    if not PROFILE_ENABLED or _active is not None:
+        return _active
+    _active = CycleProfiler(name, tracemalloc_frames=TRACEMALLOC_FRAMES if TRACEMALLOC_ENABLED else None)
+    return _active.start()
+
+def active():
+    return _active
+
+def cycle(budget=CYCLE_BUDGET):
+    """Profile one iteration of a work loop with the active profiler; a no-op when profiling is off.
+
+    Loops that don't beat a heartbeat (like Mind9's) wrap each iteration in this so
+    slow cycles and stalls are detected.
+    """
+    return _active.cycle(budget) if _active is not None else nullcontext()
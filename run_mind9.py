@@ -4,88 +4,75 @@ Running Script for Mind9 Core System
 Provides continuous execution with auto-restart capability for Replit environment
 """
 
+# Profile from the first import on when run with --profile-startup
+import startup
+startup.profile_from_argv()
+
 import os
 import sys
-import time
-import subprocess
 import logging
 import signal
-import traceback
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("logs/mind9_runner.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("mind9_runner")
 
-# Status file
-STATUS_FILE = ".mind9_running"
+def configure_logging():
+    from async_logging import setup_logging
+    setup_logging(files=[("logs/mind9_runner.log", logging.INFO)])
 
-# Create status file to indicate the service is running
-def create_status_file():
-    with open(STATUS_FILE, 'w') as f:
-        f.write(f"{time.time()}")
+# Control socket of the supervisor this runner starts
+CONTROL_SOCKET = ".mind9_supervisor.sock"
 
-# Check if status file exists
+# A runner is alive if its supervisor answers on the control socket
 def is_running():
-    return os.path.exists(STATUS_FILE)
+    from supervisor import send_command
+    return send_command("status", CONTROL_SOCKET, timeout=1.0) is not None
+    
+# --profile samples the Mind9 child and dumps collapsed stacks on crashes, and on slow
+# cycles and stalls of iterations run inside profiling.cycle(); --tracemalloc also
+# diffs allocations between cycles (see profiling.py)
+def profiling_from_argv(argv=None):
+    argv = sys.argv if argv is None else argv
+    if "--tracemalloc" in argv:
+        argv.remove("--tracemalloc")
+        os.environ["MIND9_TRACEMALLOC"] = "1"
+        os.environ["MIND9_PROFILE"] = "1"
+    if "--profile" in argv:
+        argv.remove("--profile")
+        os.environ["MIND9_PROFILE"] = "1"
     
 # Register signal handlers
 def handle_exit(signum, frame):
     logger.info(f"Received signal {signum}, shutting down...")
-    if os.path.exists(STATUS_FILE):
-        os.remove(STATUS_FILE)
     sys.exit(0)
 
-# Register handlers for common signals
-signal.signal(signal.SIGINT, handle_exit)
-signal.signal(signal.SIGTERM, handle_exit)
-
 def run_with_restart():
     """Run Mind9 core system with automatic restart capability"""
-    create_status_file()
-    logger.info("Starting Mind9 core system runner in continuous mode")
+    # Before the supervisor starts, so the forkserver and its children inherit it
+    profiling_from_argv()
+    configure_logging()
+    
+    # Register handlers for common signals
+    signal.signal(signal.SIGINT, handle_exit)
+    signal.signal(signal.SIGTERM, handle_exit)
     
-    restart_count = 0
-    max_restarts = 100  # Prevent infinite restart loops
+    if is_running():
+        logger.info("Mind9 core system runner is already running")
+        return
+    logger.info("Starting Mind9 core system runner in continuous mode")
     
     try:
-        while is_running() and restart_count < max_restarts:
-            logger.info(f"Starting Mind9 core system (restart count: {restart_count})")
-            
-            # Run the Mind9 module
-            start_time = time.time()
-            try:
-                logger.info("Importing and running main Mind9 module")
-                from main import Mind9
-                mind9 = Mind9()
-                mind9.run()
-            except Exception as e:
-                error_message = f"Mind9 core system crashed: {str(e)}"
-                logger.error(error_message)
-                logger.error(traceback.format_exc())
-                
-                # Check if we need to wait before restarting
-                runtime = time.time() - start_time
-                if runtime < 60:  # Less than 1 minute
-                    logger.warning("Process crashed too quickly, waiting 60 seconds before restart")
-                    time.sleep(60)
-                
-                restart_count += 1
-                continue
+        # Mind9 runs in a child forked from a preloaded forkserver, so a crash never
+        # leaves a half-initialised module behind and restarts skip the heavy imports
+        from supervisor import Supervisor, CHILDREN
+        supervisor = Supervisor([CHILDREN["mind9"]()], control=CONTROL_SOCKET)
+        startup.mark_ready()
+        supervisor.run()
+        logger.info(f"Restart statistics: {supervisor.stats()}")
     
     except Exception as e:
-        logger.critical(f"Runner crashed: {str(e)}")
-        logger.critical(traceback.format_exc())
+        logger.critical(f"Runner crashed: {str(e)}", exc_info=True)
     
     finally:
-        if os.path.exists(STATUS_FILE):
-            os.remove(STATUS_FILE)
         logger.info("Mind9 core system runner stopped")
 
 if __name__ == "__main__":
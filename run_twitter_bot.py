@@ -9,40 +9,37 @@ This enhanced version includes:
 - Heartbeat monitoring to ensure continuous operation
 """
 
+# Profile from the first import on when run with --profile-startup
+import startup
+startup.profile_from_argv()
+
 import os
 import sys
 import time
 import logging
 
-# Handle dotenv import - we installed this package
-try:
-    from dotenv import load_dotenv
-except ImportError:
-    # Create a fallback if dotenv module is not available
-    def load_dotenv():
-        print("Warning: python-dotenv not available, using basic env loading")
-        return True
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-# Add file handlers separately
+# openai, tweepy, solana, numpy and Pillow only load when the bot first uses them
+startup.defer_imports()
+
 logger = logging.getLogger("mind9_twitter_bot_runner")
-file_handler = logging.FileHandler("twitter_bot.log")
-file_handler.setLevel(logging.INFO)
-error_handler = logging.FileHandler("twitter_bot_error.log")
-error_handler.setLevel(logging.ERROR)
-stream_handler = logging.StreamHandler()
 
-# Add handlers to logger
-logger.addHandler(file_handler)
-logger.addHandler(error_handler)
-logger.addHandler(stream_handler)
+def configure_logging():
+    """Console logging plus the bot's info and error log files, written off the hot path"""
+    from async_logging import setup_logging, file_handler
+    setup_logging(files=[
+        ("twitter_bot.log", logging.INFO),
+        # Always plain text: TwitterMonitor indexes this file by its line format
+        file_handler("twitter_bot_error.log", logging.ERROR, json_lines=False)
+    ])
 
-# Load environment variables
-load_dotenv()
+def load_environment():
+    """Load environment variables from .env"""
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        print("Warning: python-dotenv not available, using basic env loading")
+        return
+    load_dotenv()
 
 def check_api_keys():
     """Check if necessary API keys are available"""
@@ -69,7 +66,75 @@ def check_api_keys():
     
     # The bot can still run, but will have limited functionality if keys are missing
 
+def check_database(bot):
+    """Report on the database the bot actually uses, without creating anything"""
+    # The bot's own coin checker connection is authoritative when it has one
+    coin_checker = getattr(bot, "coin_checker", None)
+    if coin_checker is not None:
+        if getattr(coin_checker, "connection", None):
+            logger.info("Database status: Connected to production database")
+        else:
+            logger.warning("Database status: Connection not established")
+        return
+
+    dsn = os.environ.get("DATABASE_URL") or os.environ.get("COIN_DB_PATH", "mind9_coins.db")
+    try:
+        from db_pool import get_pool, is_postgres_dsn
+        if not is_postgres_dsn(dsn) and not os.path.exists(dsn):
+            logger.warning(f"Database status: {dsn} not found")
+            return
+        pool = get_pool("health", dsn=dsn, create=False, min_size=0, max_size=1, connect_retries=1)
+        if pool.healthy():
+            logger.info(f"Database status: Connected to {'PostgreSQL' if is_postgres_dsn(dsn) else dsn}")
+        else:
+            logger.warning("Database status: Connection not established")
+    except Exception as e:
+        logger.warning(f"Database status: Could not verify connection - {str(e)}")
+
+def flush_state_on_signals(bot):
+    """Have the bot's BotStateStore flush pending changes on SIGTERM.
+
+    Signal handling is process-wide, so the store leaves it to the entry point. TwitterBot
+    opts in by exposing its store as state_store; returns True if a handler was installed.
+    """
+    store = getattr(bot, "state_store", None)
+    if store is None or not hasattr(store, "flush_on_signals"):
+        logger.info("State store: no state_store on TwitterBot, not flushing on SIGTERM")
+        return False
+    store.flush_on_signals()
+    return True
+
+def start_coin_watcher(bot, continuous=True):
+    """Hand newly minted coins to the bot as soon as a coin event arrives.
+
+    TwitterBot opts in by defining handle_new_coins(coins), which receives the coin
+    dicts changed since the previous call; the watcher wakes on events published by
+    CoinStore writes and polls with backoff (30 s up to 15 min) otherwise. Without
+    that method the bot keeps its own coin checks. Returns the watcher or None.
+    """
+    handle = getattr(bot, "handle_new_coins", None)
+    if handle is None or not continuous:
+        logger.info("New coins: checked by TwitterBot itself (no handle_new_coins)")
+        return None
+    try:
+        from coin_store import CoinStore, COIN_DB_PATH
+        from coin_events import CoinWatcher, store_change_checker
+        if not os.path.exists(COIN_DB_PATH):
+            raise FileNotFoundError(f"{COIN_DB_PATH} not found")
+        watcher = CoinWatcher(store_change_checker(CoinStore(COIN_DB_PATH)), handle, name="twitter_bot")
+    except Exception as e:
+        logger.warning(f"New coins: event watcher unavailable, TwitterBot checks itself - {e}")
+        return None
+    watcher.start()
+    logger.info("New coins: announced on coin events, polling with backoff otherwise")
+    return watcher
+
 def main():
+    configure_logging()
+    load_environment()
+    from metrics import start_exporter
+    start_exporter("twitter_bot")
+    
     # Display banner
     print("""
     ╔═════════════════════════════════════════════╗
@@ -87,7 +152,7 @@ def main():
     logger.info("Bot Configuration:")
     logger.info("* Maximum 2 tweets per day")
     logger.info("* 3-hour minimum between tweets")
-    logger.info("* Checks for new coins every 15 minutes")
+    logger.info("* New coins picked up on coin events when the bot supports it")
     logger.info("* Tweet schedule: 8:30am, 1:15pm, 5:45pm, 10:00pm")
     logger.info("* New coins announced immediately")
     logger.info("------------------------------")
@@ -127,14 +192,8 @@ def main():
         logger.info("Initializing Twitter bot...")
         bot = TwitterBot()
         
-        # Database status check
-        try:
-            if bot.coin_checker and bot.coin_checker.connection:
-                logger.info("Database status: Connected to production database")
-            else:
-                logger.warning("Database status: Connection not established")
-        except Exception as e:
-            logger.warning(f"Database status: Could not verify connection - {str(e)}")
+        check_database(bot)
+        flush_state_on_signals(bot)
         
         # Twitter API status check
         try:
@@ -153,8 +212,15 @@ def main():
         else:
             logger.info("Starting bot in continuous mode...")
         
+        watcher = start_coin_watcher(bot, continuous=not single_run)
+        
         # Run the bot
-        bot.run(continuous=not single_run)
+        startup.mark_ready()
+        try:
+            bot.run(continuous=not single_run)
+        finally:
+            if watcher:
+                watcher.stop()
     except ImportError as e:
         logger.error(f"Failed to import TwitterBot: {e}")
         logger.error("Make sure the twitter_bot.py file exists")
@@ -6,79 +6,990 @@ This provides a basic HTTP server when Node.js is not available
 import http.server
 import socketserver
 import os
+import re
 import json
+import gzip
+import hashlib
+import mimetypes
+import email.utils
+from stat import S_ISREG
+import signal
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from urllib.parse import urlsplit, parse_qs, unquote
+from contextlib import contextmanager
 import sys
 
+import metrics
+from coin_events import CoinEventListener
+from coin_store import CoinStore, COIN_DB_PATH, COINS_CHANGED_FILE
+
+# Brotli is optional; gzip is always available
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 # Set the port where the server will run
 PORT = int(os.environ.get('PORT', 5000))
 HOST = os.environ.get('HOST', '0.0.0.0')
 
+# Concurrency settings
+SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', 32))
+KEEPALIVE_TIMEOUT = float(os.environ.get('KEEPALIVE_TIMEOUT', 5))
+DRAIN_TIMEOUT = float(os.environ.get('DRAIN_TIMEOUT', 10))
+# Connections allowed to wait for a worker; beyond this new connections get a 503
+SERVER_QUEUE_SIZE = int(os.environ.get('SERVER_QUEUE_SIZE', 64))
+# How often an idle keep-alive connection checks whether others are waiting for its worker
+KEEPALIVE_POLL = float(os.environ.get('KEEPALIVE_POLL', 0.1))
+
+# Image cache settings
+IMAGE_CACHE_BYTES = int(os.environ.get('IMAGE_CACHE_BYTES', 64 * 1024 * 1024))
+IMAGE_CACHE_MAX_ENTRY_BYTES = int(os.environ.get('IMAGE_CACHE_MAX_ENTRY_BYTES', 8 * 1024 * 1024))
+IMAGE_CACHE_REVALIDATE = float(os.environ.get('IMAGE_CACHE_REVALIDATE', 2))
+
+# Coin listing cache settings
+COINS_CACHE_TTL = float(os.environ.get('COINS_CACHE_TTL', 60))
+COINS_CACHE_CHECK = float(os.environ.get('COINS_CACHE_CHECK', 1))
+
 # Path to serve
 STATIC_DIR = Path("./public").absolute()
 GENERATED_IMAGES_DIR = Path("./generated_images").absolute()
 
+# Long-lived caching for content-hashed image names such as velo-8a384b05.png
+HASHED_NAME_PATTERN = re.compile(r'-[0-9a-f]{8,}\.[A-Za-z0-9]+$')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+DEFAULT_CACHE_CONTROL = 'public, max-age=300'
+
+# Static asset manifest settings
+STATIC_MAX_FILE_BYTES = int(os.environ.get('STATIC_MAX_FILE_BYTES', 8 * 1024 * 1024))
+STATIC_COMPRESS_MIN_BYTES = int(os.environ.get('STATIC_COMPRESS_MIN_BYTES', 512))
+STATIC_WATCH_INTERVAL = float(os.environ.get('STATIC_WATCH_INTERVAL', 2))
+STATIC_BROTLI_QUALITY = int(os.environ.get('STATIC_BROTLI_QUALITY', 11))
+# Serve index.html for extensionless paths so client-side routes survive a reload
+SPA_FALLBACK = os.environ.get('SPA_FALLBACK', '1').lower() not in ('0', 'false', 'no')
+
+# Vite emits bundles as assets/<name>-<8 char base64url hash>.<ext>
+STATIC_HASHED_PATTERN = re.compile(r'^/assets/.+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$')
+HTML_CACHE_CONTROL = 'no-cache'
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'application/manifest+json',
+                      'application/xml', 'image/svg+xml', 'application/wasm')
+
+IMAGE_CONTENT_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+}
+
+def load_image_info(filename):
+    """Stat a generated image and build its response metadata, or return None if it is missing"""
+    if not filename or filename.startswith('.'):
+        return None
+    image_path = GENERATED_IMAGES_DIR / filename
+    try:
+        stat = image_path.stat()
+    except OSError:
+        return None
+    if not S_ISREG(stat.st_mode):
+        return None
+    
+    suffix = os.path.splitext(filename)[1].lower()
+    return {
+        "path": str(image_path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "etag": f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"',
+        "last_modified": email.utils.formatdate(stat.st_mtime, usegmt=True),
+        "content_type": IMAGE_CONTENT_TYPES.get(suffix, 'application/octet-stream'),
+        "cache_control": IMMUTABLE_CACHE_CONTROL if HASHED_NAME_PATTERN.search(filename) else DEFAULT_CACHE_CONTROL,
+    }
+
+class ImageCache:
+    """Byte-bounded LRU cache of generated image bodies and their response metadata.
+    
+    Entries are revalidated with a stat() at most once per revalidate interval, so a
+    hot image is served from memory without touching the filesystem in between.
+    """
+    
+    def __init__(self, max_bytes=IMAGE_CACHE_BYTES, max_entry_bytes=IMAGE_CACHE_MAX_ENTRY_BYTES,
+                 revalidate=IMAGE_CACHE_REVALIDATE):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.revalidate = revalidate
+        self.entries = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.lock = threading.Lock()
+    
+    def get(self, filename):
+        """Return image metadata (with 'body' when cached in memory), or None if the file is missing"""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(filename)
+            if entry and now - entry['checked'] < self.revalidate:
+                self.entries.move_to_end(filename)
+                self.hits += 1
+                return entry
+        
+        info = load_image_info(filename)
+        
+        with self.lock:
+            entry = self.entries.get(filename)
+            if info is None:
+                if entry:
+                    self._remove(filename)
+                    self.invalidations += 1
+                self.misses += 1
+                return None
+            
+            # Unchanged on disk: keep the cached body and push the next check out
+            if entry and entry['size'] == info['size'] and entry['mtime'] == info['mtime']:
+                entry['checked'] = now
+                self.entries.move_to_end(filename)
+                self.hits += 1
+                return entry
+            
+            if entry:
+                self._remove(filename)
+                self.invalidations += 1
+            self.misses += 1
+        
+        if info['size'] > self.max_entry_bytes or info['size'] > self.max_bytes:
+            # Too big to be worth holding; the handler will stream it from disk
+            return info
+        
+        try:
+            with open(info['path'], 'rb') as file:
+                body = file.read()
+        except OSError:
+            return info
+        if len(body) != info['size']:
+            # The file changed between stat() and read(); serve it but don't cache it
+            return info
+        
+        info['body'] = body
+        info['checked'] = now
+        with self.lock:
+            if filename in self.entries:
+                self._remove(filename)
+            self.entries[filename] = info
+            self.current_bytes += info['size']
+            while self.current_bytes > self.max_bytes and self.entries:
+                oldest = next(iter(self.entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return info
+    
+    def _remove(self, filename):
+        entry = self.entries.pop(filename)
+        self.current_bytes -= entry['size']
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
+    
+    def stats(self):
+        """Get cache counters for monitoring"""
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self.entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes
+            }
+
+IMAGE_CACHE = ImageCache()
+metrics.REGISTRY.add_collector(metrics.stats_collector(
+    "mind9_image_cache", IMAGE_CACHE.stats, "Coin image cache",
+    counters=("hits", "misses", "evictions", "invalidations")
+))
+
+# Fallback listing used when coin_manager is not importable
+SAMPLE_COINS = [
+    {
+        "id": 1,
+        "name": "Velocity", 
+        "symbol": "VELO", 
+        "description": "A high-speed transaction token",
+        "mint_address": "8Xe5N4KF8PPtBvY9JvPBxiMv4zkzQ4RmMetgNuJRDXzR",
+        "image_path": "/img/coins/velo-8a384b05.png",
+        "minted": True,
+        "user_mintable": True,
+        "total_supply": "1,000,000"
+    }
+]
+
+def choose_encoding(accept_encoding):
+    """Pick the best response encoding the client accepts: br, then gzip, then identity"""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.lower()] = quality
+    
+    if brotli is not None and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    return 'identity'
+
+class CoinListing:
+    """Pre-serialised /api/coins responses backed by CoinManager.get_all_minted_coins().
+    
+    The coin list is loaded once and each (cursor, limit, fields, encoding) variant is
+    encoded and compressed the first time it is requested. Everything is dropped when
+    admin_create_coin or make_coin_mintable succeed on the wrapped manager, when the
+    change marker file is touched by a CoinStore write in another process, or after
+    COINS_CACHE_TTL seconds.
+    """
+    
+    def __init__(self, manager=None, ttl=COINS_CACHE_TTL, check_interval=COINS_CACHE_CHECK,
+                 marker=COINS_CHANGED_FILE, max_variants=256):
+        self.manager = manager
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self.marker = marker
+        self.max_variants = max_variants
+        self.coins = None
+        self.positions = {}
+        self.version = 0
+        self.loaded_at = 0
+        self.checked_at = 0
+        self.marker_mtime = None
+        self.responses = OrderedDict()
+        self.lock = threading.RLock()
+    
+    def attach(self, manager):
+        """Use this manager for listings and invalidate whenever it changes coin data"""
+        for method_name in ('admin_create_coin', 'make_coin_mintable'):
+            method = getattr(manager, method_name, None)
+            if method is None:
+                continue
+            
+            def wrapper(*args, _method=method, **kwargs):
+                result = _method(*args, **kwargs)
+                if result:
+                    self.invalidate()
+                return result
+            
+            setattr(manager, method_name, wrapper)
+        with self.lock:
+            self.manager = manager
+            self.invalidate()
+        return manager
+    
+    def invalidate(self):
+        with self.lock:
+            self.coins = None
+            self.responses.clear()
+    
+    def _marker_mtime(self):
+        try:
+            return os.stat(self.marker).st_mtime_ns
+        except OSError:
+            return None
+    
+    def _is_stale(self, now):
+        if self.coins is None or now - self.loaded_at > self.ttl:
+            return True
+        if now - self.checked_at < self.check_interval:
+            return False
+        self.checked_at = now
+        return self._marker_mtime() != self.marker_mtime
+    
+    def _load(self, now):
+        if self.manager is None:
+            try:
+                from coin_manager import CoinManager
+                self.attach(CoinManager())
+            except ImportError as e:
+                if os.path.exists(COIN_DB_PATH):
+                    # Read straight from the indexed coin store through the shared connection pool
+                    print(f"coin_manager not available, serving coins from {COIN_DB_PATH}")
+                    self.attach(CoinStore(COIN_DB_PATH))
+                else:
+                    print(f"coin_manager not available, serving sample coins: {e}")
+                    self.manager = False
+        
+        self.marker_mtime = self._marker_mtime()
+        coins = self.manager.get_all_minted_coins() if self.manager else SAMPLE_COINS
+        coins = list(coins or [])
+        
+        self.coins = coins
+        self.positions = {str(coin.get('id')): index for index, coin in enumerate(coins)}
+        self.version += 1
+        self.loaded_at = now
+        self.checked_at = now
+        self.responses.clear()
+    
+    def get_response(self, cursor=None, limit=None, fields=None, encoding='identity'):
+        """Return {'body', 'etag', 'next_cursor'} for the requested page, building it only on a miss"""
+        if limit is not None and limit <= 0:
+            raise ValueError("limit must be positive")
+        key = (cursor, limit, fields, encoding)
+        now = time.monotonic()
+        
+        with self.lock:
+            if self._is_stale(now):
+                try:
+                    self._load(now)
+                except Exception as e:
+                    # Keep serving the previous listing if the backing store is unavailable
+                    if self.coins is None:
+                        raise
+                    print(f"Error refreshing coin listing, serving cached copy: {e}")
+                    self.loaded_at = now
+            
+            response = self.responses.get(key)
+            if response:
+                self.responses.move_to_end(key)
+                return response
+            
+            coins = self.coins
+            version = self.version
+            if cursor is not None and cursor not in self.positions:
+                raise ValueError("Unknown cursor")
+            start = self.positions[cursor] + 1 if cursor is not None else 0
+        
+        page = coins[start:start + limit] if limit else coins[start:]
+        next_cursor = None
+        if limit and start + limit < len(coins):
+            next_cursor = str(page[-1].get('id'))
+        
+        if fields:
+            wanted = [name.strip() for name in fields.split(',') if name.strip()]
+            page = [{name: coin[name] for name in wanted if name in coin} for coin in page]
+        
+        body = json.dumps(page, default=str).encode()
+        if encoding == 'br':
+            body = brotli.compress(body)
+        elif encoding == 'gzip':
+            body = gzip.compress(body, compresslevel=6, mtime=0)
+        
+        response = {
+            "body": body,
+            "etag": f'"coins-{version}-{hashlib.md5(body).hexdigest()[:16]}"',
+            "next_cursor": next_cursor
+        }
+        with self.lock:
+            if self.version == version:
+                self.responses[key] = response
+                while len(self.responses) > self.max_variants:
+                    self.responses.popitem(last=False)
+        return response
+
+COIN_LISTING = CoinListing()
+
+class StaticManifest:
+    """In-memory manifest of every file under STATIC_DIR, keyed by URL path.
+    
+    Each asset holds ready-to-send variants (identity plus precompressed gzip and,
+    when brotli is installed, br) with strong content-hash ETags, so serving a page
+    is a dict lookup and a buffer write. refresh() rescans the tree and only reads
+    and recompresses files whose size or mtime changed; the new mapping is swapped
+    in whole, so lookups never take a lock.
+    """
+    
+    def __init__(self, root=STATIC_DIR, max_file_bytes=STATIC_MAX_FILE_BYTES,
+                 compress_min_bytes=STATIC_COMPRESS_MIN_BYTES, spa_fallback=SPA_FALLBACK):
+        self.root = Path(root)
+        self.max_file_bytes = max_file_bytes
+        self.compress_min_bytes = compress_min_bytes
+        self.spa_fallback = spa_fallback
+        self.assets = {}
+        self.builds = 0
+        self.files_loaded = 0
+        self.lock = threading.Lock()
+    
+    def _walk(self):
+        """Yield (url, path, stat) for regular, non-hidden files under the root"""
+        for directory, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [name for name in dirnames if not name.startswith('.')]
+            relative = os.path.relpath(directory, self.root)
+            prefix = '/' if relative == '.' else '/' + relative.replace(os.sep, '/') + '/'
+            for filename in filenames:
+                if filename.startswith('.'):
+                    continue
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if S_ISREG(stat.st_mode):
+                    yield prefix + filename, path, stat
+    
+    def _load(self, url, path, stat):
+        """Read one file and build its variants, or return None if it vanished"""
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json'):
+            content_type += '; charset=utf-8'
+        if url.endswith('.html'):
+            cache_control = HTML_CACHE_CONTROL
+        elif STATIC_HASHED_PATTERN.match(url):
+            cache_control = IMMUTABLE_CACHE_CONTROL
+        else:
+            cache_control = DEFAULT_CACHE_CONTROL
+        base = {
+            "path": path,
+            "mtime": stat.st_mtime,
+            "last_modified": email.utils.formatdate(stat.st_mtime, usegmt=True),
+            "content_type": content_type,
+            "cache_control": cache_control,
+        }
+        
+        if stat.st_size > self.max_file_bytes:
+            # Too big to hold in memory; streamed from disk with sendfile
+            identity = dict(base, size=stat.st_size, etag=f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"')
+            return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "variants": {"identity": identity}}
+        
+        try:
+            with open(path, 'rb') as file:
+                body = file.read()
+        except OSError:
+            return None
+        digest = hashlib.sha256(body).hexdigest()[:24]
+        variants = {"identity": dict(base, body=body, size=len(body), etag=f'"{digest}"')}
+        
+        if len(body) >= self.compress_min_bytes and content_type.startswith(COMPRESSIBLE_TYPES):
+            encoded = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                encoded["br"] = brotli.compress(body, quality=STATIC_BROTLI_QUALITY)
+            # Only keep compressed variants that save at least a tenth of the size
+            if encoded["gzip"] and len(encoded["gzip"]) < len(body) * 0.9:
+                for encoding, data in encoded.items():
+                    variants[encoding] = dict(base, body=data, size=len(data), etag=f'"{digest}-{encoding}"',
+                                              encoding=encoding)
+                for variant in variants.values():
+                    variant["vary"] = 'Accept-Encoding'
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "variants": variants}
+    
+    def refresh(self):
+        """Rescan the tree, reloading only changed files; returns (changed, removed)"""
+        with self.lock:
+            current = self.assets
+            assets = {}
+            changed = 0
+            for url, path, stat in self._walk():
+                asset = current.get(url)
+                if asset is None or asset['size'] != stat.st_size or asset['mtime_ns'] != stat.st_mtime_ns:
+                    asset = self._load(url, path, stat)
+                    if asset is None:
+                        continue
+                    changed += 1
+                assets[url] = asset
+            removed = len(current.keys() - assets.keys())
+            if changed or removed or not self.builds:
+                self.assets = assets
+                self.builds += 1
+                self.files_loaded += changed
+            return changed, removed
+    
+    def lookup(self, url_path):
+        """Return the asset for a request path, falling back to index.html for client-side routes"""
+        assets = self.assets
+        asset = assets.get(url_path)
+        if asset is not None:
+            return asset
+        if url_path.endswith('/'):
+            return assets.get(url_path + 'index.html')
+        asset = assets.get(url_path + '/index.html')
+        if (asset is None and self.spa_fallback and not url_path.startswith('/api/')
+                and '.' not in url_path.rsplit('/', 1)[-1]):
+            asset = assets.get('/index.html')
+        return asset
+    
+    def stats(self):
+        """Get manifest counters for monitoring"""
+        assets = self.assets
+        return {
+            "files": len(assets),
+            "bytes": sum(variant.get('size', 0) for asset in assets.values()
+                         for variant in asset['variants'].values() if 'body' in variant),
+            "builds": self.builds,
+            "files_loaded": self.files_loaded
+        }
+
+STATIC_ASSETS = StaticManifest()
+metrics.REGISTRY.add_collector(metrics.stats_collector(
+    "mind9_static_assets", STATIC_ASSETS.stats, "Precompressed static asset manifest",
+    counters=("builds", "files_loaded")
+))
+
+def route_label(path):
+    """Low-cardinality route name for request metrics"""
+    path = urlsplit(path).path
+    if path.startswith('/img/coins/'):
+        return 'coin_image'
+    if path in ('/api/coins', '/metrics'):
+        return path.strip('/').replace('/', '_')
+    return 'static'
+
 # Create the handler with custom directories
 class Mind9Handler(http.server.SimpleHTTPRequestHandler):
+    # Keep connections open between requests; idle sockets are dropped after KEEPALIVE_TIMEOUT
+    protocol_version = "HTTP/1.1"
+    timeout = KEEPALIVE_TIMEOUT
+    # Headers and body go out in separate writes; with Nagle on, every keep-alive
+    # response after the first waits for the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=str(STATIC_DIR), **kwargs)
     
+    def handle(self):
+        """Serve requests on this connection, giving the worker back as soon as it sits idle while others wait"""
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection:
+            if not self.wait_for_request():
+                self.close_connection = True
+                break
+            self.handle_one_request()
+    
+    def wait_for_request(self):
+        """Wait for the next keep-alive request; False once the connection should be closed instead"""
+        # A pipelined request may already sit in the read buffer, where select() can't see it
+        if self.has_buffered_input():
+            return True
+        deadline = time.monotonic() + self.timeout
+        while True:
+            if getattr(self.server, 'draining', False):
+                return False
+            claim = getattr(self.server, 'claim_idle_worker', None)
+            if claim is not None and claim():
+                # Someone is queued behind this idle connection; hand them the worker
+                return False
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self.connection.settimeout(min(remaining, KEEPALIVE_POLL))
+            try:
+                # Data or EOF; either way handle_one_request() takes it from here
+                self.connection.recv(1, socket.MSG_PEEK)
+                return True
+            except socket.timeout:
+                continue
+            except OSError:
+                return False
+            finally:
+                self.connection.settimeout(self.timeout)
+    
+    def has_buffered_input(self):
+        self.connection.settimeout(0.0)
+        try:
+            return bool(self.rfile.peek(1))
+        except (BlockingIOError, OSError):
+            return False
+        finally:
+            self.connection.settimeout(self.timeout)
+    
+    def handle_one_request(self):
+        super().handle_one_request()
+        # Stop reusing the connection once the server starts draining
+        if getattr(self.server, 'draining', False):
+            self.close_connection = True
+    
+    def send_response(self, code, message=None):
+        self.response_code = code
+        super().send_response(code, message)
+    
+    @contextmanager
+    def request_metrics(self):
+        """Time the handler and count the response by route and status"""
+        route = route_label(self.path)
+        self.response_code = None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            metrics.HTTP_LATENCY.observe(time.perf_counter() - start, route=route, method=self.command)
+            metrics.HTTP_REQUESTS.inc(route=route, status=self.response_code or 500)
+    
     def do_GET(self):
+        with self.request_metrics():
+            self.dispatch()
+
+    def do_HEAD(self):
+        # Same routing as GET so HEAD reports the status and headers GET would send
+        with self.request_metrics():
+            self.dispatch(head_only=True)
+    
+    def dispatch(self, head_only=False):
+        path = urlsplit(self.path).path
+        
         # Handle image paths
         if self.path.startswith('/img/coins/'):
             # Extract image filename from path
-            filename = os.path.basename(self.path)
-            image_path = GENERATED_IMAGES_DIR / filename
+            image = IMAGE_CACHE.get(os.path.basename(path))
             
             # If the file exists, serve it
-            if image_path.exists():
-                self.send_response(200)
-                if filename.endswith('.jpg') or filename.endswith('.jpeg'):
-                    self.send_header('Content-type', 'image/jpeg')
-                elif filename.endswith('.png'):
-                    self.send_header('Content-type', 'image/png')
-                else:
-                    self.send_header('Content-type', 'application/octet-stream')
-                self.end_headers()
-                
-                with open(image_path, 'rb') as file:
-                    self.wfile.write(file.read())
+            if image:
+                self.send_cached_file(image, head_only)
                 return
         
         # Handle API endpoint for coins
-        elif self.path == '/api/coins':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
+        elif path == '/api/coins':
+            self.send_coin_listing(head_only)
+            return
+        
+        # Prometheus scrape endpoint
+        elif path == '/metrics':
+            self.send_metrics(head_only)
+            return
+        
+        # Everything else comes from the static asset manifest
+        self.send_static_asset(head_only)
+    
+    def send_static_asset(self, head_only=False):
+        """Serve a file under STATIC_DIR from the precompressed manifest"""
+        asset = STATIC_ASSETS.lookup(unquote(urlsplit(self.path).path))
+        if asset is None:
+            self.send_error(404, "File not found")
+            return
+        variants = asset['variants']
+        variant = variants['identity']
+        # Byte ranges always refer to the identity body, so a range request never gets a compressed variant
+        if len(variants) > 1 and not self.headers.get('Range'):
+            variant = variants.get(choose_encoding(self.headers.get('Accept-Encoding', '')), variant)
+        self.send_cached_file(variant, head_only)
+    
+    def send_metrics(self, head_only=False):
+        """Serve this server's metrics plus the snapshots written by the other Mind9 processes"""
+        families = [
+            (name, metric_type, help, [(sample, dict(labels, process='http_server'), value)
+                                      for sample, labels, value in samples])
+            for name, metric_type, help, samples in metrics.REGISTRY.collect()
+        ]
+        body = metrics.render(metrics.merge_families(families + metrics.read_snapshots())).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+    
+    def send_coin_listing(self, head_only=False):
+        """Serve /api/coins from the pre-serialised listing cache"""
+        query = parse_qs(urlsplit(self.path).query)
+        try:
+            limit = int(query['limit'][0]) if 'limit' in query else None
+        except ValueError:
+            self.send_error(400, "Invalid limit")
+            return
+        cursor = query.get('cursor', [None])[0]
+        fields = query.get('fields', [None])[0]
+        encoding = choose_encoding(self.headers.get('Accept-Encoding', ''))
+        
+        try:
+            response = COIN_LISTING.get_response(cursor, limit, fields, encoding)
+        except ValueError as e:
+            self.send_error(400, str(e))
+            return
+        except Exception as e:
+            self.log_error("Error loading coin listing: %s", e)
+            self.send_error(503, "Coin listing unavailable")
+            return
+        
+        if self.headers.get('If-None-Match') == response['etag']:
+            self.send_response(304)
+            self.send_header('ETag', response['etag'])
+            self.send_header('Vary', 'Accept-Encoding')
             self.end_headers()
-            
-            # Generate sample JSON response
-            coins = [
-                {
-                    "id": 1,
-                    "name": "Velocity", 
-                    "symbol": "VELO", 
-                    "description": "A high-speed transaction token",
-                    "mint_address": "8Xe5N4KF8PPtBvY9JvPBxiMv4zkzQ4RmMetgNuJRDXzR",
-                    "image_path": "/img/coins/velo-8a384b05.png",
-                    "minted": True,
-                    "user_mintable": True,
-                    "total_supply": "1,000,000"
-                }
-            ]
-            
-            self.wfile.write(json.dumps(coins).encode())
             return
         
-        # Default handler for other paths
-        return super().do_GET()
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(response['body'])))
+        self.send_header('ETag', response['etag'])
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Cache-Control', 'no-cache')
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
+        if response['next_cursor']:
+            self.send_header('X-Next-Cursor', response['next_cursor'])
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(response['body'])
+    
+    def is_not_modified(self, image):
+        """Check If-None-Match / If-Modified-Since against the image validators"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or image['etag'] in tags or f"W/{image['etag']}" in tags
+        
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since is None:
+                return False
+            return int(image['mtime']) <= since.timestamp()
+        return False
+    
+    def parse_range(self, size, etag):
+        """Parse a single-range Range header into (start, end); None for the whole file, False if unsatisfiable"""
+        header = self.headers.get('Range')
+        if not header or not header.startswith('bytes='):
+            return None
+        
+        # Honour If-Range only when it still matches the current ETag
+        if_range = self.headers.get('If-Range')
+        if if_range and if_range.strip() != etag:
+            return None
+        
+        spec = header[len('bytes='):].strip()
+        if ',' in spec or '-' not in spec:
+            # Multipart ranges are not worth supporting for single images
+            return None
+        start, _, end = spec.partition('-')
+        try:
+            if start == '':
+                # Suffix range: the last N bytes
+                length = int(end)
+                if length <= 0:
+                    return False
+                return max(size - length, 0), size - 1
+            start = int(start)
+            end = int(end) if end else size - 1
+        except ValueError:
+            return None
+        if start >= size or end < start:
+            return False
+        return start, min(end, size - 1)
+    
+    def send_file_headers(self, image):
+        self.send_header('Content-type', image['content_type'])
+        self.send_header('ETag', image['etag'])
+        self.send_header('Last-Modified', image['last_modified'])
+        self.send_header('Cache-Control', image['cache_control'])
+        self.send_header('Accept-Ranges', 'bytes')
+        if 'encoding' in image:
+            self.send_header('Content-Encoding', image['encoding'])
+        if 'vary' in image:
+            self.send_header('Vary', image['vary'])
+    
+    def send_cached_file(self, image, head_only=False):
+        """Serve a coin image or static asset with conditional and range support, from memory or streamed from disk"""
+        size = image['size']
+        
+        if self.is_not_modified(image):
+            self.send_response(304)
+            self.send_file_headers(image)
+            self.end_headers()
+            return
+        
+        byte_range = self.parse_range(size, image['etag'])
+        if byte_range is False:
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{size}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        
+        if byte_range:
+            start, end = byte_range
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        else:
+            start, end = 0, size - 1
+            self.send_response(200)
+        length = end - start + 1
+        self.send_file_headers(image)
+        self.send_header('Content-Length', str(length))
+        self.end_headers()
+        
+        if head_only or length <= 0:
+            return
+        
+        body = image.get('body')
+        if body is not None:
+            self.wfile.write(memoryview(body)[start:end + 1])
+            return
+        
+        try:
+            with open(image['path'], 'rb') as file:
+                # socket.sendfile() uses os.sendfile where available and falls back to chunked reads
+                self.connection.sendfile(file, offset=start, count=length)
+        except OSError as e:
+            # Headers are already out, so the only option left is to drop the connection
+            self.log_error("Error streaming %s: %s", image['path'], e)
+            self.close_connection = True
+
+class Mind9Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    """HTTP server that hands each connection to a bounded pool of worker threads"""
+    daemon_threads = True
+    allow_reuse_address = True
+    # The default backlog of 5 drops SYNs under a burst of new connections, costing a 1 s retransmit
+    request_queue_size = 128
+
+    def __init__(self, server_address, handler_class, workers=SERVER_WORKERS, queue_size=SERVER_QUEUE_SIZE):
+        super().__init__(server_address, handler_class)
+        self.workers = workers
+        self.queue_size = queue_size
+        self.draining = False
+        # Accepted connections still waiting for a worker; idle keep-alive connections close while it is non-zero
+        self.waiting = 0
+        self.releasing = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mind9-http")
+        self._inflight = set()
+        self._inflight_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        """Queue the connection on the worker pool instead of spawning a thread per request"""
+        with self._inflight_lock:
+            if len(self._inflight) >= self.workers + self.queue_size:
+                self.rejected += 1
+                overloaded = True
+            else:
+                overloaded = False
+                self.waiting += 1
+        if overloaded:
+            self.reject(request)
+            return
+        future = self._executor.submit(self._run_queued, request, client_address)
+        with self._inflight_lock:
+            self._inflight.add(future)
+        future.add_done_callback(self._forget)
+
+    def _run_queued(self, request, client_address):
+        with self._inflight_lock:
+            self.waiting -= 1
+            self.releasing = max(0, self.releasing - 1)
+        self.process_request_thread(request, client_address)
+
+    def claim_idle_worker(self):
+        """True if an idle keep-alive connection should close so a queued connection gets its worker"""
+        with self._inflight_lock:
+            if self.waiting > self.releasing:
+                self.releasing += 1
+                return True
+            return False
 
-# Create the server
-with socketserver.TCPServer((HOST, PORT), Mind9Handler) as httpd:
-    print(f"Mind9 Python Server running at http://{HOST}:{PORT}")
+    def reject(self, request):
+        """Answer 503 straight from the accept loop when every worker is busy and the queue is full"""
+        metrics.HTTP_REQUESTS.inc(route='overloaded', status=503)
+        try:
+            request.sendall(b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\n"
+                            b"Retry-After: 1\r\nConnection: close\r\n\r\n")
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def _forget(self, future):
+        with self._inflight_lock:
+            self._inflight.discard(future)
+
+    def drain(self, timeout=DRAIN_TIMEOUT):
+        """Wait for in-flight connections to finish, returning how many were still open"""
+        self.draining = True
+        with self._inflight_lock:
+            pending = list(self._inflight)
+        if pending:
+            print(f"Draining {len(pending)} open connection(s)...")
+        deadline = time.monotonic() + timeout
+        for future in pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                future.result(timeout=remaining)
+            except Exception:
+                pass
+        with self._inflight_lock:
+            return len(self._inflight)
+
+    def server_close(self):
+        left = self.drain()
+        if left:
+            print(f"Closing with {left} connection(s) still open")
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        super().server_close()
+
+
+def watch_coin_events():
+    """Drop the cached coin listing as soon as another process publishes a coin change"""
+    try:
+        listener = CoinEventListener("http-server")
+    except OSError as e:
+        print(f"Coin event channel unavailable, relying on cache TTL: {e}")
+        return None
+    
+    def run():
+        while True:
+            try:
+                events = listener.wait()
+            except OSError:
+                # Listener closed during shutdown
+                return
+            if events:
+                COIN_LISTING.invalidate()
+    
+    threading.Thread(target=run, name="coin-events", daemon=True).start()
+    return listener
+
+def watch_static_assets(interval=STATIC_WATCH_INTERVAL, manifest=STATIC_ASSETS):
+    """Rescan STATIC_DIR periodically so rebuilt front-end bundles are picked up without a restart"""
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                changed, removed = manifest.refresh()
+            except Exception as e:
+                print(f"Error refreshing static assets: {e}")
+                continue
+            if changed or removed:
+                print(f"Static assets updated: {changed} changed, {removed} removed")
+    
+    thread = threading.Thread(target=run, name="static-assets", daemon=True)
+    thread.start()
+    return thread
+
+def main():
+    changed, _ = STATIC_ASSETS.refresh()
+    print(f"Loaded {changed} static asset(s) from {STATIC_DIR}")
+    watch_static_assets()
+    httpd = Mind9Server((HOST, PORT), Mind9Handler)
+    listener = watch_coin_events()
+
+    # serve_forever() runs in the main thread, so shutdown() has to come from another one
+    def handle_exit(signum, frame):
+        print(f"Received signal {signum}, draining connections...")
+        threading.Thread(target=httpd.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, handle_exit)
+
+    print(f"Mind9 Python Server running at http://{HOST}:{PORT} ({httpd.workers} workers)")
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
         print("Server stopped by user")
     finally:
         httpd.server_close()
-        print("Server closed")
\ No newline at end of file
+        if listener:
+            listener.close()
+        print("Server closed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Batched Solana RPC Client for Mind9
+Mint verification and coin status over JSON-RPC batches of getMultipleAccounts,
+sent on a keep-alive connection pool with a concurrency limit, a short-TTL
+account cache and coalescing of duplicate in-flight lookups
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import random
+import logging
+import threading
+import http.client
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import metrics
+
+logger = logging.getLogger("solana_rpc")
+
+# Same variable verify_token.js reads
+SOLANA_RPC_URL = os.environ.get("RPC_ENDPOINT", "https://api.mainnet-beta.solana.com")
+RPC_CONCURRENCY = int(os.environ.get("RPC_CONCURRENCY", 4))
+RPC_TIMEOUT = float(os.environ.get("RPC_TIMEOUT", 30))
+RPC_CACHE_TTL = float(os.environ.get("RPC_CACHE_TTL", 5))
+RPC_CACHE_MAX = int(os.environ.get("RPC_CACHE_MAX", 50000))
+RPC_RETRIES = int(os.environ.get("RPC_RETRIES", 4))
+# getMultipleAccounts accepts at most 100 addresses; several such calls share one HTTP request
+RPC_ACCOUNTS_PER_CALL = int(os.environ.get("RPC_ACCOUNTS_PER_CALL", 100))
+RPC_CALLS_PER_REQUEST = int(os.environ.get("RPC_CALLS_PER_REQUEST", 10))
+
+TOKEN_PROGRAM_IDS = (
+    "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA",
+    "TokenzQdBNbLqP5VEhdkAS6EPFLC1PEnBqCqz9ehTwz5",
+)
+# SPL mint layout: COption<Pubkey> mint authority (36 bytes), u64 supply, u8 decimals, bool initialized
+MINT_ACCOUNT_SIZE = 82
+
+class RPCError(Exception):
+    """A JSON-RPC error response or an HTTP failure talking to the RPC node"""
+
+    def __init__(self, message, code=None):
+        super().__init__(message)
+        self.code = code
+
+class HTTPConnectionPool:
+    """Keep-alive HTTP(S) connections to one host, reused LIFO across threads"""
+
+    def __init__(self, url, max_size=RPC_CONCURRENCY, timeout=RPC_TIMEOUT):
+        parts = urlsplit(url)
+        self.secure = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.timeout = timeout
+        self.max_size = max_size
+        self.idle = []
+        self.lock = threading.Lock()
+        self.opened = 0
+
+    def _connect(self):
+        with self.lock:
+            self.opened += 1
+        if self.secure:
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def post(self, body, headers):
+        """POST 'body' and return (status, response bytes), retrying once on a stale keep-alive socket"""
+        with self.lock:
+            conn = self.idle.pop() if self.idle else None
+        reused = conn is not None
+        conn = conn or self._connect()
+        while True:
+            try:
+                conn.request("POST", self.path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if not reused:
+                    raise
+                # The server closed an idle connection; try once more on a fresh one
+                reused = False
+                conn = self._connect()
+            except BaseException:
+                conn.close()
+                raise
+        if response.will_close:
+            conn.close()
+        else:
+            with self.lock:
+                if len(self.idle) < self.max_size:
+                    self.idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+        return response.status, data
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for conn in idle:
+            conn.close()
+
+def parse_mint(account):
+    """Supply and decimals from a base64-encoded SPL mint account, or None if it isn't one"""
+    if not account or account.get("owner") not in TOKEN_PROGRAM_IDS:
+        return None
+    data = account.get("data")
+    if not isinstance(data, list) or len(data) < 2 or data[1] != "base64":
+        return None
+    try:
+        raw = base64.b64decode(data[0])
+    except ValueError:
+        return None
+    # Token-2022 mints carry extensions after the base layout
+    if len(raw) < MINT_ACCOUNT_SIZE:
+        return None
+    return {
+        "supply": int.from_bytes(raw[36:44], "little"),
+        "decimals": raw[44],
+        "initialized": bool(raw[45])
+    }
+
+class SolanaRPC:
+    """Solana JSON-RPC client built for bulk account reads.
+
+    get_accounts() answers from a short-TTL cache where it can, waits on lookups
+    that other threads already have in flight, and fetches the rest as
+    getMultipleAccounts calls of up to RPC_ACCOUNTS_PER_CALL addresses, packed
+    RPC_CALLS_PER_REQUEST to a JSON-RPC batch and sent over at most 'concurrency'
+    pooled connections at once. Thousands of mints take a handful of round trips.
+    The concurrency limit covers every request, single call() ones included.
+    """
+
+    def __init__(self, url=SOLANA_RPC_URL, concurrency=RPC_CONCURRENCY, timeout=RPC_TIMEOUT,
+                 cache_ttl=RPC_CACHE_TTL, commitment="confirmed", accounts_per_call=RPC_ACCOUNTS_PER_CALL,
+                 calls_per_request=RPC_CALLS_PER_REQUEST, retries=RPC_RETRIES, cache_max=RPC_CACHE_MAX):
+        self.url = url
+        self.commitment = commitment
+        self.cache_ttl = cache_ttl
+        self.cache_max = cache_max
+        self.accounts_per_call = accounts_per_call
+        self.calls_per_request = calls_per_request
+        self.retries = retries
+        self.pool = HTTPConnectionPool(url, max_size=concurrency, timeout=timeout)
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="solana-rpc")
+        # Requests in flight, across the executor and callers of call()
+        self.slots = threading.BoundedSemaphore(concurrency)
+        # address -> (expires, account), oldest write first
+        self.cache = OrderedDict()
+        self.inflight = {}
+        self.lock = threading.Lock()
+        self.next_id = 0
+
+        # Counters
+        self.round_trips = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.fetched = 0
+
+    def _request(self, payload, label):
+        """Send one JSON-RPC payload (single call or batch), retrying 429/5xx with jittered backoff"""
+        body = json.dumps(payload).encode()
+        headers = {"Content-Type": "application/json"}
+        for attempt in range(self.retries + 1):
+            with self.slots:
+                start = time.perf_counter()
+                try:
+                    status, data = self.pool.post(body, headers)
+                except (OSError, http.client.HTTPException) as e:
+                    status, data = None, str(e)
+                finally:
+                    metrics.RPC_LATENCY.observe(time.perf_counter() - start, method=label)
+            with self.lock:
+                self.round_trips += 1
+            if status == 200:
+                try:
+                    return json.loads(data)
+                except ValueError as e:
+                    # e.g. an HTML page from a proxy in front of the node
+                    raise RPCError(f"Invalid JSON from RPC node: {data[:200]!r}", code=status) from e
+            if status is not None and status != 429 and status < 500:
+                raise RPCError(f"HTTP {status} from RPC node: {data[:200]!r}", code=status)
+            if attempt == self.retries:
+                raise RPCError(f"RPC node unavailable after {attempt + 1} attempts: {status or data}", code=status)
+            delay = random.uniform(0, min(10.0, 0.25 * (2 ** attempt)))
+            logger.warning(f"RPC {label} failed ({status or data}); retrying in {delay:.2f}s")
+            time.sleep(delay)
+
+    def _envelope(self, method, params):
+        with self.lock:
+            self.next_id += 1
+            request_id = self.next_id
+        return {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+
+    def call(self, method, params=None):
+        """Make a single RPC call and return its result"""
+        response = self._request(self._envelope(method, params or []), method)
+        if "error" in response:
+            raise RPCError(response["error"].get("message"), code=response["error"].get("code"))
+        return response.get("result")
+
+    def batch(self, calls):
+        """Send (method, params) pairs as JSON-RPC batches; returns results or RPCError instances in order"""
+        calls = list(calls)
+        chunks = [calls[i:i + self.calls_per_request] for i in range(0, len(calls), self.calls_per_request)]
+
+        def send(chunk):
+            requests = [self._envelope(method, params) for method, params in chunk]
+            label = chunk[0][0] if len({method for method, _ in chunk}) == 1 else "batch"
+            responses = self._request(requests, label)
+            if isinstance(responses, dict):
+                # Some nodes answer a whole rejected batch with a single error object
+                error = responses.get("error") or {}
+                return [RPCError(error.get("message", "invalid batch response"), code=error.get("code"))] * len(chunk)
+            by_id = {response.get("id"): response for response in responses}
+            results = []
+            for request in requests:
+                response = by_id.get(request["id"])
+                if response is None:
+                    results.append(RPCError(f"No response for {request['method']}"))
+                elif "error" in response:
+                    results.append(RPCError(response["error"].get("message"), code=response["error"].get("code")))
+                else:
+                    results.append(response.get("result"))
+            return results
+
+        results = []
+        for chunk_results in self.executor.map(send, chunks):
+            results.extend(chunk_results)
+        return results
+
+    def _fetch(self, addresses):
+        """getMultipleAccounts for 'addresses'; returns {address: account or None}"""
+        options = {"encoding": "base64", "commitment": self.commitment}
+        groups = [addresses[i:i + self.accounts_per_call] for i in range(0, len(addresses), self.accounts_per_call)]
+        results = self.batch(("getMultipleAccounts", [group, options]) for group in groups)
+        accounts = {}
+        for group, result in zip(groups, results):
+            if isinstance(result, RPCError):
+                raise result
+            accounts.update(zip(group, result["value"]))
+        with self.lock:
+            self.fetched += len(addresses)
+        return accounts
+
+    def get_accounts(self, addresses):
+        """Account info for each address (None where no account exists), as a dict"""
+        now = time.monotonic()
+        found = {}
+        waiting = {}
+        owned = {}
+        with self.lock:
+            for address in dict.fromkeys(addresses):
+                cached = self.cache.get(address)
+                if cached and cached[0] > now:
+                    found[address] = cached[1]
+                    self.cache_hits += 1
+                elif address in self.inflight:
+                    waiting[address] = self.inflight[address]
+                    self.coalesced += 1
+                else:
+                    owned[address] = self.inflight[address] = Future()
+        if found:
+            metrics.CACHE_LOOKUPS.inc(len(found), cache="solana_accounts", result="hit")
+        if waiting:
+            metrics.CACHE_LOOKUPS.inc(len(waiting), cache="solana_accounts", result="coalesced")
+
+        if owned:
+            metrics.CACHE_LOOKUPS.inc(len(owned), cache="solana_accounts", result="miss")
+            try:
+                fetched = self._fetch(list(owned))
+            except BaseException as e:
+                with self.lock:
+                    for address, future in owned.items():
+                        self.inflight.pop(address, None)
+                        future.set_exception(e)
+                raise
+            expires = time.monotonic() + self.cache_ttl
+            with self.lock:
+                for address, future in owned.items():
+                    account = fetched.get(address)
+                    self.cache.pop(address, None)
+                    self.cache[address] = (expires, account)
+                    self.inflight.pop(address, None)
+                    future.set_result(account)
+                # Entries share one TTL, so the oldest written are also the first to expire
+                while len(self.cache) > self.cache_max:
+                    self.cache.popitem(last=False)
+            found.update(fetched)
+
+        for address, future in waiting.items():
+            found[address] = future.result()
+        return found
+
+    def get_account(self, address):
+        return self.get_accounts([address])[address]
+
+    def invalidate(self, addresses=None):
+        """Drop cached accounts, e.g. right after minting"""
+        with self.lock:
+            if addresses is None:
+                self.cache.clear()
+            else:
+                for address in addresses:
+                    self.cache.pop(address, None)
+
+    def verify_mints(self, addresses):
+        """{address: True} for initialised SPL token mints, False for anything else"""
+        accounts = self.get_accounts(addresses)
+        return {address: bool((parse_mint(accounts.get(address)) or {}).get("initialized")) for address in addresses}
+
+    def coin_statuses(self, coins):
+        """On-chain status for coins with a mint_address, keyed by that address"""
+        addresses = [coin["mint_address"] for coin in coins if coin.get("mint_address")]
+        accounts = self.get_accounts(addresses)
+        statuses = {}
+        for address in addresses:
+            account = accounts.get(address)
+            mint = parse_mint(account)
+            statuses[address] = {
+                "exists": account is not None,
+                "verified": bool(mint and mint["initialized"]),
+                "supply": mint["supply"] / 10 ** mint["decimals"] if mint else None,
+                "decimals": mint["decimals"] if mint else None,
+                "lamports": account.get("lamports") if account else None
+            }
+        return statuses
+
+    def stats(self):
+        with self.lock:
+            return {
+                "round_trips": self.round_trips,
+                "cache_hits": self.cache_hits,
+                "coalesced": self.coalesced,
+                "fetched": self.fetched,
+                "cached": len(self.cache),
+                "connections_opened": self.pool.opened
+            }
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.pool.close()
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client(url=None):
+    """Process-wide client for the configured RPC endpoint"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = SolanaRPC(url or SOLANA_RPC_URL)
+            metrics.REGISTRY.add_collector(metrics.stats_collector(
+                "mind9_solana_rpc", _client.stats, "Solana RPC client",
+                counters=("round_trips", "cache_hits", "coalesced", "fetched", "connections_opened")
+            ))
+        return _client
+
+if __name__ == "__main__":
+    # Usage: python solana_rpc.py [--url URL] [--db PATH]   (check every minted coin's mint)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    args = sys.argv[1:]
+    options = {}
+    for flag in ("--url", "--db"):
+        if flag in args:
+            index = args.index(flag)
+            options[flag] = args[index + 1]
+            del args[index:index + 2]
+
+    from coin_store import CoinStore, COIN_DB_PATH
+    store = CoinStore(options.get("--db", COIN_DB_PATH))
+    coins = list(store.iter_minted_coins(columns=("symbol", "mint_address")))
+    client = SolanaRPC(options.get("--url", SOLANA_RPC_URL))
+    start = time.perf_counter()
+    statuses = client.coin_statuses(coins)
+    elapsed = time.perf_counter() - start
+    unverified = sorted(address for address, status in statuses.items() if not status["verified"])
+    print(json.dumps({
+        "coins": len(coins),
+        "verified": len(statuses) - len(unverified),
+        "unverified": unverified,
+        "seconds": round(elapsed, 3),
+        "stats": client.stats()
+    }, indent=2))
+    client.close()
+    store.close()
@@ -10,34 +10,14 @@ fi
 # Ensure Python dependencies are installed
 check_dependencies() {
     echo "Checking Python dependencies..."
-    missing=0
     
-    # List of required packages
-    packages=(
-        "python-dotenv"
-        "openai"
-        "tweepy"
-        "pillow"
-        "numpy"
-        "schedule"
-        "requests"
-        "base58"
-        "solana"
-    )
-    
-    for package in "${packages[@]}"; do
-        if ! pip list | grep -q "$package"; then
-            echo "Missing package: $package"
-            missing=1
-        fi
-    done
-    
-    if [ $missing -eq 1 ]; then
-        echo "Installing missing packages..."
-        pip install python-dotenv openai tweepy pillow numpy schedule requests base58 solana
-    else
-        echo "All dependencies are installed."
+    # startup.py caches the result in .deps_manifest.json until site-packages changes
+    if python startup.py check-deps; then
+        return
     fi
+    
+    echo "Installing missing packages..."
+    pip install python-dotenv openai tweepy pillow numpy schedule requests base58 solana
 }
 
 # Check for .env file
@@ -66,25 +46,26 @@ start_mind9() {
     echo "Starting Mind9 autonomous system with continuous operation..."
     echo "The system will automatically restart if it crashes."
     
-    # Create a marker file to indicate Mind9 is running
-    touch .mind9_running
-    
-    # Run in a continuous loop with automatic restart
-    while [ -f .mind9_running ]; do
+    # The supervisor restarts main.py itself with backoff and exits cleanly when
+    # stopped over its control socket; this loop only covers the supervisor crashing
+    while true; do
         echo "============================================"
         echo "[$(date)] STARTING MIND9 AUTONOMOUS SYSTEM"
         echo "============================================"
         
-        # Run main.py, capturing logs to file
-        python main.py >> mind9_continuous.log 2>&1
+        # Run main.py under the supervisor; records go to rotating files under logs/,
+        # so only crashes and stray prints land in the unrotated continuous log
+        LOG_CONSOLE=0 python supervisor.py mind9 --control .mind9_supervisor.sock >> mind9_continuous.log 2>&1
         
-        # If we get here, the process crashed or exited
+        # If we get here, the supervisor itself exited
         EXIT_CODE=$?
+        if [ $EXIT_CODE -eq 0 ]; then
+            echo "[$(date)] Mind9 supervisor stopped"
+            break
+        fi
         
-        echo "[$(date)] Mind9 process exited with code $EXIT_CODE. Restarting in 60 seconds..."
-        
-        # Sleep before restarting to prevent rapid restart loops
-        sleep 60
+        echo "[$(date)] Mind9 supervisor exited with code $EXIT_CODE. Restarting in 5 seconds..."
+        sleep 5
     done
 }
 
@@ -93,26 +74,26 @@ start_twitter_bot() {
     echo "Starting Twitter bot with continuous operation..."
     echo "The Twitter bot will automatically restart if it crashes."
     
-    # Create a marker file to indicate Twitter bot is running
-    touch .twitter_bot_running
-    
     # Start in background with nohup
     nohup bash -c '
-        while [ -f .twitter_bot_running ]; do
+        while true; do
             echo "============================================"
             echo "[$(date)] STARTING TWITTER BOT"
             echo "============================================"
             
-            # Run the Twitter bot, capturing logs to file
-            python twitter_bot.py >> twitter_bot_continuous.log 2>&1
+            # Run the Twitter bot under the supervisor; records go to rotating log files,
+            # so only crashes and stray prints land in the unrotated continuous log
+            LOG_CONSOLE=0 python supervisor.py twitter_bot --control .twitter_bot_supervisor.sock >> twitter_bot_continuous.log 2>&1
             
-            # If we get here, the process crashed or exited
+            # If we get here, the supervisor itself exited
             EXIT_CODE=$?
+            if [ $EXIT_CODE -eq 0 ]; then
+                echo "[$(date)] Twitter bot supervisor stopped"
+                break
+            fi
             
-            echo "[$(date)] Twitter bot exited with code $EXIT_CODE. Restarting in 60 seconds..."
-            
-            # Sleep before restarting to prevent rapid restart loops
-            sleep 60
+            echo "[$(date)] Twitter bot supervisor exited with code $EXIT_CODE. Restarting in 5 seconds..."
+            sleep 5
         done
     ' &
     
@@ -123,28 +104,17 @@ start_twitter_bot() {
 stop_mind9() {
     echo "Gracefully stopping Mind9 processes..."
     
-    # Remove the marker files to stop the continuous loops
-    if [ -f .mind9_running ]; then
-        rm .mind9_running
-        echo "Mind9 main system will stop after current cycle"
-    fi
-    
-    if [ -f .twitter_bot_running ]; then
-        rm .twitter_bot_running
-        echo "Twitter bot will stop after current cycle"
-    fi
-    
-    # Find and kill any running Python processes related to Mind9
-    MIND9_PIDS=$(ps aux | grep 'python.*[m]ain.py\|python.*[t]witter_bot.py' | awk '{print $2}')
+    # Ask each supervisor to stop its children over its control socket
+    stopped=0
+    for control in .mind9_supervisor.sock .twitter_bot_supervisor.sock; do
+        if python supervisor.py ctl stop --control $control > /dev/null 2>&1; then
+            echo "Sent stop to supervisor on $control"
+            stopped=1
+        fi
+    done
     
-    if [ -n "$MIND9_PIDS" ]; then
-        echo "Sending graceful termination signal to Mind9 processes..."
-        for pid in $MIND9_PIDS; do
-            kill -TERM $pid 2>/dev/null || true
-            echo "Sent TERM signal to PID $pid"
-        done
-    else
-        echo "No running Mind9 processes found"
+    if [ $stopped -eq 0 ]; then
+        echo "No running Mind9 supervisors found"
     fi
     
     echo "Mind9 shutdown initiated"
@@ -6,7 +6,7 @@ echo "------------------------------"
 echo "Bot Configuration:"
 echo "* Maximum 2 tweets per day"
 echo "* 3-hour minimum between tweets"
-echo "* Checks for new coins every 15 minutes"
+echo "* New coins picked up on coin events when the bot supports it"
 echo "* Tweet schedule: 8:30am, 1:15pm, 5:45pm, 10:00pm"
 echo "* New coins announced immediately"
 echo "------------------------------"
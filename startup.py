@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Startup Helpers for Mind9
+Deferred imports for heavy dependencies, a cached dependency manifest in place
+of 'pip list' scans, import-time profiling for --profile-startup, and a
+cold-start benchmark for the entry points
+"""
+
+import os
+import sys
+import time
+import importlib.util
+
+# Heavy third-party modules that entry points import lazily
+HEAVY_MODULES = ("openai", "tweepy", "solana", "numpy", "PIL", "PIL.Image", "base58", "requests")
+
+# Distributions start_mind9.sh needs
+REQUIRED_PACKAGES = ("python-dotenv", "openai", "tweepy", "pillow", "numpy", "schedule", "requests", "base58", "solana")
+DEPS_MANIFEST = ".deps_manifest.json"
+
+PROFILE_FLAG = "--profile-startup"
+
+# Entry points timed by 'python startup.py bench'; each command must exit on its own
+ENTRY_POINTS = {
+    "run_twitter_bot": ["-c", "import run_twitter_bot"],
+    "run_mind9": ["-c", "import run_mind9"],
+    "supervisor": ["-c", "import supervisor"],
+    "simple_python_server": ["-c", "import simple_python_server"],
+    "twitter_status": ["twitter_status.py"]
+}
+STARTUP_BENCH_FILE = "logs/startup_bench.jsonl"
+
+class LazyFinder:
+    """Import hook that returns lazily-loading specs for a fixed set of modules.
+
+    'import numpy' then binds a module object whose code only runs on first
+    attribute access. 'from numpy import x' still loads immediately, and errors
+    raised while a deferred module executes surface at that first access.
+    """
+
+    def __init__(self, names):
+        self.names = set(names)
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname not in self.names:
+            return None
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is None or not hasattr(spec.loader, "exec_module"):
+                    return spec
+                spec.loader = importlib.util.LazyLoader(spec.loader)
+                return spec
+        return None
+
+def defer_imports(names=HEAVY_MODULES):
+    """Make later imports of 'names' lazy in this process; modules already imported are unaffected"""
+    for finder in sys.meta_path:
+        if isinstance(finder, LazyFinder):
+            finder.names.update(names)
+            return finder
+    finder = LazyFinder(names)
+    sys.meta_path.insert(0, finder)
+    return finder
+
+def _process_uptime():
+    """Seconds since this process started (Linux /proc), so the total includes interpreter startup"""
+    try:
+        with open("/proc/self/stat", 'rb') as f:
+            # Field 22 is the start time in clock ticks since boot; the command name may contain spaces
+            start_ticks = int(f.read().rsplit(b")", 1)[1].split()[19])
+        with open("/proc/uptime", 'rb') as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+class _TimedLoader:
+    """Wraps a loader to time exec_module for the import profiler"""
+
+    def __init__(self, loader, profiler, name):
+        self.loader = loader
+        self.profiler = profiler
+        self.name = name
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        stack = self.profiler.stack
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self.profiler.records.append((self.name, elapsed - nested, elapsed))
+            # Hand the real loader back so nothing downstream sees the wrapper
+            module.__loader__ = self.loader
+            if getattr(module, "__spec__", None) is not None:
+                module.__spec__.loader = self.loader
+
+    def __getattr__(self, attr):
+        return getattr(self.loader, attr)
+
+class ImportProfiler:
+    """Records self and cumulative execution time of every module imported after install()"""
+
+    def __init__(self):
+        self.records = []
+        self.stack = []
+        self.started = time.perf_counter() - _process_uptime()
+        self.reported = False
+
+    def install(self):
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self, fullname)
+                return spec
+        return None
+
+    def summary(self, top=25):
+        total = time.perf_counter() - self.started
+        slowest = sorted(self.records, key=lambda record: record[2], reverse=True)[:top]
+        return {
+            "total_ms": round(total * 1000, 2),
+            "import_ms": round(sum(record[1] for record in self.records) * 1000, 2),
+            "modules": len(self.records),
+            "slowest": [
+                {"module": name, "self_ms": round(own * 1000, 2), "cumulative_ms": round(cumulative * 1000, 2)}
+                for name, own, cumulative in slowest
+            ]
+        }
+
+    def report(self, stream=None, top=25):
+        """Print the import-time breakdown once"""
+        if self.reported:
+            return
+        self.reported = True
+        stream = stream or sys.stderr
+        summary = self.summary(top)
+        print(f"Startup profile: {summary['total_ms']:.1f} ms to ready, {summary['import_ms']:.1f} ms "
+              f"importing {summary['modules']} modules", file=stream)
+        print(f"{'cumulative':>12} {'self':>10}  module", file=stream)
+        for entry in summary["slowest"]:
+            print(f"{entry['cumulative_ms']:>9.1f} ms {entry['self_ms']:>7.1f} ms  {entry['module']}", file=stream)
+        stream.flush()
+
+_profiler = None
+
+def profile_from_argv(argv=None):
+    """Start import profiling if --profile-startup was passed, removing the flag from argv.
+
+    Call this before any other imports in an entry point. The breakdown is printed
+    at mark_ready(), or at exit if the entry point never gets that far.
+    """
+    global _profiler
+    argv = sys.argv if argv is None else argv
+    if PROFILE_FLAG not in argv:
+        return None
+    argv.remove(PROFILE_FLAG)
+    if _profiler is None:
+        import atexit
+        _profiler = ImportProfiler()
+        _profiler.install()
+        atexit.register(_profiler.report)
+    return _profiler
+
+def mark_ready():
+    """Entry points call this once they are initialised; prints the profile if one is running"""
+    if _profiler is not None:
+        _profiler.report()
+        _profiler.uninstall()
+
+def _site_signature():
+    """Identify the installed package set cheaply: interpreter plus site-packages mtimes"""
+    import site
+    directories = list(site.getsitepackages()) if hasattr(site, "getsitepackages") else []
+    user_site = site.getusersitepackages() if hasattr(site, "getusersitepackages") else None
+    if user_site:
+        directories.append(user_site)
+    mtimes = {}
+    for directory in directories:
+        try:
+            mtimes[directory] = os.stat(directory).st_mtime
+        except OSError:
+            pass
+    return {"executable": sys.executable, "version": sys.version, "site_mtimes": mtimes}
+
+def check_dependencies(packages=REQUIRED_PACKAGES, manifest=DEPS_MANIFEST):
+    """Return the required distributions that are not installed.
+
+    The result is cached in a manifest keyed by the interpreter and the
+    site-packages modification times, so repeated starts skip the lookup until
+    something is installed or removed.
+    """
+    import json
+
+    signature = _site_signature()
+    try:
+        with open(manifest, 'r') as f:
+            cached = json.load(f)
+        if cached.get("signature") == signature and cached.get("packages") == list(packages):
+            return cached["missing"]
+    except (OSError, ValueError):
+        pass
+
+    from importlib import metadata
+    versions = {}
+    missing = []
+    for package in packages:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            missing.append(package)
+
+    from atomic_io import write_atomic
+    write_atomic(manifest, json.dumps({
+        "signature": signature,
+        "packages": list(packages),
+        "versions": versions,
+        "missing": missing
+    }, indent=2).encode(), fsync=False)
+    return missing
+
+def benchmark_startup(entry_points=None, runs=5):
+    """Time cold starts of each entry point in fresh interpreters; returns a JSON-ready dict"""
+    import statistics
+    import subprocess
+
+    entry_points = entry_points or list(ENTRY_POINTS)
+    results = {}
+    for name in entry_points:
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            completed = subprocess.run([sys.executable] + ENTRY_POINTS[name], stdout=subprocess.DEVNULL,
+                                       stderr=subprocess.DEVNULL)
+            timings.append(time.perf_counter() - start)
+        results[name] = {
+            "runs": runs,
+            "exit_code": completed.returncode,
+            "min_ms": round(min(timings) * 1000, 1),
+            "median_ms": round(statistics.median(timings) * 1000, 1),
+            "max_ms": round(max(timings) * 1000, 1)
+        }
+    return {"timestamp": time.time(), "python": sys.version.split()[0], "entry_points": results}
+
+if __name__ == "__main__":
+    import json
+
+    # Usage: python startup.py check-deps
+    #        python startup.py bench [entry ...] [--runs N] [--output FILE]
+    args = sys.argv[1:]
+    command = args.pop(0) if args else "check-deps"
+
+    if command == "check-deps":
+        missing = check_dependencies()
+        if missing:
+            print(f"Missing packages: {' '.join(missing)}")
+            sys.exit(1)
+        print("All dependencies are installed.")
+
+    elif command == "bench":
+        runs = 5
+        output = STARTUP_BENCH_FILE
+        if "--runs" in args:
+            index = args.index("--runs")
+            runs = int(args[index + 1])
+            del args[index:index + 2]
+        if "--output" in args:
+            index = args.index("--output")
+            output = args[index + 1]
+            del args[index:index + 2]
+        unknown = [name for name in args if name not in ENTRY_POINTS]
+        if unknown:
+            print(f"Unknown entry points: {', '.join(unknown)}; choose from {', '.join(ENTRY_POINTS)}")
+            sys.exit(2)
+
+        result = benchmark_startup(args or None, runs)
+        print(json.dumps(result, indent=2))
+        # Append to a history file so cold-start time can be tracked across changes
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        with open(output, 'a') as f:
+            f.write(json.dumps(result) + "\n")
+
+    else:
+        print(f"Unknown command: {command}")
+        sys.exit(2)
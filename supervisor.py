@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Process Supervisor for Mind9
+Runs the Mind9 core system and the Twitter bot as child processes forked from a
+preloaded forkserver, restarting them with exponential backoff and jitter.
+Hung children are detected from their heartbeats, and the supervisor is stopped
+or queried through a control socket
+"""
+
+import os
+import sys
+import time
+import json
+import random
+import signal
+import socket
+import logging
+import importlib
+import multiprocessing
+from multiprocessing.connection import wait
+
+import heartbeat
+import metrics
+import profiling
+
+logger = logging.getLogger("mind9_supervisor")
+
+# Heavy dependencies imported once by the forkserver so restarted children inherit them
+PRELOAD_MODULES = ["dotenv", "openai", "tweepy", "solana", "base58", "numpy", "PIL.Image", "requests"]
+
+# Restart policy
+RESTART_BACKOFF_BASE = float(os.environ.get("RESTART_BACKOFF_BASE", 0.5))
+RESTART_BACKOFF_CAP = float(os.environ.get("RESTART_BACKOFF_CAP", 60))
+STABLE_RUNTIME = float(os.environ.get("STABLE_RUNTIME", 60))
+STOP_TIMEOUT = float(os.environ.get("STOP_TIMEOUT", 15))
+
+# Control socket and how often heartbeats are checked
+CONTROL_SOCKET = os.environ.get("SUPERVISOR_CONTROL_SOCKET", ".mind9_supervisor.sock")
+HEARTBEAT_CHECK_INTERVAL = float(os.environ.get("HEARTBEAT_CHECK_INTERVAL", 0.25))
+
+def run_target(module_name, attr, argv, heartbeat_name=None):
+    """Child entry point: import the target fresh in this process and run it"""
+    sys.argv = [module_name + ".py"] + list(argv)
+    if heartbeat_name:
+        # Picked up by heartbeat.register() if the target's work loop arms hang detection
+        os.environ[heartbeat.HEARTBEAT_ENV] = heartbeat_name
+        metrics.start_exporter(heartbeat_name)
+    # Resolve targets from the working directory, as 'python main.py' would
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    # Opt-in sampling profiler with slow-cycle, stall and crash dumps (MIND9_PROFILE=1)
+    profiler = profiling.start_from_env(heartbeat_name or module_name)
+    try:
+        module = importlib.import_module(module_name)
+        target = getattr(module, attr)
+        if isinstance(target, type):
+            # Classes like Mind9 are instantiated and run
+            target().run()
+        else:
+            target()
+    except Exception:
+        if profiler:
+            profiler.crashed()
+        raise
+
+class ChildSpec:
+    """A supervised child process and its restart bookkeeping"""
+
+    def __init__(self, name, module, attr, argv=(), max_restarts=None):
+        self.name = name
+        self.module = module
+        self.attr = attr
+        self.argv = list(argv)
+        self.max_restarts = max_restarts
+
+        self.process = None
+        self.started_at = None
+        self.exited_at = None
+        self.next_start = 0.0
+        self.restarts = 0
+        self.fast_failures = 0
+        self.restart_latencies = []
+        self.last_exit_code = None
+        self.hang_kills = 0
+
+    def stats(self):
+        latencies = self.restart_latencies
+        return {
+            "pid": self.process.pid if self.process and self.process.is_alive() else None,
+            "restarts": self.restarts,
+            "last_exit_code": self.last_exit_code,
+            "uptime": time.monotonic() - self.started_at if self.started_at and self.process and self.process.is_alive() else 0,
+            "last_restart_latency": latencies[-1] if latencies else None,
+            "max_restart_latency": max(latencies) if latencies else None,
+            "hang_kills": self.hang_kills
+        }
+
+# Default children, matching start_mind9.sh
+CHILDREN = {
+    "mind9": lambda: ChildSpec("mind9", "main", "Mind9", max_restarts=100),
+    "twitter_bot": lambda: ChildSpec("twitter_bot", "run_twitter_bot", "main")
+}
+
+class Supervisor:
+    """Keeps a set of children running until stopped.
+
+    Children are forked from a forkserver that has already imported the heavy
+    dependencies, so a restart skips those imports while still getting a clean
+    interpreter state for the target module itself. Restart delays grow
+    exponentially with full jitter while a child keeps failing within
+    STABLE_RUNTIME, and reset once it stays up.
+
+    A child that has published a heartbeat (see heartbeat.register()) and then
+    stops beating for longer than HANG_FACTOR times its expected interval is
+    killed and restarted like a crashed one. Children that never beat are only
+    supervised for exits.
+    """
+
+    def __init__(self, children, control=CONTROL_SOCKET, preload=PRELOAD_MODULES, backoff_base=RESTART_BACKOFF_BASE,
+                 backoff_cap=RESTART_BACKOFF_CAP, stable_runtime=STABLE_RUNTIME,
+                 heartbeat_dir=heartbeat.HEARTBEAT_DIR):
+        self.children = list(children)
+        self.control_path = control
+        self.control = None
+        self.heartbeat_dir = heartbeat_dir
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.stable_runtime = stable_runtime
+        self.stopping = False
+        self.stop_requested = False
+
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            self.context = multiprocessing.get_context("forkserver")
+            # Import failures are ignored by the forkserver, so missing optional deps are fine
+            self.context.set_forkserver_preload(list(preload))
+        else:
+            self.context = multiprocessing.get_context("spawn")
+
+    def backoff_delay(self, child):
+        """Full-jitter exponential backoff based on consecutive fast failures"""
+        if child.fast_failures == 0:
+            return 0.0
+        ceiling = min(self.backoff_cap, self.backoff_base * (2 ** (child.fast_failures - 1)))
+        return random.uniform(0, ceiling)
+
+    def start_child(self, child):
+        # Drop the previous run's heartbeat so it can't be mistaken for the new child's
+        try:
+            os.remove(heartbeat.heartbeat_path(child.name, self.heartbeat_dir))
+        except OSError:
+            pass
+        process = self.context.Process(
+            target=run_target,
+            args=(child.module, child.attr, child.argv, child.name),
+            name=f"mind9-{child.name}"
+        )
+        process.start()
+        now = time.monotonic()
+        if child.exited_at is not None:
+            child.restart_latencies.append(now - child.exited_at)
+            child.restart_latencies = child.restart_latencies[-100:]
+            logger.info(f"[{child.name}] Restarted as PID {process.pid} "
+                        f"{now - child.exited_at:.3f}s after exit (restart #{child.restarts})")
+        else:
+            logger.info(f"[{child.name}] Started as PID {process.pid}")
+        child.process = process
+        child.started_at = now
+
+    def handle_exit(self, child):
+        now = time.monotonic()
+        runtime = now - child.started_at
+        child.last_exit_code = child.process.exitcode
+        child.process.join()
+        child.process = None
+        child.exited_at = now
+
+        if runtime < self.stable_runtime:
+            child.fast_failures += 1
+        else:
+            child.fast_failures = 0
+
+        if self.stopping:
+            return
+        if child.max_restarts is not None and child.restarts >= child.max_restarts:
+            logger.error(f"[{child.name}] Reached {child.max_restarts} restarts, not restarting")
+            child.next_start = None
+            return
+
+        delay = self.backoff_delay(child)
+        child.restarts += 1
+        metrics.RESTARTS.inc(child=child.name, exit_code=child.last_exit_code)
+        child.next_start = now + delay
+        level = logging.INFO if child.last_exit_code == 0 else logging.WARNING
+        logger.log(level, f"[{child.name}] Exited with code {child.last_exit_code} after {runtime:.1f}s; "
+                          f"restarting in {delay:.2f}s")
+
+    def check_heartbeats(self):
+        """Kill children whose heartbeat has gone stale; their exit is handled as a crash"""
+        for child in self.children:
+            if child.process is None or not child.process.is_alive():
+                continue
+            record = heartbeat.read_heartbeat(heartbeat.heartbeat_path(child.name, self.heartbeat_dir))
+            if record is None or record["pid"] != child.process.pid:
+                continue
+            if heartbeat.is_hung(record):
+                logger.error(f"[{child.name}] No heartbeat for {record['age']:.2f}s "
+                             f"(expected every {record['interval']:.2f}s), killing PID {child.process.pid}")
+                child.hang_kills += 1
+                metrics.HANG_KILLS.inc(child=child.name)
+                child.process.kill()
+
+    def open_control(self):
+        if not self.control_path:
+            return
+        try:
+            os.unlink(self.control_path)
+        except FileNotFoundError:
+            pass
+        self.control = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.control.bind(self.control_path)
+        self.control.listen(8)
+        self.control.setblocking(False)
+
+    def close_control(self):
+        if self.control is None:
+            return
+        self.control.close()
+        self.control = None
+        try:
+            os.unlink(self.control_path)
+        except OSError:
+            pass
+
+    def handle_control(self):
+        """Answer one control command: 'stop', 'status' or 'restart <child>'"""
+        try:
+            conn, _ = self.control.accept()
+        except (BlockingIOError, InterruptedError):
+            return
+        with conn:
+            conn.settimeout(1.0)
+            try:
+                command = conn.recv(1024).decode().split()
+            except (OSError, UnicodeDecodeError):
+                return
+            if command == ["stop"]:
+                logger.info("Stop requested over the control socket")
+                self.stop()
+                reply = {"ok": True}
+            elif command == ["status"]:
+                reply = {"ok": True, "pid": os.getpid(), "children": self.stats(),
+                         "heartbeats": heartbeat.read_all(self.heartbeat_dir)}
+            elif len(command) == 2 and command[0] == "restart":
+                child = next((c for c in self.children if c.name == command[1]), None)
+                if child and child.process is not None:
+                    logger.info(f"[{child.name}] Restart requested over the control socket")
+                    child.process.terminate()
+                reply = {"ok": child is not None}
+            else:
+                reply = {"ok": False, "error": f"unknown command: {' '.join(command)}"}
+            try:
+                conn.sendall(json.dumps(reply, default=str).encode())
+            except OSError:
+                pass
+
+    def run(self):
+        """Supervise until stop() is called (by signal or control socket) or no child can restart"""
+        signal.signal(signal.SIGTERM, lambda signum, frame: self.stop())
+        signal.signal(signal.SIGINT, lambda signum, frame: self.stop())
+        self.open_control()
+        try:
+            while not self.stopping:
+                now = time.monotonic()
+                for child in self.children:
+                    if child.process is None and child.next_start is not None and child.next_start <= now:
+                        self.start_child(child)
+
+                live = [child for child in self.children if child.process is not None]
+                pending = [child.next_start for child in self.children
+                           if child.process is None and child.next_start is not None]
+                if not live and not pending:
+                    logger.error("No children left to supervise")
+                    break
+
+                # Sleep until a child exits, a control command arrives, a restart is due,
+                # or it's time to check heartbeats
+                timeout = HEARTBEAT_CHECK_INTERVAL
+                if pending:
+                    timeout = max(0.0, min(timeout, min(pending) - now))
+                handles = [child.process.sentinel for child in live]
+                if self.control is not None:
+                    handles.append(self.control)
+                ready = wait(handles, timeout=timeout)
+                for child in live:
+                    if child.process.sentinel in ready:
+                        self.handle_exit(child)
+                if self.control is not None and self.control in ready:
+                    self.handle_control()
+                self.check_heartbeats()
+        finally:
+            self.close_control()
+            self.shutdown()
+
+    def stop(self):
+        self.stop_requested = True
+        self.stopping = True
+
+    def shutdown(self):
+        """Terminate running children, escalating to SIGKILL after STOP_TIMEOUT"""
+        self.stopping = True
+        live = [child for child in self.children if child.process is not None]
+        for child in live:
+            logger.info(f"[{child.name}] Sending SIGTERM to PID {child.process.pid}")
+            child.process.terminate()
+        deadline = time.monotonic() + STOP_TIMEOUT
+        for child in live:
+            child.process.join(max(0.0, deadline - time.monotonic()))
+            if child.process.is_alive():
+                logger.warning(f"[{child.name}] Did not stop in time, killing")
+                child.process.kill()
+                child.process.join()
+            child.process = None
+        for child in self.children:
+            try:
+                os.remove(heartbeat.heartbeat_path(child.name, self.heartbeat_dir))
+            except OSError:
+                pass
+
+    def stats(self):
+        return {child.name: child.stats() for child in self.children}
+
+def send_command(command, path=CONTROL_SOCKET, timeout=5.0):
+    """Send a command to a running supervisor; returns its reply, or None if none is listening"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            sock.sendall(command.encode())
+            sock.shutdown(socket.SHUT_WR)
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except (FileNotFoundError, ConnectionRefusedError, socket.timeout):
+        return None
+    return json.loads(b"".join(chunks) or b"null")
+
+if __name__ == "__main__":
+    # Usage: python supervisor.py [mind9] [twitter_bot] [--control SOCKET]
+    #        python supervisor.py ctl stop|status|restart <child> [--control SOCKET]
+    args = sys.argv[1:]
+    control = CONTROL_SOCKET
+    if "--control" in args:
+        index = args.index("--control")
+        control = args[index + 1]
+        del args[index:index + 2]
+
+    if args and args[0] == "ctl":
+        reply = send_command(" ".join(args[1:]) or "status", control)
+        if reply is None:
+            print(f"No supervisor listening on {control}")
+            sys.exit(1)
+        print(json.dumps(reply, indent=2, default=str))
+        sys.exit(0 if reply.get("ok") else 1)
+
+    names = args or list(CHILDREN)
+    unknown = [name for name in names if name not in CHILDREN]
+    if unknown:
+        print(f"Unknown children: {', '.join(unknown)}; choose from {', '.join(CHILDREN)}")
+        sys.exit(2)
+
+    # One log per supervisor: two processes rotating the same file would clobber each other
+    from async_logging import setup_logging
+    log_name = "mind9_supervisor" if names == ["mind9"] else f"{'_'.join(names)}_supervisor"
+    setup_logging(files=[(f"logs/{log_name}.log", logging.INFO)])
+    metrics.start_exporter(log_name)
+
+    supervisor = Supervisor([CHILDREN[name]() for name in names], control=control)
+    supervisor.run()
+    logger.info(f"Supervisor stopped: {supervisor.stats()}")
+    # A non-zero exit tells start_mind9.sh the supervisor gave up rather than being stopped
+    sys.exit(0 if supervisor.stop_requested else 1)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for the /api/coins listing
+Cursor pagination, field selection, compressed variants, ETag revalidation,
+HEAD parity with GET and cross-process invalidation through the change marker
+"""
+
+import gzip
+import json
+import threading
+import http.client
+
+import pytest
+
+import simple_python_server as server_module
+from coin_store import CoinStore
+
+COINS = [
+    {"id": index, "name": f"Coin {index}", "symbol": f"C{index}", "minted": True}
+    for index in range(1, 6)
+]
+
+class FakeManager:
+    def __init__(self, coins):
+        self.coins = coins
+
+    def get_all_minted_coins(self):
+        return list(self.coins)
+
+class QuietHandler(server_module.Mind9Handler):
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def listing(tmp_path, monkeypatch):
+    listing = server_module.CoinListing(FakeManager(COINS), check_interval=0,
+                                        marker=str(tmp_path / "coins_changed"))
+    monkeypatch.setattr(server_module, "COIN_LISTING", listing)
+    return listing
+
+@pytest.fixture
+def server(listing):
+    httpd = server_module.Mind9Server(("127.0.0.1", 0), QuietHandler, workers=2)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.draining = True
+    httpd.server_close()
+
+def request(httpd, path, method="GET", headers=None):
+    conn = http.client.HTTPConnection(*httpd.server_address, timeout=10)
+    try:
+        conn.request(method, path, headers=headers or {})
+        response = conn.getresponse()
+        return response, response.read()
+    finally:
+        conn.close()
+
+def test_cursor_pagination_walks_every_coin_once(listing):
+    seen = []
+    cursor = None
+    while True:
+        response = listing.get_response(cursor=cursor, limit=2)
+        seen.extend(coin["id"] for coin in json.loads(response["body"]))
+        cursor = response["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [1, 2, 3, 4, 5]
+
+def test_unknown_cursor_and_bad_limit_are_rejected(listing):
+    with pytest.raises(ValueError):
+        listing.get_response(cursor="999")
+    with pytest.raises(ValueError):
+        listing.get_response(limit=0)
+
+def test_fields_selects_only_requested_keys(listing):
+    page = json.loads(listing.get_response(limit=2, fields="id,symbol,missing")["body"])
+    assert page == [{"id": 1, "symbol": "C1"}, {"id": 2, "symbol": "C2"}]
+
+def test_gzip_variant_decodes_to_identity_body(server):
+    _, identity = request(server, "/api/coins")
+    response, body = request(server, "/api/coins", headers={"Accept-Encoding": "gzip"})
+    assert response.getheader("Content-Encoding") == "gzip"
+    assert response.getheader("Vary") == "Accept-Encoding"
+    assert gzip.decompress(body) == identity
+    assert json.loads(identity) == COINS
+
+def test_brotli_variant_decodes_to_identity_body(server):
+    brotli = pytest.importorskip("brotli")
+    _, identity = request(server, "/api/coins")
+    response, body = request(server, "/api/coins", headers={"Accept-Encoding": "gzip, br"})
+    assert response.getheader("Content-Encoding") == "br"
+    assert brotli.decompress(body) == identity
+
+def test_matching_etag_gets_304(server):
+    response, _ = request(server, "/api/coins?limit=2")
+    etag = response.getheader("ETag")
+    assert response.getheader("X-Next-Cursor") == "2"
+
+    response, body = request(server, "/api/coins?limit=2", headers={"If-None-Match": etag})
+    assert response.status == 304
+    assert body == b""
+    assert response.getheader("ETag") == etag
+
+    # A different variant has its own ETag
+    response, _ = request(server, "/api/coins?limit=3", headers={"If-None-Match": etag})
+    assert response.status == 200
+
+def test_head_matches_get_for_dynamic_routes(server):
+    get_response, get_body = request(server, "/api/coins")
+    head_response, head_body = request(server, "/api/coins", method="HEAD")
+    assert head_response.status == get_response.status == 200
+    assert head_body == b""
+    assert head_response.getheader("Content-Length") == str(len(get_body))
+    assert head_response.getheader("ETag") == get_response.getheader("ETag")
+
+    # The metrics body changes with every request, so only the status and headers compare
+    head_response, head_body = request(server, "/metrics", method="HEAD")
+    assert head_response.status == 200
+    assert head_body == b""
+    assert head_response.getheader("Content-Type").startswith("text/plain")
+
+def test_store_writes_touch_marker_and_invalidate_listing(tmp_path):
+    marker = tmp_path / "coins_changed"
+    writer = CoinStore(":memory:", change_marker=str(marker))
+    reader = CoinStore(":memory:", change_marker=None)
+    reader.admin_create_coin("First", "ONE", mint_address="Mint1")
+
+    # The reader's listing is not attached to the writer, as if it lived in another process
+    listing = server_module.CoinListing(check_interval=0, marker=str(marker))
+    listing.manager = reader
+    assert [coin["symbol"] for coin in json.loads(listing.get_response()["body"])] == ["ONE"]
+    version = listing.version
+
+    reader.admin_create_coin("Second", "TWO", mint_address="Mint2")
+    writer.admin_create_coin("Other", "OTH", mint_address="Mint3")
+    assert marker.exists()
+    assert [coin["symbol"] for coin in json.loads(listing.get_response()["body"])] == ["ONE", "TWO"]
+    assert listing.version == version + 1
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for the bot state store
+Coalesced saves reach disk on their own, SIGTERM flushes pending changes, and
+a crash mid-write or a legacy document loads cleanly
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import subprocess
+
+from bot_state import BotStateStore
+
+def read_state(path):
+    with open(path) as f:
+        return json.load(f)
+
+def test_coalesced_save_is_flushed_by_deadline(tmp_path):
+    path = str(tmp_path / "state.json")
+    store = BotStateStore(path, flush_interval=0.3, handle_signals=False)
+    try:
+        store.set("a", 1)
+        assert store.save(force=True)
+        store.set("b", 2)
+        assert not store.save()
+        assert "b" not in read_state(path)
+
+        time.sleep(0.6)
+        assert read_state(path)["b"] == 2
+        assert not store.dirty
+    finally:
+        store.close()
+
+def test_sigterm_flushes_pending_changes(tmp_path):
+    path = str(tmp_path / "state.json")
+    script = f"""
+import os, signal, time
+from bot_state import BotStateStore
+store = BotStateStore({path!r}, flush_interval=3600)
+store.flush_on_signals()
+store.set("a", 1)
+store.save(force=True)
+store.set("b", 2)
+store.save()
+os.kill(os.getpid(), signal.SIGTERM)
+time.sleep(5)
+"""
+    result = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            timeout=30)
+    assert result.returncode == 128 + signal.SIGTERM
+    assert read_state(path)["b"] == 2
+
+def test_sigterm_during_a_change_waits_for_it(tmp_path):
+    path = str(tmp_path / "state.json")
+    script = f"""
+import os, signal, time
+from bot_state import BotStateStore
+store = BotStateStore({path!r}, flush_interval=3600)
+store.flush_on_signals()
+with store._locked():
+    store.values["a"] = 1
+    os.kill(os.getpid(), signal.SIGTERM)
+    time.sleep(0.2)
+    # The handler has run by now but must not have flushed half of the change
+    assert not os.path.exists({path!r})
+    store.values["b"] = 2
+    store.dirty = True
+time.sleep(5)
+"""
+    result = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            timeout=30)
+    assert result.returncode == 128 + signal.SIGTERM
+    state = read_state(path)
+    assert state["a"] == 1 and state["b"] == 2
+
+def test_recovers_from_crash_mid_write(tmp_path):
+    path = str(tmp_path / "state.json")
+    store = BotStateStore(path, handle_signals=False)
+    store.update(total_tweets=3)
+    store.mark_announced("COIN1")
+    store.close()
+
+    # A crash between writing the temporary file and renaming it leaves the old state in place
+    with open(tmp_path / ".tmp-partialstate.json", "w") as f:
+        f.write('{"total_tweets": 4')
+    # An announcement appended after the last document write
+    with open(path + ".announced", "a") as f:
+        f.write("COIN2\n")
+
+    store = BotStateStore(path, handle_signals=False)
+    assert store.get("total_tweets") == 3
+    assert store.is_announced("COIN1") and store.is_announced("COIN2")
+    store.close()
+
+def test_corrupt_document_starts_fresh_but_keeps_announced(tmp_path):
+    path = str(tmp_path / "state.json")
+    store = BotStateStore(path, handle_signals=False)
+    store.mark_announced("COIN1")
+    store.close()
+    with open(path, "w") as f:
+        f.write("{not json")
+
+    store = BotStateStore(path, handle_signals=False)
+    assert store.get("total_tweets") is None
+    assert store.is_announced("COIN1")
+    store.close()
+
+def test_legacy_announced_list_is_migrated(tmp_path):
+    path = str(tmp_path / "state.json")
+    with open(path, "w") as f:
+        json.dump({"announced_coins": ["A", "B"], "total_tweets": 7}, f)
+
+    store = BotStateStore(path, handle_signals=False)
+    assert store.is_announced("A") and store.is_announced("B")
+    state = read_state(path)
+    assert "announced_coins" not in state
+    assert state["announced_coins_count"] == 2
+    store.close()
+
+def test_legacy_announced_keeps_writing_the_list(tmp_path):
+    path = str(tmp_path / "state.json")
+    store = BotStateStore(path, legacy_announced=True, handle_signals=False)
+    store.mark_announced("A")
+    store.mark_announced("B")
+    store.close()
+    assert read_state(path)["announced_coins"] == ["A", "B"]
+
+    store = BotStateStore(path, legacy_announced=True, handle_signals=False)
+    assert store.is_announced("A")
+    store.close()
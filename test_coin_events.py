@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for coin change notifications
+A published coin event wakes the watcher long before its polling interval,
+and without events the poll backs off
+"""
+
+import time
+
+from coin_events import CoinEventListener, CoinWatcher, publish_coin_event
+
+class FakeCheck:
+    """Returns queued changes, recording when each check ran"""
+
+    def __init__(self):
+        self.pending = []
+        self.calls = []
+
+    def __call__(self):
+        self.calls.append(time.monotonic())
+        changes, self.pending = self.pending, []
+        return changes
+
+def start_watcher(tmp_path, check, handled, **kwargs):
+    listener = CoinEventListener("test", socket_dir=str(tmp_path))
+    watcher = CoinWatcher(check, handled.extend, listener=listener, **kwargs)
+    return watcher, watcher.start()
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_event_wakes_watcher_before_backoff_timeout(tmp_path):
+    check, handled = FakeCheck(), []
+    watcher, _ = start_watcher(tmp_path, check, handled, min_interval=30, max_interval=60)
+    try:
+        assert wait_for(lambda: len(check.calls) == 1)
+        check.pending = [{"id": 1, "symbol": "NEW"}]
+        start = time.monotonic()
+        assert publish_coin_event("coin_minted", {"id": 1, "symbol": "NEW"}, socket_dir=str(tmp_path)) == 1
+        assert wait_for(lambda: handled)
+        assert time.monotonic() - start < 2
+        assert handled == [{"id": 1, "symbol": "NEW"}]
+        # A change resets the fallback interval
+        assert watcher.interval == 30
+    finally:
+        watcher.stop()
+
+def test_polls_with_backoff_without_events(tmp_path):
+    check, handled = FakeCheck(), []
+    watcher, _ = start_watcher(tmp_path, check, handled, min_interval=0.05, max_interval=0.2, backoff=2.0)
+    try:
+        assert wait_for(lambda: len(check.calls) >= 5)
+    finally:
+        watcher.stop()
+    gaps = [b - a for a, b in zip(check.calls, check.calls[1:])]
+    # 0.1, 0.2, 0.2, ...: each empty poll stretches the interval up to max_interval
+    assert gaps[0] >= 0.09
+    assert all(gap >= 0.19 for gap in gaps[1:4])
+    assert watcher.interval == 0.2
+    assert handled == []
+
+def test_stop_interrupts_a_long_wait(tmp_path):
+    check, handled = FakeCheck(), []
+    watcher, thread = start_watcher(tmp_path, check, handled, min_interval=60)
+    assert wait_for(lambda: len(check.calls) == 1)
+    watcher.stop()
+    thread.join(2)
+    assert not thread.is_alive()
+    assert len(check.calls) == 1
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Tests for the indexed coin store
+Bulk creation returns exactly the rows it inserted, even when another writer
+touches them straight after the insert commits
+"""
+
+from coin_store import CoinStore
+from db_pool import ConnectionPool, sqlite_connector
+
+def make_store(tmp_path):
+    path = str(tmp_path / "coins.db")
+    return CoinStore(path, pool=ConnectionPool(sqlite_connector(path), name="test_coins"), change_marker=None)
+
+def test_bulk_create_returns_rows_changed_right_after_commit(tmp_path):
+    store = make_store(tmp_path)
+    real_execute = store.pool.execute
+    raced = []
+
+    def execute(*args, **kwargs):
+        # Another writer bumps the first new coin's change_seq before any follow-up read
+        if not raced:
+            raced.append(store.make_coin_mintable(1))
+        return real_execute(*args, **kwargs)
+
+    store.pool.execute = execute
+    try:
+        created = store.admin_create_coins(
+            {"name": f"Coin {i}", "symbol": f"C{i}", "mint_address": f"Mint{i}"} for i in range(3)
+        )
+        store.watermark()
+    finally:
+        store.close()
+
+    assert raced == [True]
+    assert [coin["symbol"] for coin in created] == ["C0", "C1", "C2"]
+    # The rows are as inserted, not as the other writer left them
+    assert [coin["change_seq"] for coin in created] == [1, 2, 3]
+    assert not created[0]["user_mintable"]
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Tests for the generation cache
+Eviction works from the in-memory size index and never walks the cache directory
+"""
+
+import os
+
+from generation_cache import GenerationCache
+
+def test_evicts_oldest_entries_without_walking(tmp_path, monkeypatch):
+    cache = GenerationCache(cache_dir=str(tmp_path), max_bytes=1000)
+
+    def no_walk(*args, **kwargs):
+        raise AssertionError("evict() walked the cache directory")
+    monkeypatch.setattr(os, "walk", no_walk)
+
+    for index in range(10):
+        cache.put_text(f"{index:064x}", "x" * 200)
+
+    assert cache.total_bytes <= 1000
+    assert cache.evictions > 0
+    assert cache.get_text(f"{9:064x}") == "x" * 200
+    assert cache.get_text(f"{0:064x}") is None
+
+def test_index_is_rebuilt_from_disk(tmp_path):
+    source = tmp_path / "image.png"
+    source.write_bytes(b"\x89PNG" + b"\0" * 500)
+    first = GenerationCache(cache_dir=str(tmp_path / "cache"))
+    first.put_text("a" * 64, "hello")
+    first.put_file("b" * 64, str(source))
+
+    second = GenerationCache(cache_dir=str(tmp_path / "cache"))
+    assert second.total_bytes == first.total_bytes
+    assert list(second.entries) == list(first.entries)
+
+def test_overwrite_and_delete_keep_total_in_step(tmp_path):
+    cache = GenerationCache(cache_dir=str(tmp_path))
+    key = "c" * 64
+    cache.put_text(key, "short")
+    cache.put_text(key, "a much longer piece of text")
+    assert cache.total_bytes == os.path.getsize(cache._path(key, ".json"))
+    cache.delete(key)
+    assert cache.total_bytes == 0
+    assert cache.entries == {}
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for heartbeats and hang detection
+Hang detection is opt-in: library code never arms it, a scheduled slot leaves
+the owning loop its announcement budget, and the supervisor kills an armed
+child that stops beating
+"""
+
+import os
+import time
+import struct
+import textwrap
+from datetime import datetime
+
+import pytest
+
+import heartbeat
+import supervisor
+from tweet_scheduler import TweetScheduler
+
+INTERVAL = 0.2
+
+@pytest.fixture
+def armed(tmp_path, monkeypatch):
+    beat = heartbeat.Heartbeat("test", interval=INTERVAL, directory=str(tmp_path))
+    monkeypatch.setattr(heartbeat, "_current", beat)
+    yield beat
+    heartbeat.unregister()
+
+def test_not_armed_without_register(tmp_path, monkeypatch):
+    monkeypatch.setenv(heartbeat.HEARTBEAT_ENV, "twitter_bot")
+    monkeypatch.setattr(heartbeat, "_current", None)
+    assert heartbeat.current() is None
+
+    # A library loop waiting on a slot must not publish a heartbeat by itself
+    scheduler = TweetScheduler(state_file=str(tmp_path / "state.json"), slots=[(8, 30)],
+                               clock=lambda: datetime(2024, 1, 1, 8, 30))
+    assert scheduler.wait_for_next() == ("slot", datetime(2024, 1, 1, 8, 30))
+    assert heartbeat.current() is None
+    assert list(tmp_path.glob("*.hb")) == []
+
+def test_register_uses_supervisor_name(tmp_path, monkeypatch):
+    monkeypatch.setenv(heartbeat.HEARTBEAT_ENV, "twitter_bot")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(heartbeat, "_current", None)
+    beat = heartbeat.register(interval=INTERVAL)
+    path = heartbeat.heartbeat_path("twitter_bot")
+    try:
+        assert beat is heartbeat.current()
+        assert heartbeat.read_heartbeat(path)["pid"] > 0
+    finally:
+        heartbeat.unregister()
+    assert heartbeat.current() is None
+    assert not (tmp_path / path).exists()
+
+def test_reader_skips_a_record_being_written(armed):
+    # Odd sequence number: the writer is partway through an update
+    struct.pack_into("<Q", armed.map, 12, armed.seq + 1)
+    assert heartbeat.read_heartbeat(armed.path, retries=3) is None
+
+def test_reader_retries_when_a_write_overlaps_the_read(armed, monkeypatch):
+    real_pread = os.pread
+    calls = []
+
+    def pread(fd, length, offset):
+        calls.append(offset)
+        if len(calls) == 2:
+            # A whole beat lands between the first sequence read and the record read
+            armed.beat(cycles=1)
+        return real_pread(fd, length, offset)
+
+    monkeypatch.setattr(heartbeat.os, "pread", pread)
+    record = heartbeat.read_heartbeat(armed.path)
+    assert len(calls) == 6
+    assert record["seq"] == armed.seq
+    assert record["counters"]["cycles"] == 1
+
+def test_fired_slot_allows_a_full_announcement(armed, tmp_path):
+    scheduler = TweetScheduler(state_file=str(tmp_path / "state.json"), slots=[(8, 30)],
+                               clock=lambda: datetime(2024, 1, 1, 8, 30), announce_budget=60)
+    assert scheduler.wait_for_next()[0] == "slot"
+
+    # The announcement runs for longer than HANG_FACTOR heartbeat intervals
+    time.sleep(INTERVAL * heartbeat.HANG_FACTOR + 0.3)
+    record = heartbeat.read_heartbeat(armed.path)
+    assert record["counters"]["cycles"] == 1
+    assert not heartbeat.is_hung(record)
+
+def test_wakeup_allows_a_full_announcement(armed, tmp_path):
+    scheduler = TweetScheduler(state_file=str(tmp_path / "state.json"), slots=[(8, 30)],
+                               clock=lambda: datetime(2024, 1, 1, 9, 0), announce_budget=60)
+    scheduler.wake("new_coin")
+    assert scheduler.wait_for_next() == ("new_coin", None)
+    time.sleep(INTERVAL * heartbeat.HANG_FACTOR + 0.3)
+    assert not heartbeat.is_hung(heartbeat.read_heartbeat(armed.path))
+
+def test_silent_armed_heartbeat_is_hung(armed):
+    time.sleep(INTERVAL * heartbeat.HANG_FACTOR + 0.3)
+    assert heartbeat.is_hung(heartbeat.read_heartbeat(armed.path))
+
+def test_supervisor_kills_armed_child_that_stops_beating(tmp_path, monkeypatch):
+    (tmp_path / "hanging_target.py").write_text(textwrap.dedent(f"""
+        import time
+        import heartbeat
+
+        def main():
+            heartbeat.register(interval={INTERVAL})
+            time.sleep(60)
+
+        def quiet():
+            # Never arms hang detection, so going quiet is fine
+            time.sleep(60)
+    """))
+    monkeypatch.chdir(tmp_path)
+    heartbeat_dir = str(tmp_path / heartbeat.HEARTBEAT_DIR)
+    hanging = supervisor.ChildSpec("hanging", "hanging_target", "main")
+    quiet = supervisor.ChildSpec("quiet", "hanging_target", "quiet")
+    sup = supervisor.Supervisor([hanging, quiet], control=None, preload=[], heartbeat_dir=heartbeat_dir)
+    try:
+        for child in (hanging, quiet):
+            sup.start_child(child)
+        deadline = time.monotonic() + 20
+        while hanging.hang_kills == 0 and time.monotonic() < deadline:
+            sup.check_heartbeats()
+            time.sleep(0.05)
+
+        assert hanging.hang_kills == 1
+        hanging.process.join(5)
+        assert hanging.process.exitcode == -9
+        assert quiet.hang_kills == 0
+        assert quiet.process.is_alive()
+    finally:
+        sup.shutdown()
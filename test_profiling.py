@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests for cycle profiling
+Explicit cycles and heartbeat beats both produce slow-cycle and stall dumps
+"""
+
+import time
+
+import heartbeat
+import profiling
+
+def make_profiler(tmp_path):
+    return profiling.CycleProfiler("test", directory=str(tmp_path), interval=0.01, window=10, cooldown=0).start()
+
+def dumps(tmp_path, reason):
+    return sorted(tmp_path.glob(f"*-test-{reason}.folded"))
+
+def test_slow_explicit_cycle_dumps_stall_and_slow(tmp_path):
+    profiler = make_profiler(tmp_path)
+    try:
+        with profiler.cycle(budget=0.1):
+            time.sleep(0.4)
+        assert len(dumps(tmp_path, "stall")) == 1
+        assert len(dumps(tmp_path, "slow")) == 1
+        # Idle time after an explicit cycle is not a stall
+        time.sleep(0.3)
+        assert len(dumps(tmp_path, "stall")) == 1
+    finally:
+        profiler.stop()
+
+def test_fast_cycle_writes_nothing(tmp_path):
+    profiler = make_profiler(tmp_path)
+    try:
+        with profiler.cycle(budget=5):
+            time.sleep(0.05)
+        assert profiler.dumps == 0
+    finally:
+        profiler.stop()
+
+def test_beats_delimit_cycles(tmp_path):
+    profiler = make_profiler(tmp_path)
+    beat = heartbeat.Heartbeat("test", interval=0.1, directory=str(tmp_path / "hb"))
+    try:
+        beat.beat(expect=0.1)
+        time.sleep(0.4)
+        beat.beat(cycles=1)
+        assert len(dumps(tmp_path, "stall")) == 1
+        assert len(dumps(tmp_path, "slow")) == 1
+    finally:
+        profiler.stop()
+        beat.close()
+
+def test_module_cycle_is_a_no_op_when_profiling_is_off(monkeypatch):
+    monkeypatch.setattr(profiling, "_active", None)
+    with profiling.cycle(budget=0.01):
+        time.sleep(0.02)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the HTTP server worker pool
+Idle keep-alive connections must not starve new requests, and a full queue
+is answered with 503 instead of piling up
+"""
+
+import time
+import socket
+import threading
+import http.client
+
+import simple_python_server as server_module
+
+class SlowHandler(server_module.Mind9Handler):
+    # Idle keep-alive connections would otherwise hold their worker for 30 s
+    timeout = 30
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == '/slow':
+            time.sleep(1.5)
+        body = b'ok'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def start_server(workers, queue_size=server_module.SERVER_QUEUE_SIZE):
+    httpd = server_module.Mind9Server(("127.0.0.1", 0), SlowHandler, workers=workers, queue_size=queue_size)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+def stop_server(httpd):
+    httpd.shutdown()
+    httpd.draining = True
+    httpd.server_close()
+
+def test_idle_keepalive_connections_do_not_starve_new_requests():
+    httpd = start_server(workers=2)
+    idle = []
+    try:
+        # More idle keep-alive connections than workers, each having made one request
+        for _ in range(4):
+            conn = http.client.HTTPConnection(*httpd.server_address, timeout=10)
+            conn.request("GET", "/")
+            assert conn.getresponse().read() == b'ok'
+            idle.append(conn)
+
+        start = time.monotonic()
+        conn = http.client.HTTPConnection(*httpd.server_address, timeout=10)
+        conn.request("GET", "/")
+        response = conn.getresponse()
+        assert response.status == 200
+        assert response.read() == b'ok'
+        # Far below the 30 s keep-alive timeout the idle connections would otherwise hold
+        assert time.monotonic() - start < 3
+        conn.close()
+    finally:
+        for conn in idle:
+            conn.close()
+        stop_server(httpd)
+
+def test_full_queue_is_answered_with_503():
+    httpd = start_server(workers=1, queue_size=1)
+    busy = []
+    try:
+        # One connection occupies the only worker, a second waits in the queue
+        for _ in range(2):
+            conn = http.client.HTTPConnection(*httpd.server_address, timeout=10)
+            conn.request("GET", "/slow")
+            busy.append(conn)
+        time.sleep(0.3)
+
+        overflow = socket.create_connection(httpd.server_address, timeout=5)
+        overflow.sendall(b"GET / HTTP/1.1\r\nHost: test\r\n\r\n")
+        reply = overflow.recv(1024)
+        overflow.close()
+        assert reply.startswith(b"HTTP/1.1 503")
+        assert httpd.rejected == 1
+
+        # The accepted ones are still served
+        for conn in busy:
+            assert conn.getresponse().status == 200
+    finally:
+        for conn in busy:
+            conn.close()
+        stop_server(httpd)
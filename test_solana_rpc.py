@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched Solana RPC client
+Against the fake RPC node: the concurrency limit covers single calls, the
+account cache is trimmed oldest-first, and a non-JSON 200 is an RPCError
+"""
+
+import threading
+import http.server
+
+import pytest
+
+from fake_services import FakeSolanaRPC
+from solana_rpc import SolanaRPC, RPCError
+
+def test_call_respects_concurrency_limit():
+    with FakeSolanaRPC(latency=0.2) as node:
+        client = SolanaRPC(node.url, concurrency=2, retries=0)
+        threads = [threading.Thread(target=client.call, args=("getHealth",)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert client.stats()["round_trips"] == 6
+        assert client.stats()["connections_opened"] <= 2
+
+def test_cache_is_trimmed_oldest_first():
+    with FakeSolanaRPC() as node:
+        client = SolanaRPC(node.url, cache_ttl=60, cache_max=5, retries=0)
+        addresses = [f"Mint{i}" for i in range(8)]
+        client.get_accounts(addresses[:4])
+        client.get_accounts(addresses[4:])
+        assert list(client.cache) == addresses[3:]
+
+        round_trips = client.stats()["round_trips"]
+        client.get_accounts(addresses[3:])
+        assert client.stats()["round_trips"] == round_trips
+        client.get_accounts(addresses[:1])
+        assert client.stats()["round_trips"] == round_trips + 1
+
+class HTMLHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b"<html><body>Bad gateway</body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def test_non_json_response_raises_rpc_error():
+    server = http.server.HTTPServer(("127.0.0.1", 0), HTMLHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = SolanaRPC(f"http://127.0.0.1:{server.server_address[1]}", retries=0)
+        with pytest.raises(RPCError) as error:
+            client.call("getHealth")
+        assert error.value.code == 200
+        with pytest.raises(RPCError):
+            client.get_accounts(["Mint1"])
+        assert client.inflight == {}
+    finally:
+        server.shutdown()
+        server.server_close()
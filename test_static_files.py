@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for static assets and coin images
+Byte ranges and conditional requests on cached and streamed files, the image
+cache's byte bound, and the manifest picking up rebuilt front-end files
+"""
+
+import os
+import gzip
+import time
+import threading
+import http.client
+import email.utils
+
+import pytest
+
+import simple_python_server as server_module
+
+IMAGE = bytes(range(256)) * 4
+SCRIPT = b"console.log('mind9');\n" * 100
+
+class QuietHandler(server_module.Mind9Handler):
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    images = tmp_path / "images"
+    images.mkdir()
+    (images / "coin.png").write_bytes(IMAGE)
+    (images / "large.png").write_bytes(IMAGE * 4)
+    public = tmp_path / "public"
+    public.mkdir()
+    (public / "app.js").write_bytes(SCRIPT)
+
+    manifest = server_module.StaticManifest(root=public, spa_fallback=False)
+    manifest.refresh()
+    monkeypatch.setattr(server_module, "STATIC_ASSETS", manifest)
+    monkeypatch.setattr(server_module, "GENERATED_IMAGES_DIR", images)
+    # large.png is over the entry bound, so it is streamed from disk with sendfile
+    monkeypatch.setattr(server_module, "IMAGE_CACHE", server_module.ImageCache(max_entry_bytes=len(IMAGE)))
+
+    httpd = server_module.Mind9Server(("127.0.0.1", 0), QuietHandler, workers=2)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.draining = True
+    httpd.server_close()
+
+def request(httpd, path, headers=None):
+    conn = http.client.HTTPConnection(*httpd.server_address, timeout=10)
+    try:
+        conn.request("GET", path, headers=headers or {})
+        response = conn.getresponse()
+        return response, response.read()
+    finally:
+        conn.close()
+
+@pytest.mark.parametrize("name, body", [("coin.png", IMAGE), ("large.png", IMAGE * 4)])
+def test_range_requests(server, name, body):
+    response, data = request(server, f"/img/coins/{name}", {"Range": "bytes=10-19"})
+    assert response.status == 206
+    assert response.getheader("Content-Range") == f"bytes 10-19/{len(body)}"
+    assert data == body[10:20]
+
+    response, data = request(server, f"/img/coins/{name}", {"Range": "bytes=-5"})
+    assert response.status == 206
+    assert data == body[-5:]
+
+    response, data = request(server, f"/img/coins/{name}", {"Range": f"bytes={len(body)}-"})
+    assert response.status == 416
+    assert response.getheader("Content-Range") == f"bytes */{len(body)}"
+    assert data == b""
+
+def test_if_range_mismatch_sends_whole_file(server):
+    response, data = request(server, "/img/coins/coin.png", {"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert response.status == 200
+    assert data == IMAGE
+
+def test_conditional_requests_get_304(server):
+    response, _ = request(server, "/img/coins/coin.png")
+    etag = response.getheader("ETag")
+
+    response, data = request(server, "/img/coins/coin.png", {"If-None-Match": etag})
+    assert response.status == 304
+    assert data == b""
+
+    later = email.utils.formatdate(time.time() + 60, usegmt=True)
+    response, _ = request(server, "/img/coins/coin.png", {"If-Modified-Since": later})
+    assert response.status == 304
+
+    earlier = email.utils.formatdate(time.time() - 3600, usegmt=True)
+    response, data = request(server, "/img/coins/coin.png", {"If-Modified-Since": earlier})
+    assert response.status == 200
+    assert data == IMAGE
+
+def test_range_on_compressible_asset_uses_identity_body(server):
+    response, data = request(server, "/app.js", {"Accept-Encoding": "gzip"})
+    assert response.getheader("Content-Encoding") == "gzip"
+    assert gzip.decompress(data) == SCRIPT
+
+    response, data = request(server, "/app.js", {"Accept-Encoding": "gzip", "Range": "bytes=0-9"})
+    assert response.status == 206
+    assert response.getheader("Content-Encoding") is None
+    assert response.getheader("Content-Range") == f"bytes 0-9/{len(SCRIPT)}"
+    assert data == SCRIPT[:10]
+
+def test_image_cache_evicts_least_recently_used_at_byte_bound(tmp_path, monkeypatch):
+    monkeypatch.setattr(server_module, "GENERATED_IMAGES_DIR", tmp_path)
+    for name in ("a.png", "b.png", "c.png"):
+        (tmp_path / name).write_bytes(b"x" * 100)
+    cache = server_module.ImageCache(max_bytes=250, revalidate=60)
+
+    assert cache.get("a.png")["body"] == b"x" * 100
+    cache.get("b.png")
+    # Touch a.png so b.png is now the least recently used
+    cache.get("a.png")
+    cache.get("c.png")
+
+    stats = cache.stats()
+    assert list(cache.entries) == ["a.png", "c.png"]
+    assert stats["bytes"] == 200
+    assert stats["evictions"] == 1
+
+def test_manifest_refresh_picks_up_new_changed_and_removed_files(tmp_path):
+    (tmp_path / "index.html").write_text("<p>one</p>")
+    (tmp_path / "old.css").write_text("p {}")
+    manifest = server_module.StaticManifest(root=tmp_path)
+    assert manifest.refresh() == (2, 0)
+    etag = manifest.lookup("/index.html")["variants"]["identity"]["etag"]
+
+    (tmp_path / "index.html").write_text("<p>two, rebuilt</p>")
+    (tmp_path / "new.js").write_text("let x;")
+    os.remove(tmp_path / "old.css")
+    assert manifest.refresh() == (2, 1)
+    assert manifest.lookup("/index.html")["variants"]["identity"]["body"] == b"<p>two, rebuilt</p>"
+    assert manifest.lookup("/index.html")["variants"]["identity"]["etag"] != etag
+    assert manifest.lookup("/new.js") is not None
+    assert manifest.lookup("/old.css") is None
+
+    # Nothing changed, nothing reloaded
+    assert manifest.refresh() == (0, 0)
+
+def test_watcher_picks_up_new_files(tmp_path):
+    manifest = server_module.StaticManifest(root=tmp_path)
+    manifest.refresh()
+    server_module.watch_static_assets(interval=0.05, manifest=manifest)
+
+    (tmp_path / "late.js").write_text("let late;")
+    deadline = time.monotonic() + 5
+    while manifest.lookup("/late.js") is None and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert manifest.lookup("/late.js") is not None
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for the tweet history store
+_repair() brings the offset index back in line with the data file after a
+crash between the two appends, read-only readers never touch the files, and
+the legacy migration is idempotent
+"""
+
+import os
+import json
+import struct
+
+import pytest
+
+from tweet_history import TweetHistoryStore, HISTORY_FILE, OFFSET_FORMAT, OFFSET_SIZE, migrate_from_json
+from twitter_status import TwitterMonitor
+
+def make_store(tmp_path, count=3):
+    store = TweetHistoryStore(str(tmp_path / "history.jsonl"))
+    store.extend({"id": i, "text": f"tweet {i}"} for i in range(count))
+    return store
+
+def ids(store):
+    return [entry["id"] for entry in store.recent(10)]
+
+def test_indexes_records_appended_after_the_index(tmp_path):
+    store = make_store(tmp_path)
+    # Crash after the data append, before the index append
+    with open(store.path, "ab") as f:
+        f.write(b'{"id": 3, "text": "tweet 3"}\n')
+    assert ids(TweetHistoryStore(store.path)) == [3, 2, 1, 0]
+
+def test_rebuilds_a_missing_index(tmp_path):
+    store = make_store(tmp_path)
+    with open(store.index_path, "wb"):
+        pass
+    assert ids(TweetHistoryStore(store.path)) == [2, 1, 0]
+
+def test_truncates_a_torn_record(tmp_path):
+    store = make_store(tmp_path)
+    with open(store.path, "ab") as f:
+        f.write(b'{"id": 3, "te')
+    repaired = TweetHistoryStore(store.path)
+    assert ids(repaired) == [2, 1, 0]
+    repaired.append({"id": 4})
+    assert ids(TweetHistoryStore(store.path)) == [4, 2, 1, 0]
+
+def test_drops_partial_and_dangling_index_entries(tmp_path):
+    store = make_store(tmp_path)
+    data_size = (tmp_path / "history.jsonl").stat().st_size
+    with open(store.index_path, "ab") as f:
+        # An entry past the end of the data file, then half an entry
+        f.write(struct.pack(OFFSET_FORMAT, data_size + 100))
+        f.write(b"\x01\x02\x03")
+    repaired = TweetHistoryStore(store.path)
+    assert len(repaired) == 3
+    assert (tmp_path / "history.jsonl.idx").stat().st_size == 3 * OFFSET_SIZE
+    assert ids(repaired) == [2, 1, 0]
+
+def test_repair_is_idempotent(tmp_path):
+    store = make_store(tmp_path)
+    before = (tmp_path / "history.jsonl.idx").read_bytes()
+    TweetHistoryStore(store.path)
+    TweetHistoryStore(store.path)
+    assert (tmp_path / "history.jsonl.idx").read_bytes() == before
+
+def test_readonly_store_never_modifies_files(tmp_path):
+    store = make_store(tmp_path)
+    with open(store.path, "ab") as f:
+        f.write(b'{"id": 3, "te')
+    before = ((tmp_path / "history.jsonl").read_bytes(), (tmp_path / "history.jsonl.idx").read_bytes())
+
+    reader = TweetHistoryStore(store.path, readonly=True)
+    assert ids(reader) == [2, 1, 0]
+    assert ((tmp_path / "history.jsonl").read_bytes(), (tmp_path / "history.jsonl.idx").read_bytes()) == before
+    with pytest.raises(ValueError):
+        reader.append({"id": 9})
+
+def test_monitor_reads_while_writer_has_half_written_line(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    writer = TweetHistoryStore(HISTORY_FILE)
+    writer.extend({"id": i, "text": f"tweet {i}"} for i in range(3))
+    line = b'{"id": 3, "text": "tweet 3"}\n'
+    offset = os.path.getsize(HISTORY_FILE)
+    # The writer is in the middle of its data append
+    with open(HISTORY_FILE, "ab") as f:
+        f.write(line[:10])
+    before = (tmp_path / HISTORY_FILE).read_bytes()
+
+    assert [tweet["id"] for tweet in TwitterMonitor().get_recent_tweets(10)] == [2, 1, 0]
+    assert (tmp_path / HISTORY_FILE).read_bytes() == before
+    assert (tmp_path / (HISTORY_FILE + ".idx")).stat().st_size == 3 * OFFSET_SIZE
+
+    # The writer finishes the record and indexes it
+    with open(HISTORY_FILE, "ab") as f:
+        f.write(line[10:])
+    with open(HISTORY_FILE + ".idx", "ab") as f:
+        f.write(struct.pack(OFFSET_FORMAT, offset))
+    assert [tweet["id"] for tweet in TwitterMonitor().get_recent_tweets(10)] == [3, 2, 1, 0]
+
+def test_interrupted_migration_is_not_imported_twice(tmp_path):
+    legacy = tmp_path / "tweet_history.json"
+    history = [{"id": 1, "timestamp": "2024-01-02"}, {"id": 0, "timestamp": "2024-01-01"}]
+    legacy.write_text(json.dumps(history))
+    store = TweetHistoryStore(str(tmp_path / "history.jsonl"))
+    # A previous run imported the records but stopped before renaming the legacy file
+    store.extend(reversed(history))
+
+    assert migrate_from_json(str(legacy), store) == 2
+    assert ids(store) == [1, 0]
+    assert not legacy.exists()
+    assert (tmp_path / "tweet_history.json.migrated").exists()
+
+def test_migration_imports_into_empty_store(tmp_path):
+    legacy = tmp_path / "tweet_history.json"
+    legacy.write_text(json.dumps([{"id": 1}, {"id": 0}]))
+    store = TweetHistoryStore(str(tmp_path / "history.jsonl"))
+    migrate_from_json(str(legacy), store)
+    assert ids(store) == [1, 0]
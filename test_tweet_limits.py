@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for the tweet limits
+The pipeline's rate limiter and the scheduler's slot picker must agree on the
+cap per rolling 24 hours and the minimum gap between tweets
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from tweet_pipeline import TweetRateLimiter
+from tweet_scheduler import next_slot_time, next_allowed_time, recent_tweet_times
+
+DAY = 24 * 3600
+GAP = 3 * 3600
+
+class FakeClock:
+    def __init__(self, start=1_700_000_000.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+def tweets_in_any_window(times, window=DAY):
+    return max(sum(1 for other in times if start <= other < start + window) for start in times)
+
+def test_limiter_never_exceeds_cap_in_any_24h_window():
+    clock = FakeClock()
+    limiter = TweetRateLimiter(capacity=2, window=DAY, min_interval=GAP, clock=clock)
+    taken = []
+    # Try once a minute for three days
+    for _ in range(3 * 24 * 60):
+        if limiter.try_acquire():
+            taken.append(clock.now)
+        clock.now += 60
+
+    assert len(taken) == 6
+    assert tweets_in_any_window(taken) == 2
+    assert min(b - a for a, b in zip(taken, taken[1:])) >= GAP
+
+def test_limiter_delay_waits_for_oldest_tweet_to_leave_window():
+    clock = FakeClock()
+    limiter = TweetRateLimiter(capacity=2, window=DAY, min_interval=GAP, clock=clock)
+    assert limiter.try_acquire()
+    assert limiter.delay() == GAP
+    clock.now += GAP
+    assert limiter.try_acquire()
+    assert limiter.delay() == DAY - GAP
+    clock.now += DAY - GAP
+    assert limiter.delay() == 0
+
+def test_limiter_acquire_sleeps_until_allowed():
+    clock = FakeClock()
+    limiter = TweetRateLimiter(capacity=1, window=DAY, min_interval=0, clock=clock)
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+        clock.now += seconds
+
+    async def run():
+        original = asyncio.sleep
+        asyncio.sleep = fake_sleep
+        try:
+            await limiter.acquire()
+            await limiter.acquire()
+        finally:
+            asyncio.sleep = original
+
+    asyncio.run(run())
+    assert slept == [DAY]
+
+def test_limiter_from_state_keeps_limits_across_restarts():
+    clock = FakeClock()
+    last = datetime.fromtimestamp(clock.now - 3600)
+    state = {"recent_tweet_times": [(last - timedelta(hours=4)).isoformat(), last.isoformat()]}
+    limiter = TweetRateLimiter.from_state(state, capacity=2, window=DAY, min_interval=GAP, clock=clock)
+    assert not limiter.try_acquire()
+    assert abs(limiter.delay() - (DAY - 5 * 3600)) < 1e-6
+
+def test_legacy_state_counts_daily_tweets_at_last_tweet_time():
+    last = datetime(2024, 1, 1, 22, 0)
+    state = {"last_tweet_time": last.isoformat(), "daily_tweet_count": 2}
+    assert recent_tweet_times(state, 2) == [last, last]
+    assert recent_tweet_times({}, 2) == []
+
+def test_next_slot_time_respects_rolling_cap_across_midnight():
+    slots = [(8, 30), (13, 15), (17, 45), (22, 0)]
+    # Tweets at 13:15 and 22:00; the 8:30 next morning would make three in 24h
+    times = [datetime(2024, 1, 1, 13, 15), datetime(2024, 1, 1, 22, 0)]
+    now = datetime(2024, 1, 1, 22, 1)
+    assert next_slot_time(now, times, slots=slots, max_per_day=2, min_gap=timedelta(hours=3)) == \
+        datetime(2024, 1, 2, 13, 15)
+
+def test_next_slot_time_respects_min_gap():
+    slots = [(8, 30), (13, 15), (17, 45), (22, 0)]
+    times = [datetime(2024, 1, 1, 11, 0)]
+    now = datetime(2024, 1, 1, 11, 5)
+    assert next_slot_time(now, times, slots=slots, max_per_day=2, min_gap=timedelta(hours=3)) == \
+        datetime(2024, 1, 1, 17, 45)
+
+def test_scheduler_and_limiter_agree():
+    times = [datetime(2024, 1, 1, 8, 30), datetime(2024, 1, 1, 13, 15)]
+    now = datetime(2024, 1, 1, 14, 0)
+    clock = FakeClock(now.timestamp())
+    limiter = TweetRateLimiter.from_state({"recent_tweet_times": [t.isoformat() for t in times]},
+                                          capacity=2, window=DAY, min_interval=GAP, clock=clock)
+    allowed = next_allowed_time(now, times, max_per_day=2, min_gap=timedelta(seconds=GAP))
+    assert allowed == now + timedelta(seconds=limiter.delay())
+
+def test_zero_cap_never_allows():
+    assert next_allowed_time(datetime(2024, 1, 1), [], max_per_day=0) is None
+    assert TweetRateLimiter(capacity=0, clock=FakeClock()).try_acquire() is False
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for the error log index
+Both the runner's formatted records and the bare messages the old error log
+handler wrote are indexed, and limited queries return the newest records
+"""
+
+import multiprocessing
+from datetime import datetime
+
+from twitter_status import ErrorLogIndex
+
+LEGACY = (
+    "Error posting tweet: 403 Forbidden\n"
+    "Traceback (most recent call last):\n"
+    '  File "twitter_bot.py", line 10, in post\n'
+    "    raise ValueError('bad')\n"
+    "ValueError: bad\n"
+    "Database connection lost\n"
+)
+
+FORMATTED = (
+    "2024-01-01 10:00:00,123 - twitter_bot - ERROR - Upload failed\n"
+    "Traceback (most recent call last):\n"
+    '  File "twitter_bot.py", line 20, in upload\n'
+    "ValueError: upload\n"
+    "2024-01-01 11:00:00,000 - twitter_bot - WARNING - Slow response\n"
+    "2024-01-01 12:00:00,000 - twitter_bot - ERROR - Post failed\n"
+)
+
+def write_log(tmp_path, text):
+    path = tmp_path / "twitter_bot_error.log"
+    path.write_text(text)
+    return str(path)
+
+def test_indexes_legacy_and_formatted_records(tmp_path):
+    index = ErrorLogIndex(write_log(tmp_path, LEGACY + FORMATTED))
+    lines = [line.strip() for line in index.query()]
+    assert lines == [
+        "Error posting tweet: 403 Forbidden",
+        "Database connection lost",
+        "2024-01-01 10:00:00,123 - twitter_bot - ERROR - Upload failed",
+        "2024-01-01 12:00:00,000 - twitter_bot - ERROR - Post failed",
+    ]
+    # Legacy records have no time, so they never match a 'since' query
+    assert len(index.query(since=datetime(2000, 1, 1))) == 2
+
+def test_limit_returns_newest_records(tmp_path):
+    index = ErrorLogIndex(write_log(tmp_path, LEGACY + FORMATTED))
+    assert [line.split(" - ")[-1].strip() for line in index.query(limit=2)] == ["Upload failed", "Post failed"]
+    assert index.query(level="WARNING", limit=5)[0].endswith("Slow response\n")
+    assert index.query(since=datetime(2024, 1, 1, 11), limit=1)[0].endswith("Post failed\n")
+
+def test_index_is_reused_and_extended(tmp_path):
+    path = write_log(tmp_path, LEGACY)
+    assert len(ErrorLogIndex(path).query()) == 2
+    with open(path, 'a') as f:
+        f.write(FORMATTED)
+    assert len(ErrorLogIndex(path).query()) == 4
+
+def update_in_child(path):
+    ErrorLogIndex(path).update()
+
+def indexed_offsets(path):
+    with open(path + ".idx") as f:
+        return [line.split('\t')[0] for line in f]
+
+def test_concurrent_updates_index_each_record_once(tmp_path):
+    path = write_log(tmp_path, "")
+    first, second = ErrorLogIndex(path), ErrorLogIndex(path)
+    for _ in range(3):
+        with open(path, 'a') as f:
+            f.write(FORMATTED)
+        first.update()
+        second.update()
+    # Two ERROR records and one WARNING per copy of FORMATTED
+    offsets = indexed_offsets(path)
+    assert len(offsets) == len(set(offsets)) == 3 * 3
+    assert len(first.query()) == len(second.query()) == 6
+
+    with open(path, 'a') as f:
+        f.write(FORMATTED * 2000)
+    # Several processes racing to extend the same sidecar index
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=update_in_child, args=(path,)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+    offsets = indexed_offsets(path)
+    assert len(offsets) == len(set(offsets)) == 2003 * 3
+    assert len(first.query()) == 2003 * 2
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Tweet History Store for Mind9
+Append-only JSON-Lines history with a fixed-width offset index, replacing the
+rewrite-everything tweet_history.json
+"""
+
+import os
+import sys
+import json
+import struct
+import logging
+import threading
+
+logger = logging.getLogger("tweet_history")
+
+HISTORY_FILE = "tweet_history.jsonl"
+LEGACY_HISTORY_FILE = "tweet_history.json"
+
+# One little-endian uint64 byte offset per record
+OFFSET_FORMAT = "<Q"
+OFFSET_SIZE = struct.calcsize(OFFSET_FORMAT)
+
+class TweetHistoryStore:
+    """Append-only tweet history.
+
+    Records are appended to a JSON-Lines file and their byte offsets to a sidecar
+    index of fixed-width entries, so append, count, recent(n) and range() never
+    have to read more than the records they return.
+
+    Readers in other processes (the status monitor) open the store with
+    readonly=True: the files are never modified, records the writer hasn't
+    indexed yet are invisible, and a half-written record is skipped.
+    """
+
+    def __init__(self, path=HISTORY_FILE, readonly=False):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.readonly = readonly
+        self.lock = threading.Lock()
+        if not readonly:
+            self._repair()
+
+    def _check_writable(self):
+        if self.readonly:
+            raise ValueError(f"{self.path} is open read-only")
+
+    def _repair(self):
+        """Bring the index in line with the data file after a crash between the two appends"""
+        data_size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        index_size = os.path.getsize(self.index_path) if os.path.exists(self.index_path) else 0
+
+        if index_size % OFFSET_SIZE:
+            index_size -= index_size % OFFSET_SIZE
+            with open(self.index_path, 'r+b') as f:
+                f.truncate(index_size)
+
+        # Drop index entries pointing past the end of the data file
+        with open(self.index_path, 'a+b') as index:
+            while index_size:
+                index.seek(index_size - OFFSET_SIZE)
+                last_offset = struct.unpack(OFFSET_FORMAT, index.read(OFFSET_SIZE))[0]
+                if last_offset < data_size:
+                    break
+                index_size -= OFFSET_SIZE
+                index.truncate(index_size)
+
+            # Index any complete records that were written after the last indexed one
+            if index_size:
+                index.seek(index_size - OFFSET_SIZE)
+                position = struct.unpack(OFFSET_FORMAT, index.read(OFFSET_SIZE))[0]
+                with open(self.path, 'rb') as data:
+                    data.seek(position)
+                    data.readline()
+                    position = data.tell()
+            else:
+                position = 0
+
+            if position < data_size:
+                with open(self.path, 'rb') as data:
+                    data.seek(position)
+                    for line in data:
+                        if not line.endswith(b'\n'):
+                            # Torn final write: cut it off so the next append starts cleanly
+                            with open(self.path, 'r+b') as f:
+                                f.truncate(position)
+                            break
+                        index.seek(0, os.SEEK_END)
+                        index.write(struct.pack(OFFSET_FORMAT, position))
+                        position += len(line)
+
+    def __len__(self):
+        try:
+            return os.path.getsize(self.index_path) // OFFSET_SIZE
+        except OSError:
+            return 0
+
+    def append(self, entry):
+        """Append one tweet record"""
+        self._check_writable()
+        line = (json.dumps(entry, default=str) + "\n").encode()
+        with self.lock:
+            with open(self.path, 'ab') as data:
+                offset = data.seek(0, os.SEEK_END)
+                data.write(line)
+            with open(self.index_path, 'ab') as index:
+                index.write(struct.pack(OFFSET_FORMAT, offset))
+
+    def extend(self, entries):
+        """Append several records with one write to each file"""
+        self._check_writable()
+        lines = [(json.dumps(entry, default=str) + "\n").encode() for entry in entries]
+        if not lines:
+            return
+        with self.lock:
+            with open(self.path, 'ab') as data:
+                offset = data.seek(0, os.SEEK_END)
+                offsets = []
+                for line in lines:
+                    offsets.append(offset)
+                    offset += len(line)
+                data.write(b"".join(lines))
+            with open(self.index_path, 'ab') as index:
+                index.write(b"".join(struct.pack(OFFSET_FORMAT, o) for o in offsets))
+
+    def range(self, start, end):
+        """Return records newest-first, from position 'start' (0 = newest) up to 'end' exclusive"""
+        count = len(self)
+        start = max(start, 0)
+        end = min(end, count)
+        if start >= end:
+            return []
+
+        # Newest-first positions [start, end) are oldest-first positions [count-end, count-start)
+        first = count - end
+        with open(self.index_path, 'rb') as index:
+            index.seek(first * OFFSET_SIZE)
+            raw = index.read((end - start) * OFFSET_SIZE)
+        offsets = [struct.unpack_from(OFFSET_FORMAT, raw, i)[0] for i in range(0, len(raw), OFFSET_SIZE)]
+
+        records = []
+        with open(self.path, 'rb') as data:
+            for offset in reversed(offsets):
+                data.seek(offset)
+                line = data.readline()
+                if not line.endswith(b'\n'):
+                    # Past the end of the data, or a record still being written
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    logger.warning(f"Skipping unreadable history record at offset {offset}")
+        return records
+
+    def recent(self, n=5):
+        """Return the 'n' newest records, newest first"""
+        return self.range(0, n)
+
+def _already_imported(store, history):
+    """Whether the store starts with exactly these records, oldest first"""
+    count = len(store)
+    if not history or count < len(history):
+        return False
+    # Oldest-first positions [0, n) are newest-first positions [count - n, count)
+    imported = list(reversed(store.range(count - len(history), count)))
+    return imported == [json.loads(json.dumps(entry, default=str)) for entry in history]
+
+def migrate_from_json(json_path=LEGACY_HISTORY_FILE, store=None):
+    """Import the legacy tweet_history.json array into the append-only store.
+
+    Returns the number of records imported. The legacy file is renamed to
+    '<name>.migrated' so the import runs only once; if a previous run stopped
+    between importing and renaming, the records already at the start of the store
+    are recognised and not imported again.
+    """
+    store = store if store is not None else TweetHistoryStore()
+    if not os.path.exists(json_path):
+        return 0
+    with open(json_path, 'r') as f:
+        history = json.load(f)
+    if not isinstance(history, list):
+        raise ValueError(f"{json_path} does not contain a JSON array")
+
+    # Store oldest first so the newest record is the last one appended
+    if history and all(isinstance(entry, dict) and entry.get("timestamp") for entry in history):
+        history = sorted(history, key=lambda entry: str(entry["timestamp"]))
+    else:
+        # The legacy file lists the newest tweets first
+        history = list(reversed(history))
+
+    if _already_imported(store, history):
+        logger.info(f"{json_path} was already imported into {store.path}, finishing the migration")
+    else:
+        store.extend(history)
+    os.replace(json_path, json_path + ".migrated")
+    logger.info(f"Migrated {len(history)} tweets from {json_path} to {store.path}")
+    return len(history)
+
+# One-shot migration from the command line
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if len(sys.argv) > 1 and sys.argv[1] == "migrate":
+        source = sys.argv[2] if len(sys.argv) > 2 else LEGACY_HISTORY_FILE
+        print(f"Migrated {migrate_from_json(source)} tweets")
+    else:
+        store = TweetHistoryStore()
+        print(f"{len(store)} tweets in {store.path}")
+        for entry in store.recent(5):
+            print(f"- [{entry.get('timestamp', 'Unknown date')}] {entry.get('text', '')}")
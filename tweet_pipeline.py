@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Async Tweet Pipeline for Mind9
+Runs text generation, image rendering, media upload and posting as an asyncio
+pipeline with per-upstream concurrency limits, per-stage timeouts and a
+rate limiter enforcing the scheduler's tweet caps
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+from collections import deque
+
+import heartbeat
+import metrics
+from tweet_scheduler import MAX_TWEETS_PER_DAY, MIN_TWEET_GAP, TWEET_WINDOW, ANNOUNCE_BUDGET, recent_tweet_times
+
+logger = logging.getLogger("tweet_pipeline")
+
+# Upstream endpoints, overridable so the pipeline can run against local stub servers
+OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL", "https://api.openai.com/v1")
+OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o")
+
+# Default per-stage timeouts in seconds
+STAGE_TIMEOUTS = {
+    "text": 30.0,
+    "image": 60.0,
+    "upload": 30.0,
+    "post": 30.0
+}
+
+class StageTimeout(Exception):
+    """A pipeline stage did not finish within its timeout"""
+
+class TweetRateLimiter:
+    """Rolling-window tweet limit with a minimum gap between tweets.
+
+    Keeps the times of the last 'capacity' tweets; a tweet is allowed once fewer than
+    'capacity' of them fall within the last 'window' seconds and the latest is at
+    least min_interval ago. These are the same limits next_slot_time() applies.
+    """
+
+    def __init__(self, capacity=MAX_TWEETS_PER_DAY, window=TWEET_WINDOW.total_seconds(),
+                 min_interval=MIN_TWEET_GAP.total_seconds(), clock=time.time):
+        self.capacity = capacity
+        self.window = window
+        self.min_interval = min_interval
+        self.clock = clock
+        self.taken = deque(maxlen=max(capacity, 1))
+        self.lock = asyncio.Lock()
+
+    @classmethod
+    def from_state(cls, state, **kwargs):
+        """Seed the limiter from twitter_bot_state.json so restarts don't reset the limits"""
+        limiter = cls(**kwargs)
+        limiter.taken.extend(when.timestamp() for when in recent_tweet_times(state, limiter.capacity))
+        return limiter
+
+    def delay(self):
+        """Seconds until a tweet is allowed (0 if one is allowed now)"""
+        if self.capacity <= 0:
+            return float("inf")
+        now = self.clock()
+        wait = 0.0
+        if self.taken:
+            wait = self.taken[-1] + self.min_interval - now
+        if len(self.taken) >= self.capacity:
+            wait = max(wait, self.taken[0] + self.window - now)
+        return max(wait, 0.0)
+
+    def try_acquire(self):
+        if self.delay() > 0:
+            return False
+        self.taken.append(self.clock())
+        return True
+
+    async def acquire(self):
+        """Wait until a tweet is allowed, then record it"""
+        async with self.lock:
+            while not self.try_acquire():
+                wait = self.delay()
+                logger.info(f"Rate limit reached, next tweet allowed in {wait:.0f}s")
+                beat = heartbeat.current()
+                if beat:
+                    # Waiting on the limit is not a hang; the rest of the announcement follows
+                    beat.beat(expect=wait + ANNOUNCE_BUDGET)
+                await asyncio.sleep(wait)
+
+class TweetPipeline:
+    """Coin announcement pipeline.
+
+    Stages are plain callables, sync or async:
+      generate_text(coin) -> str
+      render_image(coin) -> path or None
+      upload_media(path) -> media id
+      post_tweet(text, media_ids) -> tweet id
+
+    Text generation and image rendering run concurrently, the upload starts as soon
+    as the image is ready, and each upstream has its own concurrency limit.
+    """
+
+    def __init__(self, generate_text, post_tweet, render_image=None, upload_media=None,
+                 rate_limiter=None, timeouts=None, concurrency=None):
+        self.generate_text = generate_text
+        self.render_image = render_image
+        self.upload_media = upload_media
+        self.post_tweet = post_tweet
+        self.rate_limiter = rate_limiter or TweetRateLimiter()
+        self.timeouts = dict(STAGE_TIMEOUTS, **(timeouts or {}))
+        concurrency = dict({"text": 4, "image": 2, "upload": 2, "post": 1}, **(concurrency or {}))
+        self.semaphores = {stage: asyncio.Semaphore(limit) for stage, limit in concurrency.items()}
+        self.stage_times = {}
+
+    async def _run_stage(self, stage, func, *args):
+        """Run one stage under its semaphore and timeout; sync callables go to a worker thread"""
+        async with self.semaphores[stage]:
+            start = time.perf_counter()
+            beat = heartbeat.current()
+            if beat:
+                # A stage may legitimately block this process for up to its timeout
+                beat.beat(expect=self.timeouts[stage])
+            try:
+                with metrics.span(f"tweet.{stage}"):
+                    if asyncio.iscoroutinefunction(func):
+                        call = func(*args)
+                    else:
+                        call = asyncio.to_thread(func, *args)
+                    return await asyncio.wait_for(call, timeout=self.timeouts[stage])
+            except asyncio.TimeoutError:
+                metrics.STAGE_ERRORS.inc(stage=stage, reason="timeout")
+                raise StageTimeout(f"Stage '{stage}' timed out after {self.timeouts[stage]}s")
+            except Exception:
+                metrics.STAGE_ERRORS.inc(stage=stage, reason="error")
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                self.stage_times.setdefault(stage, []).append(elapsed)
+                metrics.STAGE_LATENCY.observe(elapsed, stage=stage)
+
+    async def _prepare_media(self, coin):
+        image_path = await self._run_stage("image", self.render_image, coin)
+        if not image_path or not self.upload_media:
+            return []
+        return [await self._run_stage("upload", self.upload_media, image_path)]
+
+    async def announce(self, coin):
+        """Generate, upload and post one announcement; returns the posted tweet id"""
+        # Joins the trace started when the coin was minted
+        with metrics.span("tweet.announce", trace_id=metrics.coin_trace_id(coin), symbol=coin.get("symbol")):
+            return await self._announce(coin)
+
+    async def _announce(self, coin):
+        start = time.perf_counter()
+        text_task = asyncio.create_task(self._run_stage("text", self.generate_text, coin))
+        media_task = asyncio.create_task(self._prepare_media(coin)) if self.render_image else None
+
+        try:
+            text = await text_task
+            media_ids = []
+            if media_task:
+                try:
+                    media_ids = await media_task
+                except Exception as e:
+                    # A tweet without an image is better than no tweet
+                    logger.warning(f"Media preparation failed for {coin.get('symbol')}: {e}")
+        except BaseException:
+            # Cancellation or a failed text stage stops the image work too
+            if media_task:
+                media_task.cancel()
+            raise
+
+        await self.rate_limiter.acquire()
+        tweet_id = await self._run_stage("post", self.post_tweet, text, media_ids)
+        beat = heartbeat.current()
+        if beat:
+            # Leave the owning loop its announcement budget rather than one interval
+            beat.beat(expect=ANNOUNCE_BUDGET, tweets=1)
+        logger.info(f"Announced {coin.get('symbol')} in {time.perf_counter() - start:.2f}s")
+        return tweet_id
+
+    async def announce_many(self, coins):
+        """Announce several coins concurrently; returns tweet ids or exceptions in order"""
+        return await asyncio.gather(*(self.announce(coin) for coin in coins), return_exceptions=True)
+
+def post_json(url, payload, headers=None, timeout=30):
+    """POST a JSON body and decode the JSON response (blocking; run it in a thread)"""
+    # Deferred: urllib.request pulls in http.client and email, which only posting needs
+    import urllib.request
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode(),
+        headers=dict({"Content-Type": "application/json"}, **(headers or {})),
+        method="POST"
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+def openai_text_generator(api_key=None, base_url=OPENAI_BASE_URL, model=OPENAI_MODEL):
+    """Build a generate_text stage that calls the OpenAI chat completions API"""
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+
+    def generate_text(coin):
+        prompt = (f"Write a short tweet announcing the new coin {coin.get('name')} "
+                  f"(${coin.get('symbol')}): {coin.get('description', '')}")
+        with metrics.OPENAI_LATENCY.time(endpoint="chat.completions", model=model):
+            result = post_json(
+                f"{base_url}/chat/completions",
+                {"model": model, "messages": [{"role": "user", "content": prompt}], "max_tokens": 120},
+                headers={"Authorization": f"Bearer {api_key}"}
+            )
+        return result["choices"][0]["message"]["content"].strip()
+
+    return generate_text
+
+def tweepy_stages(client, api=None):
+    """Build (upload_media, post_tweet) stages from a tweepy v2 Client and optional v1.1 API"""
+    def upload_media(image_path):
+        return api.media_upload(image_path).media_id
+
+    def post_tweet(text, media_ids):
+        response = client.create_tweet(text=text, media_ids=media_ids or None)
+        return response.data["id"]
+
+    return (upload_media if api else None), post_tweet
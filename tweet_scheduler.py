@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Tweet Slot Scheduler for Mind9
+Computes the next eligible tweet time from the fixed daily slots, the tweet cap
+and the minimum gap, and sleeps exactly until then instead of waking up to check.
+The limits defined here are shared with the pipeline's rate limiter.
+"""
+
+import os
+import json
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta
+
+import heartbeat
+
+logger = logging.getLogger("tweet_scheduler")
+
+# Fixed daily tweet slots: 8:30am, 1:15pm, 5:45pm, 10:00pm
+TWEET_SLOTS = [(8, 30), (13, 15), (17, 45), (22, 0)]
+MAX_TWEETS_PER_DAY = int(os.environ.get("MAX_TWEETS_PER_DAY", 2))
+MIN_TWEET_GAP = timedelta(seconds=float(os.environ.get("MIN_TWEET_GAP", 3 * 3600)))
+# MAX_TWEETS_PER_DAY applies to any rolling window of this length, not just a calendar day
+TWEET_WINDOW = timedelta(days=1)
+# Seconds a whole announcement (text, image, upload, post) may take between heartbeats
+ANNOUNCE_BUDGET = float(os.environ.get("TWEET_ANNOUNCE_BUDGET", 300))
+STATE_FILE = "twitter_bot_state.json"
+
+def recent_tweet_times(state, max_per_day=MAX_TWEETS_PER_DAY):
+    """Times of the latest tweets recorded in a bot state document, oldest first.
+
+    State written before recent_tweet_times was kept only has last_tweet_time and
+    daily_tweet_count; those tweets are all counted at last_tweet_time, which can
+    only make the limit stricter.
+    """
+    state = state or {}
+    times = [datetime.fromisoformat(value) for value in state.get("recent_tweet_times") or []]
+    if not times and state.get("last_tweet_time"):
+        count = min(max(state.get("daily_tweet_count", 0), 1), max(max_per_day, 1))
+        times = [datetime.fromisoformat(state["last_tweet_time"])] * count
+    return sorted(times)
+
+def next_allowed_time(now, tweet_times=(), max_per_day=MAX_TWEETS_PER_DAY, min_gap=MIN_TWEET_GAP,
+                      window=TWEET_WINDOW):
+    """Earliest time at or after 'now' when another tweet stays within the limits, or None if never.
+
+    A tweet at t is allowed when it is min_gap after the latest tweet and fewer than
+    max_per_day tweets fall in the window before t.
+    """
+    if max_per_day <= 0:
+        return None
+    times = sorted(tweet_times)
+    earliest = now
+    if times:
+        earliest = max(earliest, times[-1] + min_gap)
+    if len(times) >= max_per_day:
+        # The oldest of the last max_per_day tweets has to leave the window first
+        earliest = max(earliest, times[-max_per_day] + window)
+    return earliest
+
+def next_slot_time(now, tweet_times=(), slots=TWEET_SLOTS, max_per_day=MAX_TWEETS_PER_DAY,
+                   min_gap=MIN_TWEET_GAP, horizon_days=8):
+    """Return the first slot at or after 'now' that respects the tweet cap and minimum gap"""
+    earliest = next_allowed_time(now, tweet_times, max_per_day, min_gap)
+    if earliest is None:
+        return None
+
+    # Walk the slots in time order with a heap, one day at a time
+    candidates = []
+    for day_offset in range(horizon_days):
+        day = (earliest + timedelta(days=day_offset)).date()
+        for hour, minute in slots:
+            heapq.heappush(candidates, datetime(day.year, day.month, day.day, hour, minute))
+
+    while candidates:
+        slot = heapq.heappop(candidates)
+        if slot >= earliest:
+            return slot
+    return None
+
+class TweetScheduler:
+    """Sleeps until the next eligible slot; wake() interrupts the sleep early (e.g. for a new coin)"""
+
+    def __init__(self, state_file=STATE_FILE, slots=TWEET_SLOTS, max_per_day=MAX_TWEETS_PER_DAY,
+                 min_gap=MIN_TWEET_GAP, clock=datetime.now, announce_budget=ANNOUNCE_BUDGET):
+        self.state_file = state_file
+        self.slots = sorted(slots)
+        self.max_per_day = max_per_day
+        self.min_gap = min_gap
+        self.clock = clock
+        self.announce_budget = announce_budget
+        self.condition = threading.Condition()
+        self.pending_wakeups = []
+        self.stopped = False
+
+    def load_state(self):
+        """Read the recent tweet times from the bot state file"""
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return []
+        return recent_tweet_times(state, self.max_per_day)
+
+    def next_fire_time(self, now=None):
+        return next_slot_time(
+            now or self.clock(),
+            self.load_state(),
+            slots=self.slots,
+            max_per_day=self.max_per_day,
+            min_gap=self.min_gap
+        )
+
+    def wake(self, reason="event"):
+        """Interrupt wait_for_next() from another thread"""
+        with self.condition:
+            self.pending_wakeups.append(reason)
+            self.condition.notify_all()
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+    def wait_for_next(self):
+        """Block until the next slot or a wake(); returns ('slot', fire_time) or (reason, None).
+
+        If hang detection is armed, the waits are announced to the supervisor and the
+        return beat allows announce_budget seconds for the caller's announcement.
+        """
+        beat = heartbeat.current()
+        with self.condition:
+            while not self.stopped:
+                if self.pending_wakeups:
+                    if beat:
+                        beat.beat(expect=self.announce_budget)
+                    return self.pending_wakeups.pop(0), None
+
+                fire_time = self.next_fire_time()
+                if fire_time is None:
+                    logger.warning("No eligible tweet slot found, rechecking in an hour")
+                    if beat:
+                        beat.beat(expect=3600 + beat.interval)
+                    self.condition.wait(3600)
+                    continue
+
+                delay = (fire_time - self.clock()).total_seconds()
+                if delay > 0:
+                    logger.info(f"Next tweet slot at {fire_time.isoformat()} ({delay:.0f}s)")
+                    # Tell the supervisor this loop is sleeping on purpose, with an interval
+                    # of slack for waking up so the wait itself never counts as a slow cycle
+                    if beat:
+                        beat.beat(expect=delay + beat.interval)
+                    self.condition.wait(delay)
+                    # Woken early, stopped, or the wall clock moved: work it out again
+                    if self.pending_wakeups or self.stopped or self.clock() < fire_time:
+                        continue
+                if beat:
+                    beat.beat(expect=self.announce_budget, cycles=1)
+                return "slot", fire_time
+            return "stopped", None
+
+    def run(self, announce):
+        """Own the tweet loop: arm hang detection, then call announce(reason, fire_time) per wake-up until stop()"""
+        heartbeat.register()
+        try:
+            while True:
+                reason, fire_time = self.wait_for_next()
+                if reason == "stopped":
+                    return
+                try:
+                    announce(reason, fire_time)
+                except Exception as e:
+                    logger.error(f"Announcement for {reason} failed: {e}", exc_info=True)
+        finally:
+            heartbeat.unregister()
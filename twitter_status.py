@@ -4,11 +4,27 @@ Twitter Status Monitor for Mind9
 Checks the status of the Twitter bot and provides monitoring information
 """
 
+# Profile from the first import on when run with --profile-startup
+import startup
+startup.profile_from_argv()
+
 import os
+import re
+import sys
+import time
 import json
+import mmap
+import fcntl
+import bisect
 import logging
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 
+import heartbeat
+import metrics
+from atomic_io import write_atomic
+from tweet_history import TweetHistoryStore, HISTORY_FILE
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -19,48 +35,327 @@ logging.basicConfig(
 )
 logger = logging.getLogger("twitter_status")
 
+# Matches the header of a record written with the runner's log format (async_logging.LOG_FORMAT)
+LOG_LINE_PATTERN = re.compile(rb'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),\d+ - [^\n]*? - (DEBUG|INFO|WARNING|ERROR|CRITICAL) - ')
+
+# Bumped when indexing rules change, so existing sidecar indexes are rebuilt
+ERROR_INDEX_VERSION = 2
+
+# Traceback lines that belong to the record above them rather than starting a new one
+CONTINUATION_PREFIXES = (b"Traceback (", b"During handling of the above exception", b"The above exception was")
+
+def tail_lines(path, max_lines=20, block_size=8192, use_mmap=False):
+    """Read the last 'max_lines' lines of a file by seeking backwards from the end.
+
+    Only the blocks that hold those lines are read, so the cost depends on the
+    number of lines requested rather than on the size of the file.
+    """
+    if max_lines <= 0:
+        return []
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return []
+        
+        if use_mmap:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                end = size - 1 if mapped[size - 1:size] == b'\n' else size
+                start = end
+                for _ in range(max_lines):
+                    start = mapped.rfind(b'\n', 0, start)
+                    if start < 0:
+                        break
+                data = mapped[start + 1:size]
+        else:
+            data = b''
+            position = size
+            # One extra newline is needed to know the first wanted line is complete
+            while position > 0 and data.count(b'\n') <= max_lines:
+                read_size = min(block_size, position)
+                position -= read_size
+                f.seek(position)
+                data = f.read(read_size) + data
+    
+    lines = data.decode('utf-8', errors='replace').splitlines(keepends=True)
+    return lines[-max_lines:]
+
+class ErrorLogIndex:
+    """Sidecar index of log record offsets by timestamp and level.
+    
+    The index file holds one "offset<TAB>timestamp<TAB>level" line per indexed record
+    and is extended incrementally from where it last stopped; a truncated or rotated
+    log triggers a rebuild. Several monitor processes may share the index, so
+    update() holds an flock on '<log>.idx.lock' and first catches up with whatever
+    another process has indexed since.
+    
+    Before the runner installed its formatter, the error log handler wrote bare
+    messages with no timestamp or level. Such lines are indexed as legacy_level
+    (the handler only ever received ERROR records) with the previous record's
+    timestamp, or none, so they show up in unbounded queries but not in 'since' ones.
+    """
+    
+    def __init__(self, log_path, levels=("WARNING", "ERROR", "CRITICAL"), legacy_level="ERROR"):
+        self.log_path = log_path
+        self.index_path = log_path + ".idx"
+        self.meta_path = log_path + ".idx.meta"
+        self.lock_path = log_path + ".idx.lock"
+        self.levels = set(levels)
+        self.legacy_level = legacy_level
+        self.offsets = []
+        self.timestamps = []
+        self.record_levels = []
+        self.indexed_upto = 0
+        self.inode = None
+        self.loaded = False
+    
+    def _read_meta(self):
+        with open(self.meta_path, 'r') as f:
+            return json.load(f)
+    
+    def _load(self):
+        self.offsets, self.timestamps, self.record_levels = [], [], []
+        try:
+            meta = self._read_meta()
+            with open(self.index_path, 'r') as f:
+                for line in f:
+                    offset, timestamp, level = line.rstrip('\n').split('\t')
+                    self.offsets.append(int(offset))
+                    self.timestamps.append(timestamp)
+                    self.record_levels.append(level)
+            self.indexed_upto = meta.get("indexed_upto", 0)
+            self.inode = meta.get("inode")
+            if meta.get("version") != ERROR_INDEX_VERSION or len(self.offsets) != meta.get("entries", len(self.offsets)):
+                # The index and its metadata disagree, so start over
+                self._reset()
+        except (OSError, ValueError):
+            self._reset()
+        self.loaded = True
+    
+    def _is_current(self):
+        """Whether the in-memory index matches the one on disk"""
+        try:
+            meta = self._read_meta()
+        except (OSError, ValueError):
+            return not self.offsets and not self.indexed_upto
+        return (meta.get("indexed_upto") == self.indexed_upto and meta.get("inode") == self.inode
+                and meta.get("entries") == len(self.offsets))
+    
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared by every process updating this index"""
+        with open(self.lock_path, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+    
+    def _reset(self):
+        self.offsets, self.timestamps, self.record_levels = [], [], []
+        self.indexed_upto = 0
+        self.inode = None
+        for path in (self.index_path, self.meta_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
+    def update(self):
+        """Index any records appended since the last update"""
+        if not os.path.exists(self.log_path):
+            return
+        with self._file_lock():
+            if not self.loaded or not self._is_current():
+                # First use, or another process has moved the index on
+                self._load()
+            self._update()
+    
+    def _update(self):
+        try:
+            stat = os.stat(self.log_path)
+        except OSError:
+            return
+        if stat.st_size < self.indexed_upto or (self.inode and stat.st_ino != self.inode):
+            logger.info("Error log was truncated or rotated, rebuilding index")
+            self._reset()
+        if stat.st_size == self.indexed_upto:
+            return
+        
+        new_entries = []
+        last_timestamp = self.timestamps[-1] if self.timestamps else ""
+        previous_indented = False
+        with open(self.log_path, 'rb') as f:
+            f.seek(self.indexed_upto)
+            offset = self.indexed_upto
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Leave a partially written last line for the next update
+                    break
+                match = LOG_LINE_PATTERN.match(line)
+                if match:
+                    last_timestamp = match.group(1).decode().replace(' ', 'T')
+                    if match.group(2).decode() in self.levels:
+                        new_entries.append((offset, last_timestamp, match.group(2).decode()))
+                elif self.legacy_level in self.levels and self._is_legacy_record(line, previous_indented):
+                    new_entries.append((offset, last_timestamp, self.legacy_level))
+                previous_indented = line[:1] in (b' ', b'\t')
+                offset += len(line)
+        
+        with open(self.index_path, 'a') as f:
+            for entry in new_entries:
+                f.write(f"{entry[0]}\t{entry[1]}\t{entry[2]}\n")
+        for entry in new_entries:
+            self.offsets.append(entry[0])
+            self.timestamps.append(entry[1])
+            self.record_levels.append(entry[2])
+        self.indexed_upto = offset
+        self.inode = stat.st_ino
+        meta = {"version": ERROR_INDEX_VERSION, "indexed_upto": self.indexed_upto, "inode": self.inode,
+                "entries": len(self.offsets)}
+        write_atomic(self.meta_path, json.dumps(meta).encode())
+    
+    @staticmethod
+    def _is_legacy_record(line, previous_indented):
+        """Whether an unformatted line starts a record, rather than continuing a traceback"""
+        if not line.strip() or line[:1] in (b' ', b'\t') or line.startswith(CONTINUATION_PREFIXES):
+            return False
+        # The exception line closing a traceback follows its indented frames
+        return not previous_indented
+    
+    def query(self, since=None, level="ERROR", limit=None):
+        """Return log lines at 'level' with a timestamp at or after 'since', oldest first"""
+        self.update()
+        start = 0
+        if since is not None:
+            if isinstance(since, datetime):
+                since = since.isoformat(timespec='seconds')
+            start = bisect.bisect_left(self.timestamps, since)
+        
+        if limit is None:
+            positions = [i for i in range(start, len(self.offsets))
+                         if level is None or self.record_levels[i] == level]
+        else:
+            # Walk back from the newest entry and stop once 'limit' are found
+            positions = []
+            for i in range(len(self.offsets) - 1, start - 1, -1):
+                if len(positions) >= limit:
+                    break
+                if level is None or self.record_levels[i] == level:
+                    positions.append(i)
+            positions.reverse()
+        
+        lines = []
+        with open(self.log_path, 'rb') as f:
+            for i in positions:
+                f.seek(self.offsets[i])
+                lines.append(f.readline().decode('utf-8', errors='replace'))
+        return lines
+
+def file_signature(path):
+    """Identify a file version by inode, size and mtime; None if it doesn't exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
 class TwitterMonitor:
     def __init__(self):
         """Initialize the Twitter status monitor"""
         self.state_file = "twitter_bot_state.json"
         self.history_file = "tweet_history.json"
+        self.history_store_file = HISTORY_FILE
+        self.history_store = None
         self.error_log = "twitter_bot_error.log"
+        self.error_index = ErrorLogIndex(self.error_log)
+        
+        # Parsed file contents keyed by file signature, and the last status snapshot
+        self.file_cache = {}
+        self.snapshot = None
+        self.snapshot_key = None
+        self.subscribers = []
         
+    def _cached(self, key, path, loader, default):
+        """Return loader()'s result, reusing it while the file's signature is unchanged"""
+        signature = file_signature(path)
+        cached = self.file_cache.get(key)
+        if cached and cached[0] == signature:
+            return cached[1]
+        value = loader() if signature else default
+        self.file_cache[key] = (signature, value)
+        return value
+    
+    def file_signatures(self):
+        paths = (self.state_file, self.history_file, self.history_store_file + ".idx", self.error_log)
+        return tuple(file_signature(path) for path in paths)
+    
     def load_bot_state(self):
         """Load the Twitter bot state from file"""
-        try:
-            if os.path.exists(self.state_file):
+        def load():
+            try:
                 with open(self.state_file, 'r') as f:
                     return json.load(f)
-            return None
-        except Exception as e:
-            logger.error(f"Error loading Twitter bot state: {e}")
-            return None
+            except Exception as e:
+                logger.error(f"Error loading Twitter bot state: {e}")
+                return None
+        return self._cached("state", self.state_file, load, None)
     
     def load_tweet_history(self):
         """Load the tweet history from file"""
-        try:
-            if os.path.exists(self.history_file):
+        def load():
+            try:
                 with open(self.history_file, 'r') as f:
                     return json.load(f)
-            return []
-        except Exception as e:
-            logger.error(f"Error loading tweet history: {e}")
-            return []
+            except Exception as e:
+                logger.error(f"Error loading tweet history: {e}")
+                return []
+        return self._cached("history", self.history_file, load, [])
+    
+    def get_recent_tweets(self, n=5):
+        """Get the 'n' newest tweets, from the append-only store when it exists"""
+        if not os.path.exists(self.history_store_file):
+            history = self.load_tweet_history()
+            return history[:n] if history else []
+        
+        def load():
+            try:
+                if self.history_store is None:
+                    # Read-only: the bot may be appending while the monitor reads
+                    self.history_store = TweetHistoryStore(self.history_store_file, readonly=True)
+                return self.history_store.recent(n)
+            except Exception as e:
+                logger.error(f"Error reading tweet history store: {e}")
+                return []
+        return self._cached(("recent_tweets", n), self.history_store_file + ".idx", load, [])
     
     def get_recent_errors(self, max_lines=20):
         """Get recent errors from the error log file"""
+        def load():
+            try:
+                # Seek backwards from the end instead of reading the whole file
+                return tail_lines(self.error_log, max_lines)
+            except Exception as e:
+                logger.error(f"Error reading error log: {e}")
+                return []
+        return self._cached(("errors", max_lines), self.error_log, load, [])
+    
+    def get_errors_since(self, since, level="ERROR", limit=None):
+        """Get error log lines logged at or after 'since' using the sidecar index"""
         try:
             if os.path.exists(self.error_log):
-                with open(self.error_log, 'r') as f:
-                    # Get the last 'max_lines' lines from the file
-                    lines = f.readlines()
-                    return lines[-max_lines:] if len(lines) > max_lines else lines
+                return self.error_index.query(since=since, level=level, limit=limit)
             return []
         except Exception as e:
-            logger.error(f"Error reading error log: {e}")
+            logger.error(f"Error querying error log index: {e}")
             return []
     
+    def get_process_health(self):
+        """Liveness of the supervised processes from their heartbeats (no file parsing involved)"""
+        return {
+            name: {"state": record["state"], "pid": record["pid"], "counters": record["counters"]}
+            for name, record in heartbeat.read_all().items()
+        }
+    
     def check_bot_status(self):
         """Check the status of the Twitter bot"""
         state = self.load_bot_state()
@@ -104,7 +399,7 @@ class TwitterMonitor:
             "last_tweet_time": last_tweet_time,
             "daily_tweet_count": state.get("daily_tweet_count", 0),
             "total_tweets": state.get("total_tweets", 0),
-            "announced_coins": len(state.get("announced_coins", [])),
+            "announced_coins": state.get("announced_coins_count", len(state.get("announced_coins", []))),
             "last_update": state.get("last_update"),
             "recent_tweet_history": state.get("tweet_history", []),
             "alerts": state.get("alerts", []),
@@ -114,7 +409,7 @@ class TwitterMonitor:
     def print_status_report(self):
         """Print a status report for the Twitter bot"""
         status = self.check_bot_status()
-        history = self.load_tweet_history()
+        history = self.get_recent_tweets(5)
         recent_errors = self.get_recent_errors()
         
         print("\n" + "=" * 50)
@@ -125,6 +420,14 @@ class TwitterMonitor:
         print(f"\nStatus: {status['status'].upper()}")
         print(f"Message: {status['message']}")
         
+        # Print process liveness
+        processes = self.get_process_health()
+        if processes:
+            print("\nPROCESSES:")
+            for name, process in processes.items():
+                counters = ", ".join(f"{k}={v}" for k, v in process['counters'].items() if v)
+                print(f"- {name} (PID {process['pid']}): {process['state'].upper()}" + (f" [{counters}]" if counters else ""))
+        
         # Print tweet statistics
         print("\nTWEET STATISTICS:")
         print(f"- Total tweets: {status.get('total_tweets', 'Unknown')}")
@@ -134,7 +437,7 @@ class TwitterMonitor:
         # Print recent tweets
         print("\nRECENT TWEETS:")
         if history:
-            for i, tweet in enumerate(history[:5]):
+            for i, tweet in enumerate(history):
                 print(f"- {i+1}. [{tweet.get('timestamp', 'Unknown date')}] {tweet.get('text', '')}")
         else:
             print("No tweet history found.")
@@ -158,10 +461,10 @@ class TwitterMonitor:
         
         print("\n" + "=" * 50)
     
-    def get_status_json(self):
-        """Get the Twitter bot status as JSON for API integration"""
+    def build_status_json(self):
+        """Build the Twitter bot status JSON from the (memoised) files"""
         status = self.check_bot_status()
-        history = self.load_tweet_history()
+        history = self.get_recent_tweets(5)
         recent_errors = self.get_recent_errors()
         
         # Format errors for JSON
@@ -180,13 +483,73 @@ class TwitterMonitor:
                 "daily_tweet_count": status.get('daily_tweet_count', 0),
                 "announced_coins": status.get('announced_coins', 0)
             },
-            "recent_tweets": history[:5] if history else [],
+            "recent_tweets": history,
             "recent_errors": formatted_errors,
             "alerts": status.get('alerts', []),
             "timestamp": datetime.now().isoformat()
         }
+    
+    def get_status_json(self):
+        """Get the Twitter bot status as JSON for API integration.
+        
+        The snapshot is rebuilt only when one of the three files changes, or when the
+        minute rolls over (the status message is minute-granular).
+        """
+        key = (self.file_signatures(), datetime.now().strftime('%Y-%m-%dT%H:%M'))
+        if self.snapshot is None or key != self.snapshot_key:
+            with metrics.STATUS_BUILD_LATENCY.time():
+                self.snapshot = self.build_status_json()
+            self.snapshot_key = key
+        
+        # Heartbeats change every beat, so they're read fresh rather than cached
+        processes = self.get_process_health()
+        status = dict(self.snapshot, processes=processes, timestamp=datetime.now().isoformat())
+        bot = processes.get("twitter_bot")
+        if bot and bot["state"] != "alive":
+            status["status"] = "critical"
+            status["message"] = f"Twitter bot process is {bot['state']} (PID {bot['pid']})."
+        return status
+    
+    def subscribe(self, callback):
+        """Register callback(snapshot) to receive status updates from watch()"""
+        self.subscribers.append(callback)
+    
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+    
+    def watch(self, interval=1.0, stop_event=None):
+        """Push a fresh snapshot to subscribers whenever the status changes.
+        
+        Each tick costs a few stat() calls plus a read of each heartbeat; files are
+        only re-read when they change.
+        """
+        last_snapshot = None
+        while not (stop_event and stop_event.is_set()):
+            snapshot = self.get_status_json()
+            comparable = dict(snapshot, timestamp=None)
+            if comparable != last_snapshot:
+                last_snapshot = comparable
+                for callback in list(self.subscribers):
+                    try:
+                        callback(snapshot)
+                    except Exception as e:
+                        logger.error(f"Status subscriber failed: {e}")
+            if stop_event:
+                stop_event.wait(interval)
+            else:
+                time.sleep(interval)
 
 # For direct testing
 if __name__ == "__main__":
     monitor = TwitterMonitor()
-    monitor.print_status_report()
\ No newline at end of file
+    startup.mark_ready()
+    if len(sys.argv) > 1 and sys.argv[1] == "watch":
+        # Print a JSON snapshot every time the status changes
+        monitor.subscribe(lambda snapshot: print(json.dumps(snapshot), flush=True))
+        try:
+            monitor.watch()
+        except KeyboardInterrupt:
+            pass
+    else:
+        monitor.print_status_report()
\ No newline at end of file